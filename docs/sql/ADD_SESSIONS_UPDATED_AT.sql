@@ -0,0 +1,42 @@
+-- ============================================================================
+-- ADD updated_at TO SESSIONS
+-- Sessions are inserted as in_progress and filled in later (image, analysis,
+-- search results, phone number). scripts/analytics_sync.py uses updated_at as
+-- the incremental-sync watermark so late updates reach the analytics warehouse.
+-- ============================================================================
+
+-- Step 1: Add the column
+ALTER TABLE sessions
+ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+
+-- Step 2: Backfill from the latest step timestamp each session has
+UPDATE sessions
+SET updated_at = GREATEST(created_at, uploaded_at, analyzed_at, cropped_at, selected_at,
+                          searched_at, phone_collected_at, completed_at);
+
+-- Step 3: Keep it current on every update
+CREATE OR REPLACE FUNCTION set_sessions_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS sessions_set_updated_at ON sessions;
+CREATE TRIGGER sessions_set_updated_at
+    BEFORE UPDATE ON sessions
+    FOR EACH ROW EXECUTE FUNCTION set_sessions_updated_at();
+
+-- Step 4: Index for the incremental sync
+CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions(updated_at, id);
+
+
+-- ============================================================================
+-- VERIFY
+-- ============================================================================
+SELECT
+    COUNT(*) as total_sessions,
+    COUNT(updated_at) as with_updated_at,
+    MAX(updated_at) as latest_update
+FROM sessions;
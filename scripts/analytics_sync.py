@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Local analytics warehouse: incremental Supabase snapshot into Parquet + DuckDB.
+
+`sync` pulls only rows newer than each table's watermark into date-partitioned
+Parquet files, compacting every partition it touches to one file with one copy
+of each row; `query` runs the read-only docs/sql analytics files against those
+files with DuckDB, so heavy analytics never touch the production database.
+
+Usage:
+    python3 analytics_sync.py sync
+    python3 analytics_sync.py query ../docs/sql/2_CONVERSION_RATE.sql
+    python3 analytics_sync.py query --sql "SELECT COUNT(*) FROM sessions"
+
+Requires: pip install duckdb pyarrow
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+
+from cpu_profile import CpuProfiler, add_profile_args
+
+# Configuration
+SUPABASE_URL = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
+SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('NEXT_PUBLIC_SUPABASE_ANON_KEY')
+WAREHOUSE_DIR = Path('./analytics_warehouse')
+STATE_FILE = WAREHOUSE_DIR / '_sync_state.json'
+FETCH_PAGE_SIZE = 1000
+EPOCH = '1970-01-01T00:00:00+00:00'
+
+# table -> (primary key, watermark column, partition column, lookback for rows that are
+# updated in place). Tables without updated_at get re-read over a lookback window.
+# Partitions use a column that never changes, so a re-read row always lands in the
+# partition holding its older copy and compaction replaces it there.
+TABLES = {
+    'users': ('id', 'last_active_at', 'created_at', timedelta(0)),
+    'sessions': ('id', 'updated_at', 'created_at', timedelta(0)),
+    'events': ('id', 'created_at', 'created_at', timedelta(0)),
+    'link_clicks': ('id', 'clicked_at', 'clicked_at', timedelta(0)),
+    'search_jobs': ('id', 'updated_at', 'created_at', timedelta(0)),
+    'shared_results': ('id', 'created_at', 'created_at', timedelta(0)),
+    'user_feedback': ('id', 'created_at', 'created_at', timedelta(0)),
+    'result_page_visits': ('id', 'visit_timestamp', 'visit_timestamp', timedelta(hours=6)),
+    'app_page_visits': ('id', 'visit_timestamp', 'visit_timestamp', timedelta(hours=6)),
+}
+
+# Watermark columns that can be NULL: `gte` never matches those rows, so they are
+# re-read on every sync and only written when their content changed
+NULLABLE_WATERMARKS = {'users'}
+
+# Watermark columns added by a migration rather than the base schema
+MIGRATIONS = {'sessions': '../docs/sql/ADD_SESSIONS_UPDATED_AT.sql'}
+
+# Started by --profile-cpu
+CPU = CpuProfiler()
+
+# Postgres helpers used by the docs/sql files, as DuckDB macros
+DUCKDB_MACROS = [
+    "CREATE OR REPLACE MACRO normalize_phone(phone) AS "
+    "CASE WHEN phone LIKE '82%' THEN '0' || substring(phone, 3) ELSE phone END",
+    # to_char(timestamp, 'YYYY-MM-DD HH24:MI:SS') - the only patterns the files use
+    "CREATE OR REPLACE MACRO to_char(value, fmt) AS strftime(value, "
+    "replace(replace(replace(replace(replace(replace(fmt, 'YYYY', '%Y'), 'HH24', '%H'), "
+    "'MI', '%M'), 'MM', '%m'), 'DD', '%d'), 'SS', '%S'))",
+    "CREATE OR REPLACE MACRO jsonb_pretty(value) AS CAST(value AS VARCHAR)",
+    "CREATE OR REPLACE MACRO jsonb_array_length(value) AS json_array_length(value)",
+    # Set-returning in the select list; several unnests in one SELECT advance together like Postgres SRFs
+    "CREATE OR REPLACE MACRO jsonb_object_keys(value) AS unnest(json_keys(value))",
+    "CREATE OR REPLACE MACRO jsonb_array_elements(value) AS TABLE "
+    "SELECT unnest(CAST(value AS JSON[])) AS value",
+    # Used in the select list as a (key, value) record
+    "CREATE OR REPLACE MACRO jsonb_each(value) AS unnest(list_transform(json_keys(value), "
+    "k -> {'key': k, 'value': json_extract(value, '$.\"' || k || '\"')}))",
+]
+
+# Postgres syntax macros can't cover. Still unsupported locally (16 of 218
+# statements): time_to_feedback_seconds, which the schema files don't define;
+# `... LIMIT n UNION ALL ...` in DEBUG_SESSIONS_ISSUE, which Postgres rejects too;
+# and DuckDB binder differences over UNIONs (4_GROUP_SEGMENTATION #2,
+# UNIVERSAL_USER_JOURNEY #4).
+POSTGRES_REWRITES = [
+    # Postgres names a single-column set function's output after the table alias
+    (re.compile(r'(jsonb_array_elements\((?:[^()]|\([^()]*\))*\)\s+as\s+)(\w+)\b(?!\s*\()', re.IGNORECASE),
+     r'\1\2(\2)'),
+    (re.compile(r'\bjson_build_object\(', re.IGNORECASE), 'json_object('),
+]
+
+
+def require(module_name: str):
+    """Import an optional dependency or exit with an install hint"""
+    try:
+        return __import__(module_name)
+    except ImportError:
+        print(f'❌ {module_name} is required for the analytics warehouse')
+        print(f'   pip install duckdb pyarrow')
+        sys.exit(1)
+
+
+def load_state() -> Dict:
+    if STATE_FILE.exists():
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(state: Dict):
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = Path(f'{STATE_FILE}.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_file, STATE_FILE)
+
+
+def fetch_since(supabase, table: str, key: str, column: str, since: str) -> List[Dict]:
+    """Keyset-paginate rows with `column` >= since, ordered by (column, key)"""
+    rows = []
+    cursor = None
+    while True:
+        query = supabase.table(table).select('*')
+        if cursor is None:
+            query = query.gte(column, since)
+        else:
+            ts = f'"{cursor[0]}"'  # quoted: timestamps contain reserved characters
+            query = query.or_(f'{column}.gt.{ts},and({column}.eq.{ts},{key}.gt.{cursor[1]})')
+        page = query.order(column).order(key).limit(FETCH_PAGE_SIZE).execute().data or []
+        rows.extend(page)
+        if len(page) < FETCH_PAGE_SIZE:
+            return rows
+        cursor = (page[-1][column], page[-1][key])
+
+
+def fetch_null_watermark(supabase, table: str, key: str, column: str) -> List[Dict]:
+    """Keyset-paginate rows whose watermark column is NULL, ordered by key"""
+    rows = []
+    last_key = None
+    while True:
+        query = supabase.table(table).select('*').is_(column, 'null')
+        if last_key is not None:
+            query = query.gt(key, last_key)
+        page = query.order(key).limit(FETCH_PAGE_SIZE).execute().data or []
+        rows.extend(page)
+        if len(page) < FETCH_PAGE_SIZE:
+            return rows
+        last_key = page[-1][key]
+
+
+def changed_null_watermark_rows(table: str, rows: List[Dict], key: str):
+    """Drop NULL-watermark rows identical to the last sync; returns (rows, digests to save)"""
+    digest_file = WAREHOUSE_DIR / table / '_null_watermark_digests.json'
+    seen = json.loads(digest_file.read_text()) if digest_file.exists() else {}
+    digests = {str(row[key]): hashlib.sha1(json.dumps(row, sort_keys=True, default=str).encode()).hexdigest()
+               for row in rows}
+    return [row for row in rows if seen.get(str(row[key])) != digests[str(row[key])]], digests
+
+
+def save_null_watermark_digests(table: str, digests: Dict[str, str]):
+    digest_file = WAREHOUSE_DIR / table / '_null_watermark_digests.json'
+    digest_file.parent.mkdir(parents=True, exist_ok=True)
+    digest_file.write_text(json.dumps(digests))
+
+
+def write_partitions(table: str, rows: List[Dict], column: str, key: str) -> List[str]:
+    """
+    Merge rows into Parquet partitions by `column`'s date.
+
+    Each touched partition is rewritten as a single file holding the newest copy
+    of every row, so repeated boundary / lookback reads don't accumulate. The new
+    file is in place before the old ones are removed; if a sync dies in between,
+    the views' row_number() filter still hides the duplicates.
+    """
+    df = pd.DataFrame(rows)
+    json_columns = [c for c in df.columns if df[c].map(lambda v: isinstance(v, (dict, list))).any()]
+    for c in json_columns:
+        df[c] = df[c].map(lambda v: None if v is None else json.dumps(v, ensure_ascii=False))
+    df['_synced_at'] = datetime.now(timezone.utc).isoformat()
+    df['_date'] = pd.to_datetime(df[column], utc=True, errors='coerce').dt.strftime('%Y-%m-%d').fillna('unknown')
+
+    table_dir = WAREHOUSE_DIR / table
+    part_name = f'part-{int(time.time() * 1000)}.parquet'
+    written = []
+    for date, part in df.groupby('_date'):
+        out_dir = table_dir / f'date={date}'
+        out_dir.mkdir(parents=True, exist_ok=True)
+        existing = sorted(out_dir.glob('*.parquet'))
+        part = pd.concat([pd.read_parquet(p) for p in existing] + [part.drop(columns=['_date'])], ignore_index=True)
+        part = part.sort_values('_synced_at', kind='stable').drop_duplicates(key, keep='last')
+
+        path = out_dir / part_name
+        tmp_path = out_dir / f'.{part_name}.tmp'
+        part.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        for old in existing:
+            if old != path:
+                old.unlink()
+        written.append(str(path))
+
+    # Remember which columns hold JSON so views can cast them back
+    schema_file = table_dir / '_json_columns.json'
+    known = set(json.loads(schema_file.read_text())) if schema_file.exists() else set()
+    schema_file.write_text(json.dumps(sorted(known | set(json_columns))))
+    return written
+
+
+def sync(tables: List[str] = None):
+    """Incrementally snapshot each table past its watermark"""
+    from supabase import create_client
+
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        print('❌ Error: Supabase credentials not found in environment')
+        print('Set NEXT_PUBLIC_SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY')
+        sys.exit(1)
+    require('pyarrow')
+
+    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    state = load_state()
+
+    print(f'\n{"="*60}')
+    print(f'ANALYTICS SYNC → {WAREHOUSE_DIR}')
+    print(f'{"="*60}')
+
+    for table in tables or TABLES:
+        key, column, partition_column, lookback = TABLES[table]
+        watermark = state.get(table, EPOCH)
+        since = (datetime.fromisoformat(watermark.replace('Z', '+00:00')) - lookback).isoformat()
+        start_time = time.time()
+        try:
+            with CPU.stage('fetch'):
+                rows = fetch_since(supabase, table, key, column, since)
+                null_digests = None
+                if table in NULLABLE_WATERMARKS:
+                    null_rows, null_digests = changed_null_watermark_rows(
+                        table, fetch_null_watermark(supabase, table, key, column), key)
+                    rows += null_rows
+        except Exception as e:
+            print(f'❌ {table}: {e}')
+            if table in MIGRATIONS:
+                print(f'   {column} comes from {MIGRATIONS[table]} - run it in the Supabase SQL editor first')
+            continue
+
+        if rows:
+            with CPU.stage('write'):
+                files = write_partitions(table, rows, partition_column, key)
+            state[table] = max((r[column] for r in rows if r.get(column)), default=watermark)
+            save_state(state)
+            print(f'✅ {table:<20} {len(rows):>7} rows → {len(files)} partitions ({time.time() - start_time:.1f}s)')
+        else:
+            print(f'✅ {table:<20}       0 rows (up to date)')
+        if null_digests is not None:
+            save_null_watermark_digests(table, null_digests)
+
+
+def connect():
+    """In-memory DuckDB with one deduplicated view per synced table"""
+    duckdb = require('duckdb')
+    con = duckdb.connect()
+    for macro in DUCKDB_MACROS:
+        con.execute(macro)
+
+    for table, (key, _, _, _) in TABLES.items():
+        table_dir = WAREHOUSE_DIR / table
+        if not any(table_dir.glob('date=*/*.parquet')):
+            continue
+        schema_file = table_dir / '_json_columns.json'
+        json_columns = json.loads(schema_file.read_text()) if schema_file.exists() else []
+        casts = ''.join(f', CAST({c} AS JSON) AS {c}' for c in json_columns)
+        excludes = ', '.join(['_synced_at', 'date'] + json_columns)
+        con.execute(f"""
+            CREATE VIEW {table} AS
+            SELECT * EXCLUDE ({excludes}){casts}
+            FROM read_parquet('{table_dir.as_posix()}/date=*/*.parquet', hive_partitioning = true, union_by_name = true)
+            QUALIFY row_number() OVER (PARTITION BY {key} ORDER BY _synced_at DESC) = 1
+        """)
+    return con
+
+
+def split_statements(sql: str) -> List[str]:
+    """Read-only statements of a docs/sql file (Postgres functions and writes are skipped)"""
+    sql = re.sub(r'CREATE\s+OR\s+REPLACE\s+FUNCTION.*?\$\$\s*LANGUAGE\s+\w+[^;]*;', '', sql, flags=re.IGNORECASE | re.DOTALL)
+    statements = []
+    for statement in sql.split(';'):
+        body = '\n'.join(line for line in statement.splitlines() if not line.strip().startswith('--')).strip()
+        if re.match(r'^(SELECT|WITH)\b', body, re.IGNORECASE):
+            statements.append(body)
+    return statements
+
+
+def to_duckdb(statement: str) -> str:
+    for pattern, replacement in POSTGRES_REWRITES:
+        statement = pattern.sub(replacement, statement)
+    return statement
+
+
+def run_query_file(path: str):
+    con = connect()
+    with open(path, 'r', encoding='utf-8') as f:
+        statements = split_statements(f.read())
+
+    print(f'\n📄 {path}: {len(statements)} read-only statements')
+    for idx, statement in enumerate(statements, 1):
+        start_time = time.time()
+        try:
+            with CPU.stage('query'):
+                df = con.execute(to_duckdb(statement)).df()
+        except Exception as e:
+            print(f'\n⚠️  Statement {idx} failed locally: {str(e).splitlines()[0]}')
+            continue
+        print(f'\n--- Statement {idx} ({(time.time() - start_time) * 1000:.0f} ms, {len(df)} rows) ---')
+        with pd.option_context('display.max_rows', 100, 'display.max_columns', 20, 'display.width', 200):
+            print(df)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Local analytics warehouse (Supabase → Parquet → DuckDB)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    sync_parser = subparsers.add_parser('sync', help='Incrementally snapshot Supabase tables')
+    sync_parser.add_argument('--tables', nargs='+', choices=list(TABLES), help='Only these tables')
+
+    query_parser = subparsers.add_parser('query', help='Run docs/sql files or ad-hoc SQL locally')
+    query_parser.add_argument('files', nargs='*', help='SQL files to run')
+    query_parser.add_argument('--sql', help='Ad-hoc SQL statement')
+
+    for subparser in (sync_parser, query_parser):
+        add_profile_args(subparser)
+    args = parser.parse_args()
+
+    global CPU
+    CPU = CpuProfiler.from_args(args)
+
+    if args.command == 'sync':
+        sync(args.tables)
+    elif args.command == 'query':
+        for path in args.files:
+            run_query_file(path)
+        if args.sql:
+            with pd.option_context('display.max_rows', 100, 'display.width', 200):
+                with CPU.stage('query'):
+                    df = connect().execute(to_duckdb(args.sql)).df()
+                print(df)
+    CPU.finish()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Shared client for the interchangeable analyze backends (Modal, Railway, HF Spaces).
+
+Routing: each backend tracks an EWMA of latency and error rate, and every call
+starts on the best healthy backend. Repeated failures open a backend's circuit
+breaker, so calls skip it (or fail immediately when every breaker is open)
+instead of waiting out a 180s timeout; background health probes close it again.
+
+Hedged requests: every call goes to the primary backend first. If it hasn't
+answered by that backend's live p90 latency, a duplicate goes to the next
+backend and the first successful response wins. Hedges are capped at a small
+fraction of calls (the hedge budget) so tail latency drops without doubling load.
+
+Single-flight: concurrent calls with the same content fingerprint share one
+in-flight request and its result.
+"""
+
+import copy
+import hashlib
+import json
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from warm_pool import base_url, load_backends
+
+# Configuration
+ANALYZE_TIMEOUT = 180
+LATENCY_WINDOW = 200           # recent samples per backend
+MIN_LATENCY_SAMPLES = 10       # before that, hedge after DEFAULT_HEDGE_SECONDS
+DEFAULT_HEDGE_SECONDS = 45.0
+HEDGE_PERCENTILE = 90
+HEDGE_BUDGET = 0.10            # at most 10% extra requests
+CLIENT_WORKERS = 32
+
+# Router / circuit breaker
+EWMA_ALPHA = 0.2
+ERROR_PENALTY = 4.0            # score = ewma latency * (1 + ERROR_PENALTY * error rate)
+BREAKER_FAILURES = 3           # consecutive failures that open the breaker
+PROBE_INTERVAL_SECONDS = 15
+PROBE_TIMEOUT = 10
+
+# Breaker states
+CLOSED = 'closed'
+OPEN = 'open'
+
+
+class BackendError(Exception):
+    """Every backend failed for a request"""
+
+
+def fingerprint(payload: Any) -> str:
+    """Stable content hash of a JSON-able request body (or raw bytes)"""
+    if not isinstance(payload, bytes):
+        payload = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one in-flight call"""
+
+    def __init__(self, name: str = 'requests'):
+        self.name = name
+        self.calls = 0
+        self.shared = 0
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            # Followers get their own copy: callers mutate results (pruning, mirroring)
+            return copy.deepcopy(future.result())
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def print_report(self):
+        print(f'🔗 {self.name}: {self.calls} calls made, {self.shared} duplicates coalesced')
+
+
+class LatencyWindow:
+    """Rolling window of successful call latencies"""
+
+    def __init__(self, size: int = LATENCY_WINDOW):
+        self.samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self.samples)
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+
+class BackendHealth:
+    """EWMA latency / error rate and circuit breaker of one backend"""
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.url = url
+        self.ewma_latency = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened = 0  # times the breaker opened
+        self._lock = threading.Lock()
+
+    def record_success(self, seconds: float):
+        with self._lock:
+            self.ewma_latency = seconds if self.ewma_latency is None else (
+                EWMA_ALPHA * seconds + (1 - EWMA_ALPHA) * self.ewma_latency)
+            self.error_rate *= 1 - EWMA_ALPHA
+            self.consecutive_failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.error_rate = EWMA_ALPHA + (1 - EWMA_ALPHA) * self.error_rate
+            self.consecutive_failures += 1
+            if self.state == CLOSED and self.consecutive_failures >= BREAKER_FAILURES:
+                self.state = OPEN
+                self.opened += 1
+                print(f'  ⛔ Circuit open: {self.name} ({self.consecutive_failures} consecutive failures)')
+
+    def probe_passed(self):
+        """Close the breaker on probation: the next real failure opens it again"""
+        with self._lock:
+            if self.state == OPEN:
+                self.state = CLOSED
+                self.consecutive_failures = BREAKER_FAILURES - 1
+                print(f'  ✅ Circuit closed: {self.name} (health probe passed)')
+
+    def score(self) -> float:
+        """Lower is better; untried backends rank after every measured one"""
+        if self.ewma_latency is None:
+            return float('inf')
+        return self.ewma_latency * (1 + ERROR_PENALTY * self.error_rate)
+
+
+class AnalyzeClient:
+    """Routed, hedged POST /analyze across redundant backends"""
+
+    def __init__(self, backends: Optional[List[Tuple[str, str]]] = None, hedge: bool = True,
+                 hedge_budget: float = HEDGE_BUDGET, timeout: float = ANALYZE_TIMEOUT):
+        self.backends = backends or load_backends()
+        self.hedge = hedge and len(self.backends) > 1
+        self.hedge_budget = hedge_budget
+        self.timeout = timeout
+        self.latency = {name: LatencyWindow() for name, _ in self.backends}
+        self.metrics = {'requests': 0, 'hedges': 0, 'hedge_wins': 0, 'budget_exhausted': 0,
+                        'failovers': 0, 'failed': 0}
+        self.wins = {name: 0 for name, _ in self.backends}
+        self.health = {name: BackendHealth(name, url) for name, url in self.backends}
+        self.flights = SingleFlight('analyze')
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=CLIENT_WORKERS)
+        self._stop = threading.Event()
+        threading.Thread(target=self._probe_loop, daemon=True).start()
+
+    def _probe_loop(self):
+        """Close breakers once their backend answers a cheap GET again"""
+        while not self._stop.wait(PROBE_INTERVAL_SECONDS):
+            for health in self.health.values():
+                if health.state != OPEN:
+                    continue
+                try:
+                    if requests.get(base_url(health.url), timeout=PROBE_TIMEOUT).status_code < 500:
+                        health.probe_passed()
+                except requests.RequestException:
+                    pass
+
+    def close(self):
+        self._stop.set()
+        self._pool.shutdown(wait=False)
+
+    def hedge_delay(self, name: str) -> float:
+        """Seconds to wait on a backend before hedging: its live p90"""
+        p90 = self.latency[name].percentile(HEDGE_PERCENTILE)
+        return p90 if p90 is not None else DEFAULT_HEDGE_SECONDS
+
+    def _take_hedge_token(self) -> bool:
+        with self._lock:
+            if self.metrics['hedges'] + 1 <= max(1.0, self.hedge_budget * self.metrics['requests']):
+                self.metrics['hedges'] += 1
+                return True
+            self.metrics['budget_exhausted'] += 1
+            return False
+
+    def candidates(self) -> List[Tuple[str, str]]:
+        """Healthy backends, best score first (ties, e.g. untried backends, keep the configured order)"""
+        healthy = [(name, url) for name, url in self.backends if self.health[name].state != OPEN]
+        return sorted(healthy, key=lambda backend: self.health[backend[0]].score())
+
+    def _post(self, name: str, url: str, payload: Dict, session: requests.Session) -> Dict:
+        start_time = time.time()
+        try:
+            response = session.post(url, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+        except Exception:
+            self.health[name].record_failure()
+            raise
+        elapsed = time.time() - start_time
+        self.latency[name].add(elapsed)
+        self.health[name].record_success(elapsed)
+        return data
+
+    def post(self, payload: Dict) -> Dict:
+        """Routed, hedged call; identical concurrent payloads share one call"""
+        return self.flights.do(fingerprint(payload), lambda: self._call(payload))
+
+    def _call(self, payload: Dict) -> Dict:
+        """First successful response among the primary and (at most) hedged/failover attempts"""
+        remaining = self.candidates()
+        with self._lock:
+            self.metrics['requests'] += 1
+            if not remaining:
+                # Fail fast: every breaker is open
+                self.metrics['failed'] += 1
+                raise BackendError('No healthy analyze backends (all circuits open)')
+
+        attempts = {}  # future -> (backend name, session)
+
+        def launch():
+            name, url = remaining.pop(0)
+            session = requests.Session()
+            attempts[self._pool.submit(self._post, name, url, payload, session)] = (name, session)
+            return name
+
+        start_time = time.time()
+        primary = launch()
+        hedge_at = start_time + self.hedge_delay(primary) if self.hedge else None
+        deadline = start_time + self.timeout
+        hedged = False
+        errors = []
+
+        while attempts:
+            now = time.time()
+            if hedge_at is not None and remaining:
+                wait_for = max(0.0, hedge_at - now)
+            else:
+                wait_for = max(0.0, deadline - now)
+            done, _ = wait(list(attempts), timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            if not done:
+                if hedge_at is not None and remaining and time.time() >= hedge_at:
+                    # Primary is slower than its p90: duplicate to the next backend
+                    hedge_at = None
+                    if self._take_hedge_token():
+                        launch()
+                        hedged = True
+                    continue
+                break  # overall deadline
+
+            for future in done:
+                name, session = attempts.pop(future)
+                try:
+                    data = future.result()
+                except Exception as e:
+                    session.close()
+                    errors.append(f'{name}: {e}')
+                    if not attempts and remaining:
+                        with self._lock:
+                            self.metrics['failovers'] += 1
+                        launch()
+                    continue
+
+                # Winner: drop the losers. A request already on the wire can't be
+                # aborted mid-read, so it is abandoned and its result discarded.
+                for loser, (_, loser_session) in attempts.items():
+                    loser.cancel()
+                    loser_session.close()
+                session.close()
+                with self._lock:
+                    self.wins[name] += 1
+                    if hedged and name != primary:
+                        self.metrics['hedge_wins'] += 1
+                return data
+
+        with self._lock:
+            self.metrics['failed'] += 1
+        raise BackendError('All analyze backends failed: ' + ('; '.join(errors) or 'timed out'))
+
+    def analyze(self, image_url: str, use_dinox: bool = False) -> Dict:
+        return self.post({'imageUrl': image_url, 'use_dinox': use_dinox})
+
+    def print_metrics(self):
+        m = self.metrics
+        hedge_rate = m['hedges'] / m['requests'] * 100 if m['requests'] else 0.0
+        win_rate = m['hedge_wins'] / m['hedges'] * 100 if m['hedges'] else 0.0
+        print(f'\n🛰️  Analyze client: {m["requests"]} requests, {m["hedges"]} hedged ({hedge_rate:.1f}%, '
+              f'budget {self.hedge_budget * 100:.0f}%), hedge win rate {win_rate:.0f}%, '
+              f'{m["budget_exhausted"]} over budget, {m["failovers"]} failovers, {m["failed"]} failed, '
+              f'{self.flights.shared} coalesced')
+        print(f'{"Backend":<12} {"Wins":>5} {"p50":>7} {"p90":>7} {"p99":>7} {"Errors":>7} {"Circuit":>8}')
+        for name, _ in self.backends:
+            health = self.health[name]
+            circuit = f'{health.state}' + (f' ×{health.opened}' if health.opened else '')
+            samples = list(self.latency[name].samples)
+            if samples:
+                q = statistics.quantiles(samples, n=100) if len(samples) > 1 else samples * 99
+                latencies = f'{q[49]:>6.1f}s {q[89]:>6.1f}s {q[98]:>6.1f}s'
+            else:
+                latencies = f'{"-":>7} {"-":>7} {"-":>7}'
+            print(f'{name:<12} {self.wins[name]:>5} {latencies} {health.error_rate * 100:>6.0f}% {circuit:>8}')
+
+
+def main():
+    """Analyze image URLs through the hedged client and print latency metrics"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Analyze images through redundant backends')
+    parser.add_argument('image_urls', nargs='+')
+    parser.add_argument('--dinox', action='store_true', help='Use DINO-X instead of GPT-4o')
+    parser.add_argument('--no-hedge', action='store_true')
+    args = parser.parse_args()
+
+    client = AnalyzeClient(hedge=not args.no_hedge)
+    for image_url in args.image_urls:
+        try:
+            items = client.analyze(image_url, use_dinox=args.dinox).get('items', [])
+            print(f'✅ {len(items)} items: {image_url}')
+        except BackendError as e:
+            print(f'❌ {e}')
+    client.print_metrics()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
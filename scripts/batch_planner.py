@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Batch ETA / cost planner learned from past brands_batch_*.json runs.
+
+Each past image record gives per-stage timings (upload, analyze, search), the
+Serper / product-selection calls its search made and its item count; every stage
+is fitted as `seconds = a + b * items` and every API as `calls = a + b * items`,
+and cost is the fitted calls times the unit prices. Before a run the
+planner predicts wall time and API cost for a concurrency level and recommends
+the lowest concurrency that meets a deadline without going over backend limits.
+
+Usage:
+    python3 batch_planner.py --images 120 --deadline-minutes 20
+"""
+
+import glob
+import json
+import math
+import os
+import statistics
+import sys
+from typing import Dict, List, Optional
+
+# Stages recorded in result['stage_times']
+STAGES = ('upload', 'analyze', 'search')
+
+# Max concurrent requests each backend tolerates
+BACKEND_LIMITS = {'upload': 16, 'analyze': 4, 'search': 6}
+
+# API calls recorded in result['api_calls']
+APIS = ('search', 'select')
+
+# API cost per unit (USD)
+ANALYZE_COST_PER_IMAGE = 0.02    # GPT-4o analysis + cropping
+SERPER_COST_PER_CALL = 0.001
+SELECT_COST_PER_CALL = 0.03      # GPT-4 Turbo product selection
+
+# /api/search runs the full-image Lens search 4x; meta.timing.serper_count leaves it out
+FULL_IMAGE_SEARCH_CALLS = 4
+
+# Fallbacks when there is no history yet
+DEFAULT_ITEMS_PER_IMAGE = 2.0
+DEFAULT_STAGE_MODEL = {'upload': (2.0, 0.0), 'analyze': (15.0, 3.0), 'search': (10.0, 12.0)}
+DEFAULT_CALL_MODEL = {'search': (0.0, 3.0), 'select': (0.0, 1.0)}
+INTER_IMAGE_DELAY = 2.0
+
+
+def item_count(record: Dict) -> Optional[int]:
+    analysis = record.get('analysis') or {}
+    if 'items' in analysis:
+        return len(analysis['items'])
+    return record.get('items_detected')
+
+
+def api_calls(search_data: Optional[Dict]) -> Optional[Dict]:
+    """Serper and selection calls one /api/search response made (None if it didn't report them)"""
+    meta = (search_data or {}).get('meta') or {}
+    timing = meta.get('timing') or {}
+    if meta.get('fallbackMode'):
+        return {'search': FULL_IMAGE_SEARCH_CALLS, 'select': 1}
+    if 'serper_count' not in timing:
+        return None
+    full_image = FULL_IMAGE_SEARCH_CALLS if timing.get('full_image_search_seconds') else 0
+    return {'search': timing['serper_count'] + full_image, 'select': timing.get('gpt4_turbo_count', 0)}
+
+
+def record_api_calls(record: Dict) -> Optional[Dict]:
+    """Recorded calls, or derived from the saved search response for older runs"""
+    return record.get('api_calls') or api_calls(record.get('search'))
+
+
+def load_run_records(results_dir: str) -> List[Dict]:
+    """Successful image records from every past brands batch"""
+    records = []
+    for path in sorted(glob.glob(os.path.join(results_dir, 'brands_batch_*.json'))):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                batch = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            continue
+        records.extend(r for r in batch.get('results', []) if r.get('success'))
+    return records
+
+
+def fit_line(xs: List[float], ys: List[float]) -> tuple:
+    """Least-squares (intercept, slope); slope 0 when items don't vary"""
+    if len(xs) < 2 or len(set(xs)) < 2:
+        return (statistics.fmean(ys) if ys else 0.0, 0.0)
+    slope, intercept = statistics.linear_regression(xs, ys)
+    return (max(intercept, 0.0), max(slope, 0.0))
+
+
+class BatchPlanner:
+    """Per-stage latency model + per-API call model fitted from run records"""
+
+    def __init__(self, records: List[Dict]):
+        self.records = records
+        with_items = [r for r in records if item_count(r) is not None]
+        self.items_per_image = (statistics.fmean(item_count(r) for r in with_items)
+                                if with_items else DEFAULT_ITEMS_PER_IMAGE)
+
+        self.stage_model = dict(DEFAULT_STAGE_MODEL)
+        self.samples = {}
+        for stage in STAGES:
+            points = [(item_count(r), r['stage_times'][stage]) for r in with_items
+                      if stage in (r.get('stage_times') or {})]
+            self.samples[stage] = len(points)
+            if points:
+                self.stage_model[stage] = fit_line([p[0] for p in points], [p[1] for p in points])
+
+        self.call_model = dict(DEFAULT_CALL_MODEL)
+        self.call_samples = {}
+        for api in APIS:
+            points = [(item_count(r), record_api_calls(r)[api]) for r in with_items if record_api_calls(r)]
+            self.call_samples[api] = len(points)
+            if points:
+                self.call_model[api] = fit_line([p[0] for p in points], [p[1] for p in points])
+
+        # Older runs only recorded the total: scale the default stage split to it
+        timed = [r for r in with_items if 'processing_time_seconds' in r]
+        if timed and not any(self.samples.values()):
+            observed = statistics.fmean(r['processing_time_seconds'] for r in timed)
+            scale = observed / self.image_seconds(self.items_per_image)
+            self.stage_model = {s: (a * scale, b * scale) for s, (a, b) in self.stage_model.items()}
+
+    def stage_seconds(self, stage: str, items: float) -> float:
+        intercept, slope = self.stage_model[stage]
+        return intercept + slope * items
+
+    def image_seconds(self, items: float) -> float:
+        return sum(self.stage_seconds(stage, items) for stage in STAGES)
+
+    def image_calls(self, api: str, items: float) -> float:
+        intercept, slope = self.call_model[api]
+        return intercept + slope * items
+
+    def predict(self, images: int, concurrency: int) -> Dict:
+        """Predicted wall time (seconds) and cost (USD) for a batch"""
+        items = self.items_per_image
+        per_image = self.image_seconds(items) + INTER_IMAGE_DELAY
+        wall = math.ceil(images / concurrency) * per_image
+
+        # A backend serving fewer requests than `concurrency` becomes the bottleneck
+        for stage in STAGES:
+            lanes = min(concurrency, BACKEND_LIMITS[stage])
+            wall = max(wall, images * self.stage_seconds(stage, items) / lanes)
+
+        search_calls = images * self.image_calls('search', items)
+        select_calls = images * self.image_calls('select', items)
+        cost = (images * ANALYZE_COST_PER_IMAGE
+                + search_calls * SERPER_COST_PER_CALL
+                + select_calls * SELECT_COST_PER_CALL)
+        return {
+            'concurrency': concurrency,
+            'wall_seconds': round(wall, 1),
+            'cost_usd': round(cost, 2),
+            'search_calls': round(search_calls),
+            'select_calls': round(select_calls),
+        }
+
+    def recommend(self, images: int, deadline_seconds: float) -> Dict:
+        """Lowest concurrency meeting the deadline within backend limits"""
+        # Every worker runs all stages, so the tightest backend caps concurrency
+        max_concurrency = min(BACKEND_LIMITS.values())
+        best = None
+        for concurrency in range(1, max_concurrency + 1):
+            plan = self.predict(images, concurrency)
+            if best is None or plan['wall_seconds'] < best['wall_seconds']:
+                best = plan
+            if plan['wall_seconds'] <= deadline_seconds:
+                return dict(plan, meets_deadline=True)
+        return dict(best, meets_deadline=False)
+
+
+def print_plan(planner: BatchPlanner, images: int, concurrency: int, deadline_minutes: Optional[float] = None):
+    plan = planner.predict(images, concurrency)
+    print(f'📈 Plan from {len(planner.records)} past images '
+          f'({planner.items_per_image:.1f} items/image, stage samples: '
+          + ', '.join(f'{s}={n}' for s, n in planner.samples.items()) + ')')
+    for stage in STAGES:
+        intercept, slope = planner.stage_model[stage]
+        print(f'   {stage:<8} {intercept:5.1f}s + {slope:4.1f}s/item')
+    for api in APIS:
+        intercept, slope = planner.call_model[api]
+        print(f'   {api + " API":<10} {intercept:4.1f} + {slope:4.1f} calls/item ({planner.call_samples[api]} samples)')
+    print(f'\n💰 Estimated cost: ${plan["cost_usd"]:.2f} '
+          f'({plan["search_calls"]} search calls, {plan["select_calls"]} selection calls)')
+    print(f'⏱️  Estimated time: {plan["wall_seconds"] / 60:.1f} minutes at concurrency {concurrency}')
+
+    if deadline_minutes:
+        rec = planner.recommend(images, deadline_minutes * 60)
+        if rec['meets_deadline']:
+            print(f'👉 Concurrency {rec["concurrency"]} finishes in ~{rec["wall_seconds"] / 60:.1f} min '
+                  f'(deadline {deadline_minutes:.0f} min)')
+        else:
+            print(f'⚠️  Deadline {deadline_minutes:.0f} min not reachable within backend limits; '
+                  f'best is ~{rec["wall_seconds"] / 60:.1f} min at concurrency {rec["concurrency"]}')
+    return plan
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Predict batch wall time and cost from past runs')
+    parser.add_argument('--results-dir', default='/Users/levit/Desktop/mvp/brands_results')
+    parser.add_argument('--images', type=int, required=True, help='Images in the planned batch')
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--deadline-minutes', type=float, default=None)
+    args = parser.parse_args()
+
+    planner = BatchPlanner(load_run_records(args.results_dir))
+    print_plan(planner, args.images, args.concurrency, args.deadline_minutes)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
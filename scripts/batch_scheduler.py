@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Cost-aware scheduling for batch runs.
+
+Each user's cost is estimated up front from the image (bytes from a HEAD request,
+dimensions from the first bytes of the file) plus the item count of a cached
+analysis when one exists. Jobs are then dispatched to the worker pool
+cheapest-first (sjf), most-expensive-first (ljf, best for makespan) or in file
+order (fifo), and the batch reports median time-to-result and makespan.
+"""
+
+import io
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+# Cost model (seconds) - rough fit of upload + analyze + search per user
+BASE_SECONDS = 20.0
+SECONDS_PER_MB = 4.0
+SECONDS_PER_MEGAPIXEL = 1.5
+SECONDS_PER_ITEM = 12.0
+DEFAULT_ITEMS = 2  # when no cached analysis exists
+HEADER_BYTES = 64 * 1024  # enough for JPEG/PNG/WebP dimensions
+ESTIMATE_WORKERS = 16
+ESTIMATE_TIMEOUT = 10
+
+POLICIES = ('sjf', 'ljf', 'fifo')
+PAUSE_SECONDS = 2.0  # pacing between a worker's jobs, to avoid rate limiting
+
+
+def cached_item_counts(result_dir: Path) -> Dict[str, int]:
+    """{phone: item count} from previous *_result.json files"""
+    counts = {}
+    for path in Path(result_dir).glob('*_result.json'):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                counts[path.name[:-len('_result.json')]] = len(json.load(f).get('items', []))
+        except (json.JSONDecodeError, OSError):
+            continue
+    return counts
+
+
+def probe_image(url: str) -> Dict:
+    """Size in bytes and (width, height) without downloading the whole image"""
+    from PIL import Image
+
+    info = {'bytes': None, 'width': None, 'height': None}
+    try:
+        head = requests.head(url, timeout=ESTIMATE_TIMEOUT, allow_redirects=True)
+        if head.headers.get('Content-Length'):
+            info['bytes'] = int(head.headers['Content-Length'])
+    except requests.RequestException:
+        pass
+
+    try:
+        response = requests.get(url, headers={'Range': f'bytes=0-{HEADER_BYTES - 1}'},
+                                timeout=ESTIMATE_TIMEOUT, stream=True)
+        data = response.raw.read(HEADER_BYTES, decode_content=True)
+        response.close()
+        if info['bytes'] is None:
+            content_range = response.headers.get('Content-Range', '')
+            if '/' in content_range and not content_range.endswith('*'):
+                info['bytes'] = int(content_range.rsplit('/', 1)[1])
+        with Image.open(io.BytesIO(data)) as img:
+            info['width'], info['height'] = img.size
+    except Exception:
+        pass
+    return info
+
+
+def estimate_cost(image_info: Dict, items: Optional[int] = None) -> float:
+    """Predicted seconds for one user"""
+    cost = BASE_SECONDS
+    if image_info.get('bytes'):
+        cost += SECONDS_PER_MB * image_info['bytes'] / 1e6
+    if image_info.get('width') and image_info.get('height'):
+        cost += SECONDS_PER_MEGAPIXEL * image_info['width'] * image_info['height'] / 1e6
+    cost += SECONDS_PER_ITEM * (items if items is not None else DEFAULT_ITEMS)
+    return round(cost, 2)
+
+
+def estimate_jobs(jobs: List[Dict], result_dir: Optional[Path] = None) -> List[Dict]:
+    """Add 'image', 'items' and 'cost' to each {'key', 'image_url', ...} job"""
+    item_counts = cached_item_counts(result_dir) if result_dir else {}
+    print(f'📐 Estimating cost for {len(jobs)} users ({len(item_counts)} cached analyses)...')
+    with ThreadPoolExecutor(max_workers=ESTIMATE_WORKERS) as pool:
+        infos = list(pool.map(lambda job: probe_image(job['image_url']), jobs))
+    for job, info in zip(jobs, infos):
+        job['image'] = info
+        job['items'] = item_counts.get(job['key'])
+        job['cost'] = estimate_cost(info, job['items'])
+    return jobs
+
+
+def order_jobs(jobs: List[Dict], policy: str = 'sjf') -> List[Dict]:
+    if policy == 'sjf':
+        return sorted(jobs, key=lambda job: job['cost'])
+    if policy == 'ljf':
+        return sorted(jobs, key=lambda job: job['cost'], reverse=True)
+    if policy == 'fifo':
+        return list(jobs)
+    raise ValueError(f'Unknown schedule policy: {policy}')
+
+
+def simulate(costs: List[float], workers: int, pause_seconds: float = 0.0) -> Dict:
+    """Greedy list scheduling of costs (in dispatch order) onto `workers`, pausing after each job"""
+    free_at = [0.0] * max(1, workers)
+    finishes = []
+    for cost in costs:
+        idx = free_at.index(min(free_at))
+        finishes.append(free_at[idx] + cost)
+        free_at[idx] = finishes[-1] + pause_seconds
+    return {
+        'median_seconds': round(statistics.median(finishes), 1) if finishes else 0.0,
+        'makespan_seconds': round(max(finishes), 1) if finishes else 0.0,
+    }
+
+
+def run_scheduled(jobs: List[Dict], fn: Callable[[Dict], Dict], workers: int = 1,
+                  pause_seconds: float = 0.0) -> List[Dict]:
+    """
+    Run fn(job) for jobs in the given order. The pool takes work in submission
+    order, so the list order is the dispatch order. Each result gets
+    'finished_at_seconds' relative to the batch start, taken before the worker's
+    pacing pause so the pause never counts toward a job's time-to-result.
+    """
+    batch_start = time.time()
+
+    def timed(job):
+        result = fn(job)
+        result['finished_at_seconds'] = round(time.time() - batch_start, 2)
+        if pause_seconds:
+            time.sleep(pause_seconds)
+        return result
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(timed, jobs))
+
+
+def print_schedule_report(jobs: List[Dict], results: List[Dict], policy: str, workers: int,
+                          pause_seconds: float = 0.0):
+    """Predicted median/makespan per policy next to the actual run"""
+    print(f'\n📅 Schedule ({workers} workers, policy: {policy})')
+    print(f'{"Policy":<8} {"Pred. median":>13} {"Pred. makespan":>15}')
+    for name in POLICIES:
+        predicted = simulate([job['cost'] for job in order_jobs(jobs, name)], workers, pause_seconds)
+        marker = ' ←' if name == policy else ''
+        print(f'{name:<8} {predicted["median_seconds"]:>12.0f}s {predicted["makespan_seconds"]:>14.0f}s{marker}')
+
+    finishes = [r['finished_at_seconds'] for r in results if 'finished_at_seconds' in r]
+    if finishes:
+        print(f'Actual:  median time-to-result {statistics.median(finishes):.0f}s, '
+              f'makespan {max(finishes):.0f}s')
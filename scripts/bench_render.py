@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Render benchmark + budget gate for the result page generators.
+
+Feeds synthetic results of increasing size (categories x products) into each
+generate_html_page and records render time, peak allocations and output bytes.
+With a stored baseline (render_baseline.json) it exits non-zero when any case
+regresses past its budget, so template edits can't quietly make bulk
+regeneration slow or pages heavy.
+
+Usage:
+    python3 bench_render.py                     # compare against the baseline
+    python3 bench_render.py --update-baseline   # accept the current numbers
+"""
+
+import gc
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import generate_results_pages_mvp
+import html_generator
+import html_generator_mobile
+
+GENERATORS: Dict[str, Callable[[str, Dict], str]] = {
+    'html_generator_mobile': html_generator_mobile.generate_html_page,
+    'html_generator': html_generator.generate_html_page,
+    'generate_results_pages_mvp': generate_results_pages_mvp.generate_html_page,
+}
+
+# (categories, products per category)
+SIZES = [(1, 5), (3, 10), (6, 20), (12, 40)]
+REPEATS = 15
+
+BASELINE_FILE = Path(__file__).parent / 'render_baseline.json'
+
+# Allowed regression over the baseline
+TIME_TOLERANCE = 0.30        # render time is noisy across machines
+TIME_SLACK_MS = 0.5          # ignore sub-millisecond jitter on tiny pages
+BYTES_TOLERANCE = 0.02
+PEAK_TOLERANCE = 0.25
+
+CATEGORIES = ['tops', 'bottoms', 'dress', 'shoes', 'bag', 'accessory']
+
+
+def synthetic_result(categories: int, products: int) -> Dict:
+    """Result dict in the shape every generator reads (items + cropped_data + search_results)"""
+    items, results = [], {}
+    for index in range(categories):
+        category = CATEGORIES[index % len(CATEGORIES)]
+        items.append({
+            'category': category,
+            'groundingdino_prompt': f'{category} {index}',
+            'description': f'Synthetic {category} number {index} with a longer description for realism',
+            'croppedImageUrl': f'https://cdn.example.com/crops/{category}_{index}.jpg',
+        })
+        results[f'{category}_{index + 1}'] = [{
+            'title': f'상품 {index}-{n} 브랜드 컬렉션 오버사이즈 핏 데일리 아이템',
+            'link': f'https://shop.example.com/products/{index}/{n}?utm_source=fashionsource',
+            'thumbnail': f'https://cdn.example.com/thumbs/{index}_{n}.jpg',
+        } for n in range(products)]
+
+    return {
+        'phone': '01000000000',
+        'status': 'success',
+        'original_url': 'https://cdn.example.com/uploads/original.jpg',
+        'uploaded_url': 'https://cdn.example.com/uploads/original.jpg',
+        'items': items,
+        'cropped_data': {'items': items},
+        'search_results': {'results': results},
+    }
+
+
+def measure(generate: Callable[[str, Dict], str], result: Dict, repeats: int = REPEATS) -> Dict:
+    html = generate(result['phone'], result)  # warm-up, and the output to size
+
+    timings = []
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            generate(result['phone'], result)
+            timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    generate(result['phone'], result)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'render_ms': round(statistics.median(timings), 3),
+        'peak_kb': round(peak / 1024, 1),
+        'output_bytes': len(html.encode('utf-8')),
+    }
+
+
+def run_benchmarks(generators: List[str], sizes=SIZES, repeats: int = REPEATS) -> Dict[str, Dict]:
+    report = {}
+    for name in generators:
+        for categories, products in sizes:
+            case = f'{name}/{categories}x{products}'
+            report[case] = measure(GENERATORS[name], synthetic_result(categories, products), repeats)
+    return report
+
+
+def over_budget(current: Dict, baseline: Dict) -> List[str]:
+    """Human-readable budget violations of one case"""
+    problems = []
+    if current['render_ms'] > baseline['render_ms'] * (1 + TIME_TOLERANCE) + TIME_SLACK_MS:
+        problems.append(f'render {baseline["render_ms"]:.2f} → {current["render_ms"]:.2f} ms')
+    if current['output_bytes'] > baseline['output_bytes'] * (1 + BYTES_TOLERANCE):
+        problems.append(f'output {baseline["output_bytes"]:,} → {current["output_bytes"]:,} bytes')
+    if current['peak_kb'] > baseline['peak_kb'] * (1 + PEAK_TOLERANCE):
+        problems.append(f'peak {baseline["peak_kb"]:.0f} → {current["peak_kb"]:.0f} KB')
+    return problems
+
+
+def print_report(report: Dict[str, Dict], baseline: Dict[str, Dict]):
+    print(f'\n{"Case":<42} {"Render":>10} {"Peak":>9} {"Output":>10} {"vs baseline":>12}')
+    print('-' * 87)
+    for case, row in report.items():
+        base = baseline.get(case)
+        delta = f'{(row["render_ms"] / base["render_ms"] - 1):+.0%}' if base and base['render_ms'] else 'new'
+        print(f'{case:<42} {row["render_ms"]:>8.2f}ms {row["peak_kb"]:>7.0f}KB '
+              f'{row["output_bytes"] / 1024:>8.1f}KB {delta:>12}')
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark HTML generators against a stored budget')
+    parser.add_argument('--generators', nargs='+', choices=sorted(GENERATORS), default=list(GENERATORS))
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--baseline', default=str(BASELINE_FILE))
+    parser.add_argument('--update-baseline', action='store_true', help='Store the current numbers as the baseline')
+    args = parser.parse_args()
+
+    baseline_path = Path(args.baseline)
+    baseline = {}
+    if baseline_path.exists():
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    print(f'⏱️  Rendering {len(args.generators)} generators × {len(SIZES)} sizes ({args.repeats} repeats)...')
+    report = run_benchmarks(args.generators, repeats=args.repeats)
+    print_report(report, baseline)
+
+    if args.update_baseline:
+        baseline.update(report)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'\n💾 Baseline updated: {baseline_path}')
+        return 0
+
+    if not baseline:
+        print(f'\n⚠️  No baseline at {baseline_path}; run with --update-baseline to create one')
+        return 0
+
+    failures = {case: over_budget(row, baseline[case]) for case, row in report.items() if case in baseline}
+    failures = {case: problems for case, problems in failures.items() if problems}
+    if failures:
+        print(f'\n❌ {len(failures)} cases over budget:')
+        for case, problems in failures.items():
+            print(f'   {case}: {"; ".join(problems)}')
+        return 1
+
+    print(f'\n✅ All {len(report)} cases within budget')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
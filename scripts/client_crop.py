@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Client-side cropping from detection boxes.
+
+/api/detect-dinox already returns a box per item, so instead of waiting for the
+GPU backend's GroundingDINO crop pass the boxes are cropped here from the
+original we already hold: padded, clamped to a sane aspect ratio, cropped in a
+process pool, encoded as JPEG/WebP and uploaded concurrently through
+/api/upload-cropped. The result has the same item shape as /api/analyze, so the
+crops go straight into `croppedImages` for search.
+"""
+
+import base64
+import io
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import requests
+
+# Configuration
+FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:3000')
+PADDING = 0.08              # fraction of the box added on every side
+MIN_ASPECT = 0.5            # width / height limits; the short side is grown to fit
+MAX_ASPECT = 2.0
+MIN_CROP_PIXELS = 64
+MAX_CROP_SIDE = 1024
+CROP_FORMAT = 'jpeg'        # jpeg | webp
+CROP_QUALITY = 88
+CROP_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+UPLOAD_WORKERS = 8
+
+# detect-dinox category names → search API category ids
+CATEGORY_ALIASES = {'accessories': 'accessory'}
+
+_crop_pool = None
+
+
+def get_crop_pool() -> ProcessPoolExecutor:
+    """One process pool reused across users"""
+    global _crop_pool
+    if _crop_pool is None:
+        _crop_pool = ProcessPoolExecutor(max_workers=CROP_WORKERS)
+    return _crop_pool
+
+
+def pad_box(bbox: Sequence[float], width: int, height: int, padding: float = PADDING) -> tuple:
+    """Pixel box with padding and aspect-ratio limits, clipped to the image"""
+    x1, y1, x2, y2 = bbox
+    if max(bbox) <= 1.0:  # normalized coordinates
+        x1, x2 = x1 * width, x2 * width
+        y1, y2 = y1 * height, y2 * height
+    x1, x2 = sorted((x1, x2))
+    y1, y2 = sorted((y1, y2))
+
+    box_w, box_h = x2 - x1, y2 - y1
+    x1 -= box_w * padding
+    x2 += box_w * padding
+    y1 -= box_h * padding
+    y2 += box_h * padding
+
+    # Grow the short side so very thin boxes (belts, straps) still give a usable crop
+    box_w, box_h = max(x2 - x1, 1.0), max(y2 - y1, 1.0)
+    if box_w / box_h < MIN_ASPECT:
+        grow = (box_h * MIN_ASPECT - box_w) / 2
+        x1, x2 = x1 - grow, x2 + grow
+    elif box_w / box_h > MAX_ASPECT:
+        grow = (box_w / MAX_ASPECT - box_h) / 2
+        y1, y2 = y1 - grow, y2 + grow
+
+    # Minimum size, then clip
+    box = [x1, y1, x2, y2]
+    for lo, hi, limit in ((0, 2, width), (1, 3, height)):
+        if box[hi] - box[lo] < MIN_CROP_PIXELS:
+            grow = (MIN_CROP_PIXELS - (box[hi] - box[lo])) / 2
+            box[lo], box[hi] = box[lo] - grow, box[hi] + grow
+        box[lo], box[hi] = max(0, int(box[lo])), min(limit, int(round(box[hi])))
+    return tuple(box)
+
+
+def crop_box(image_path: str, bbox: Sequence[float], fmt: str = CROP_FORMAT,
+             quality: int = CROP_QUALITY) -> bytes:
+    """Crop one box out of the original and encode it (runs in a worker process)"""
+    from PIL import Image, ImageOps
+
+    with Image.open(image_path) as img:
+        img = ImageOps.exif_transpose(img)
+        crop = img.crop(pad_box(bbox, *img.size))
+    crop.thumbnail((MAX_CROP_SIDE, MAX_CROP_SIDE), Image.LANCZOS)
+    if crop.mode not in ('RGB', 'L'):
+        crop = crop.convert('RGB')
+
+    buffer = io.BytesIO()
+    crop.save(buffer, format=fmt.upper(), quality=quality)
+    return buffer.getvalue()
+
+
+def box_category(box: Dict) -> str:
+    category = box.get('mapped_category') or 'accessory'
+    return CATEGORY_ALIASES.get(category, category)
+
+
+def detect_boxes(image_url: str, frontend_url: str = FRONTEND_URL) -> List[Dict]:
+    """DINO-X boxes from /api/detect-dinox (normalized [x1, y1, x2, y2])"""
+    response = requests.post(f'{frontend_url}/api/detect-dinox', json={'imageUrl': image_url}, timeout=90)
+    response.raise_for_status()
+    return response.json().get('bboxes', [])
+
+
+def upload_crop(data: bytes, category: str, fmt: str = CROP_FORMAT,
+                frontend_url: str = FRONTEND_URL) -> str:
+    data_url = f'data:image/{fmt};base64,' + base64.b64encode(data).decode('ascii')
+    response = requests.post(f'{frontend_url}/api/upload-cropped',
+                             json={'dataUrl': data_url, 'category': category}, timeout=60)
+    response.raise_for_status()
+    url = response.json().get('url')
+    if not url:
+        raise Exception('No url in upload-cropped response')
+    return url
+
+
+def crop_and_upload(original, boxes: List[Dict], fmt: str = CROP_FORMAT,
+                    frontend_url: str = FRONTEND_URL) -> List[Dict]:
+    """
+    Crop every box from `original` (a path or the image bytes) and upload the
+    crops; returns analyze-style items with croppedImageUrl.
+    """
+    if not boxes:
+        return []
+
+    tmp_path = None
+    if isinstance(original, (bytes, bytearray)):
+        fd, tmp_path = tempfile.mkstemp(suffix='.img')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(original)
+        original = tmp_path
+
+    try:
+        pool = get_crop_pool()
+        crop_futures = [pool.submit(crop_box, str(original), box['bbox'], fmt) for box in boxes]
+
+        def upload(crop_future, box):
+            return upload_crop(crop_future.result(), box_category(box), fmt, frontend_url)
+
+        # Upload each crop as soon as it is encoded
+        with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as uploads:
+            urls = list(uploads.map(upload, crop_futures, boxes))
+    finally:
+        if tmp_path:
+            os.unlink(tmp_path)
+
+    items = []
+    for box, url in zip(boxes, urls):
+        items.append({
+            'category': box_category(box),
+            'groundingdino_prompt': box.get('category', ''),
+            'description': box.get('category', ''),
+            'croppedImageUrl': url,
+            'bbox': box['bbox'],
+            'confidence': box.get('confidence'),
+        })
+    return items
+
+
+def client_side_crop(original, image_url: str, frontend_url: str = FRONTEND_URL) -> Optional[List[Dict]]:
+    """Detect + crop locally; None when detection gives nothing (caller falls back to /api/analyze)"""
+    start_time = time.time()
+    boxes = detect_boxes(image_url, frontend_url)
+    detect_seconds = time.time() - start_time
+    if not boxes:
+        return None
+    items = crop_and_upload(original, boxes, frontend_url=frontend_url)
+    print(f'  ✂️  Client-side crop: {len(items)} items '
+          f'(detect {detect_seconds:.1f}s, crop + upload {time.time() - start_time - detect_seconds:.1f}s)')
+    return items
+
+
+def main():
+    """Crop a local image with boxes detected on its uploaded URL"""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='Client-side crop from DINO-X boxes')
+    parser.add_argument('image_path')
+    parser.add_argument('image_url', help='Public URL of the same image (for detection)')
+    parser.add_argument('--frontend-url', default=FRONTEND_URL)
+    args = parser.parse_args()
+
+    items = client_side_crop(args.image_path, args.image_url, args.frontend_url) or []
+    print(json.dumps(items, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
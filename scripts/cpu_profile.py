@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+CPU profiling hooks shared by the batch, regenerate and report scripts.
+
+Every entry point takes the same flags (add_profile_args) and wraps its stages
+in CPU.stage(name):
+
+    --profile-cpu sample     stack sampler on a CPU-time timer (low overhead,
+                             safe on production-sized batches); writes collapsed
+                             stacks that flamegraph.pl / speedscope read directly
+    --profile-cpu cprofile   deterministic cProfile; writes .pstats
+    --profile-stage render   only profile these stages (repeatable; default all)
+
+Usage:
+    python3 regenerate_with_hashes.py --profile-cpu sample --profile-stage render
+    python3 cpu_profile.py cpu_profile_20250101_120000.pstats   # print a saved pstats file
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import signal
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterable, Optional
+
+MODES = ('sample', 'cprofile')
+SAMPLE_INTERVAL_MS = 5.0
+# Fallback sampler thread (no SIGPROF): it needs the GIL to look at other threads,
+# and with the default 5ms switch interval it mostly gets it at I/O
+SAMPLE_SWITCH_INTERVAL = 0.0002
+TOP_FUNCTIONS = 20
+
+
+def add_profile_args(parser):
+    """The uniform --profile-* flags"""
+    parser.add_argument('--profile-cpu', choices=MODES, default=None,
+                        help='CPU profile: sample (collapsed stacks) or cprofile (pstats)')
+    parser.add_argument('--profile-stage', action='append', default=None,
+                        help='Only profile this stage (repeatable; default: every stage)')
+    parser.add_argument('--profile-interval', type=float, default=SAMPLE_INTERVAL_MS,
+                        help='Sampling interval in ms')
+    parser.add_argument('--profile-output', default=None,
+                        help='Output path prefix (default: cpu_profile_<timestamp>)')
+
+
+def frame_label(code) -> str:
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+class CpuProfiler:
+    """Stage-scoped CPU profiler; a no-op until start()"""
+
+    def __init__(self):
+        self.mode = None
+        self.stages = None
+        self.interval = SAMPLE_INTERVAL_MS / 1000
+        self.output = None
+        self.samples = Counter()
+        self.skipped = 0
+        self._local = threading.local()
+        self._lock = threading.RLock()  # also taken in the SIGPROF handler
+        self._profiles = []
+        self._active = {}  # thread id → that thread's stage stack
+        self._stop = threading.Event()
+        self._sampler = None
+        self._switch_interval = None
+
+    def start(self, mode: str, stages: Optional[Iterable[str]] = None,
+              interval_ms: float = SAMPLE_INTERVAL_MS, output: Optional[str] = None):
+        self.mode = mode
+        self.stages = set(stages) if stages else None
+        self.interval = interval_ms / 1000
+        self.output = output or f'cpu_profile_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
+        scope = ', '.join(sorted(self.stages)) if self.stages else 'all stages'
+        print(f'🔬 CPU profiling ({mode}, {scope}) → {self.output}.*')
+        if mode != 'sample':
+            return self
+
+        if hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread():
+            # The handler runs in the main thread with the interrupted frame, so
+            # time inside long C calls is charged to the Python frame that made them
+            signal.signal(signal.SIGPROF, self._on_signal)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        else:
+            self._switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(min(self._switch_interval, SAMPLE_SWITCH_INTERVAL))
+            self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+            self._sampler.start()
+        return self
+
+    @classmethod
+    def from_args(cls, args) -> 'CpuProfiler':
+        profiler = cls()
+        if args.profile_cpu:
+            profiler.start(args.profile_cpu, args.profile_stage, args.profile_interval, args.profile_output)
+        return profiler
+
+    def _in_scope(self, stack) -> bool:
+        return bool(stack) and (self.stages is None or any(name in self.stages for name in stack))
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.mode:
+            yield
+            return
+
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        was_active = self._in_scope(stack)
+        stack.append(name)
+        starting = not was_active and self._in_scope(stack)
+        profile = self._begin(stack) if starting else None
+        try:
+            yield
+        finally:
+            stack.pop()
+            if starting:
+                self._end(profile)
+
+    def _begin(self, stack):
+        if self.mode == 'sample':
+            with self._lock:
+                self._active[threading.get_ident()] = stack
+            return None
+
+        profile = getattr(self._local, 'profile', None)
+        if profile is None:
+            profile = self._local.profile = cProfile.Profile()
+            with self._lock:
+                self._profiles.append(profile)
+        try:
+            profile.enable()
+        except ValueError:
+            # Only one profiler may be active per process on newer Pythons
+            with self._lock:
+                self.skipped += 1
+            return None
+        return profile
+
+    def _end(self, profile):
+        if self.mode == 'sample':
+            with self._lock:
+                self._active.pop(threading.get_ident(), None)
+        elif profile is not None:
+            profile.disable()
+
+    def _take_sample(self, main_frame=None):
+        frames = sys._current_frames()
+        if main_frame is not None:
+            frames[threading.main_thread().ident] = main_frame
+        with self._lock:
+            active = [(frames.get(ident), stack[-1]) for ident, stack in self._active.items() if stack]
+            for frame, stage in active:
+                labels = []
+                while frame is not None:
+                    labels.append(frame_label(frame.f_code))
+                    frame = frame.f_back
+                if labels:
+                    self.samples[';'.join([stage] + labels[::-1])] += 1
+
+    def _on_signal(self, signum, frame):
+        self._take_sample(frame)
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            self._take_sample()
+
+    def finish(self) -> Optional[str]:
+        """Stop profiling, write the output and print the hottest functions"""
+        if not self.mode:
+            return None
+        self._stop.set()
+        if self._sampler:
+            self._sampler.join()
+            sys.setswitchinterval(self._switch_interval)
+        elif self.mode == 'sample':
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, signal.SIG_DFL)
+
+        if self.mode == 'sample':
+            path = f'{self.output}.collapsed'
+            with open(path, 'w', encoding='utf-8') as f:
+                for stack, count in sorted(self.samples.items()):
+                    f.write(f'{stack} {count}\n')
+            print_samples(self.samples)
+        else:
+            path = f'{self.output}.pstats'
+            profiles = [p for p in self._profiles if p.getstats()]
+            if not profiles:
+                print('⚠️  No profiled stage ran')
+                return None
+            stats = pstats.Stats(*profiles)
+            stats.dump_stats(path)
+            print_stats(stats)
+            if self.skipped:
+                print(f'⚠️  {self.skipped} stage calls not profiled (another profiler was active; use --workers 1)')
+        print(f'💾 CPU profile: {path}')
+        return path
+
+
+def print_samples(samples: Counter, top: int = TOP_FUNCTIONS):
+    total = sum(samples.values())
+    if not total:
+        print('⚠️  No samples taken (no profiled stage ran long enough)')
+        return
+    self_time, stage_time = Counter(), Counter()
+    for stack, count in samples.items():
+        frames = stack.split(';')
+        self_time[frames[-1]] += count
+        stage_time[frames[0]] += count
+
+    print(f'\n🔬 {total} samples')
+    for stage, count in stage_time.most_common():
+        print(f'   {stage:<14} {count / total:>6.1%}')
+    print(f'\n{"Self":>7}  Function')
+    for label, count in self_time.most_common(top):
+        print(f'{count / total:>7.1%}  {label}')
+
+
+def print_stats(stats: pstats.Stats, top: int = TOP_FUNCTIONS):
+    buffer = io.StringIO()
+    stats.stream = buffer
+    stats.sort_stats('cumulative').print_stats(top)
+    stats.sort_stats('tottime').print_stats(top)
+    print(buffer.getvalue())
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Print a saved CPU profile')
+    parser.add_argument('profile', help='.pstats or .collapsed file')
+    parser.add_argument('--top', type=int, default=TOP_FUNCTIONS)
+    args = parser.parse_args()
+
+    if args.profile.endswith('.collapsed'):
+        samples = Counter()
+        with open(args.profile, 'r', encoding='utf-8') as f:
+            for line in f:
+                stack, _, count = line.rstrip('\n').rpartition(' ')
+                samples[stack] += int(count)
+        print_samples(samples, args.top)
+    else:
+        print_stats(pstats.Stats(args.profile), args.top)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,10 +2,19 @@
 """
 Create result page from existing Supabase session
 For user: 01024450277 (cap image)
+
+Bulk mode (--bulk) rebuilds pages for every app user: sessions are paged by a
+created_at watermark with keyset pagination, time windows are fetched
+concurrently, and users whose latest session was already rendered are skipped.
+Sessions are inserted before their phone number and search results arrive, so
+the watermark never moves past a session that is still being filled in.
+Point NEXT_PUBLIC_SUPABASE_URL at a local PostgREST to try it without production.
 """
 import os
 import sys
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from supabase import create_client, Client
 import json
 
@@ -18,135 +27,336 @@ from html_generator_mobile import generate_html_page
 PHONE = '01024450277'
 SUPABASE_URL = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
 SUPABASE_KEY = os.getenv('NEXT_PUBLIC_SUPABASE_ANON_KEY')
+PUBLIC_DIR = Path('./public/results')
+
+# Cap user defaults (single-user mode)
+CAP_CATEGORY = 'accessory'
+CAP_CROPPED_URL = 'https://ssfiahbvlzepvddglawo.supabase.co/storage/v1/object/public/images/accessories_item1_gray_cap_1763560721507.jpg'
+
+# Bulk mode
+BULK_STATE_FILE = Path('./session_render_state.json')
+BULK_PAGE_SIZE = 500
+BULK_FETCH_WORKERS = 4
+BULK_RENDER_WORKERS = 8
+SESSION_COLUMNS = 'id,session_id,phone_number,created_at,searched_at,uploaded_image_url,gpt_analysis,cropped_images,search_results'
+EPOCH = '1970-01-01T00:00:00+00:00'
+# Sessions still missing a phone number / search results after this long are abandoned
+INCOMPLETE_GRACE = timedelta(days=2)
+
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    print('❌ Error: Supabase credentials not found in environment')
-    print('Set NEXT_PUBLIC_SUPABASE_URL and NEXT_PUBLIC_SUPABASE_ANON_KEY')
-    sys.exit(1)
-
-print(f'\n{"="*80}')
-print(f'Creating Result Page for User: {PHONE}')
-print(f'{"="*80}\n')
-
-# Initialize Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-# Fetch most recent session for this user
-print(f'📊 Fetching session from Supabase...')
-try:
-    response = supabase.table('sessions').select('*').eq('phone_number', PHONE).order('created_at', desc=True).limit(1).execute()
-    
-    if not response.data:
-        print(f'❌ No session found for phone: {PHONE}')
-        print(f'   User needs to upload an image first at: https://fashionsource.vercel.app')
+def get_supabase() -> Client:
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        print('❌ Error: Supabase credentials not found in environment')
+        print('Set NEXT_PUBLIC_SUPABASE_URL and NEXT_PUBLIC_SUPABASE_ANON_KEY')
         sys.exit(1)
-    
-    session = response.data[0]
-    print(f'✅ Found session: {session["session_id"]}')
-    print(f'   Created: {session["created_at"]}')
-    print(f'   Image: {session.get("uploaded_image_url", "N/A")}')
-    
-except Exception as e:
-    print(f'❌ Error fetching session: {e}')
-    sys.exit(1)
-
-# Parse session data
-print(f'\n📦 Processing session data...')
-items = []
-search_results = {}
-
-# Get items from gpt_analysis
-if session.get('gpt_analysis') and 'items' in session['gpt_analysis']:
-    gpt_items = session['gpt_analysis']['items']
-    print(f'   GPT detected: {len(gpt_items)} items')
-    
-    # Get cropped images
-    cropped_imgs = session.get('cropped_images', [])
-    if isinstance(cropped_imgs, str):
-        try:
-            cropped_imgs = json.loads(cropped_imgs)
-        except:
-            cropped_imgs = []
-    
-    # Match items with cropped images
-    for idx, item in enumerate(gpt_items):
-        # Find matching cropped image
-        cropped_url = None
-        if cropped_imgs and idx < len(cropped_imgs):
-            cropped_url = cropped_imgs[idx].get('url') if isinstance(cropped_imgs[idx], dict) else None
-        
-        items.append({
-            'category': 'accessory',  # The cap is categorized as accessory
-            'groundingdino_prompt': item.get('groundingdino_prompt', ''),
-            'description': item.get('description', ''),
-            'croppedImageUrl': cropped_url or f'https://ssfiahbvlzepvddglawo.supabase.co/storage/v1/object/public/images/accessories_item1_gray_cap_1763560721507.jpg'
-        })
-
-# Get search results
-if session.get('search_results'):
-    search_results = session['search_results']
-    if isinstance(search_results, str):
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
+
+def parse_json_field(value, default):
+    """JSONB columns sometimes come back as strings"""
+    if isinstance(value, str):
         try:
-            search_results = json.loads(search_results)
-        except:
-            search_results = {}
-
-print(f'   Items to display: {len(items)}')
-
-# Create result data
-result_data = {
-    'phone': PHONE,
-    'original_url': session.get('uploaded_image_url', ''),
-    'items': items,
-    'search_results': search_results,
-    'status': 'success'
-}
-
-# Generate secure hash
-hashed_id = hash_phone(PHONE)
-print(f'\n🔒 Secure Hash: {hashed_id}')
-
-# Generate HTML
-print(f'🎨 Generating HTML page...')
-try:
-    html_content = generate_html_page(PHONE, result_data)
-    
-    # Save to public/results
-    public_dir = Path('./public/results')
-    public_dir.mkdir(parents=True, exist_ok=True)
-    html_file = public_dir / f'{hashed_id}.html'
-    
+            return json.loads(value)
+        except json.JSONDecodeError:
+            return default
+    return value if value is not None else default
+
+
+def build_result_data(session: dict, phone: str, default_category: str = None,
+                      fallback_cropped_url: str = '') -> dict:
+    """Turn a sessions row into the result dict html_generator_mobile expects"""
+    items = []
+
+    # Get items from gpt_analysis
+    gpt_analysis = parse_json_field(session.get('gpt_analysis'), {}) or {}
+    if 'items' in gpt_analysis:
+        gpt_items = gpt_analysis['items']
+
+        # Get cropped images
+        cropped_imgs = parse_json_field(session.get('cropped_images'), []) or []
+
+        # Match items with cropped images
+        for idx, item in enumerate(gpt_items):
+            # Find matching cropped image
+            cropped = cropped_imgs[idx] if idx < len(cropped_imgs) and isinstance(cropped_imgs[idx], dict) else {}
+            category = default_category or cropped.get('category') or item.get('category') or 'accessory'
+
+            items.append({
+                'category': category,
+                'groundingdino_prompt': item.get('groundingdino_prompt', ''),
+                'description': item.get('description', ''),
+                'croppedImageUrl': cropped.get('url') or fallback_cropped_url
+            })
+
+    # Get search results
+    search_results = parse_json_field(session.get('search_results'), {}) or {}
+
+    return {
+        'phone': phone,
+        'original_url': session.get('uploaded_image_url', ''),
+        'items': items,
+        'search_results': search_results,
+        'status': 'success'
+    }
+
+
+def write_result_page(phone: str, result_data: dict) -> Path:
+    """Render and save public/results/{hashed_id}.html"""
+    hashed_id = hash_phone(phone)
+    html_content = generate_html_page(phone, result_data)
+
+    PUBLIC_DIR.mkdir(parents=True, exist_ok=True)
+    html_file = PUBLIC_DIR / f'{hashed_id}.html'
     with open(html_file, 'w', encoding='utf-8') as f:
         f.write(html_content)
-    
-    print(f'✅ Saved: {html_file}')
-    
-except Exception as e:
-    print(f'❌ Error generating HTML: {e}')
-    import traceback
-    traceback.print_exc()
-    sys.exit(1)
+    return html_file
+
+
+def create_single_result(phone: str = PHONE):
+    """Original flow: latest session of one phone number → result page"""
+    print(f'\n{"="*80}')
+    print(f'Creating Result Page for User: {phone}')
+    print(f'{"="*80}\n')
+
+    # Initialize Supabase client
+    supabase = get_supabase()
+
+    # Fetch most recent session for this user
+    print(f'📊 Fetching session from Supabase...')
+    try:
+        response = supabase.table('sessions').select('*').eq('phone_number', phone).order('created_at', desc=True).limit(1).execute()
+
+        if not response.data:
+            print(f'❌ No session found for phone: {phone}')
+            print(f'   User needs to upload an image first at: https://fashionsource.vercel.app')
+            sys.exit(1)
+
+        session = response.data[0]
+        print(f'✅ Found session: {session["session_id"]}')
+        print(f'   Created: {session["created_at"]}')
+        print(f'   Image: {session.get("uploaded_image_url", "N/A")}')
+
+    except Exception as e:
+        print(f'❌ Error fetching session: {e}')
+        sys.exit(1)
+
+    # Parse session data
+    print(f'\n📦 Processing session data...')
+    if phone == PHONE:
+        # The cap is categorized as accessory
+        result_data = build_result_data(session, phone, CAP_CATEGORY, CAP_CROPPED_URL)
+    else:
+        result_data = build_result_data(session, phone)
+    items = result_data['items']
+    print(f'   Items to display: {len(items)}')
+
+    # Generate secure hash
+    hashed_id = hash_phone(phone)
+    print(f'\n🔒 Secure Hash: {hashed_id}')
+
+    # Generate HTML
+    print(f'🎨 Generating HTML page...')
+    try:
+        html_file = write_result_page(phone, result_data)
+        print(f'✅ Saved: {html_file}')
+
+    except Exception as e:
+        print(f'❌ Error generating HTML: {e}')
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+    # Print results
+    print(f'\n{"="*80}')
+    print(f'✅ SUCCESS! Result page created! 🎉')
+    print(f'{"="*80}\n')
+    print(f'📱 Phone: {phone}')
+    print(f'🔒 Secure Hash: {hashed_id}')
+    print(f'📊 Items: {len(items)} detected')
+    print(f'\n🔗 Result Link:')
+    print(f'   https://fashionsource.vercel.app/results/{hashed_id}.html')
+    print(f'\n💬 SMS Message:')
+    print(f'   안녕하세요! 요청하신 이미지 분석 결과입니다: https://fashionsource.vercel.app/results/{hashed_id}.html')
+    print(f'\n📂 File Location:')
+    print(f'   {html_file}')
+    print(f'\n💡 Next Step:')
+    print(f'   Deploy to Vercel: cd /Users/levit/Desktop/mvp && vercel --prod')
+    print()
+
+
+# ---------------------------------------------------------------------------
+# Bulk mode
+# ---------------------------------------------------------------------------
+
+def load_bulk_state() -> dict:
+    if BULK_STATE_FILE.exists():
+        with open(BULK_STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {'watermark': {'created_at': EPOCH, 'id': ''}, 'rendered': {}}
+
+
+def save_bulk_state(state: dict):
+    tmp_file = Path(f'{BULK_STATE_FILE}.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_file, BULK_STATE_FILE)
+
+
+def eligible_sessions(supabase: Client, columns: str = SESSION_COLUMNS):
+    """Sessions that can become a result page: a phone number and search results"""
+    return (supabase.table('sessions')
+            .select(columns)
+            .not_.is_('phone_number', 'null')
+            .not_.is_('search_results', 'null'))
+
+
+def earliest_session_time(supabase: Client):
+    """created_at of the oldest eligible session (None if there are none)"""
+    rows = eligible_sessions(supabase, 'created_at').order('created_at').limit(1).execute().data or []
+    return rows[0]['created_at'] if rows else None
+
+
+def oldest_incomplete_session(supabase: Client, now: datetime):
+    """(created_at, id) of the oldest session that may still become eligible (None if none)"""
+    rows = (supabase.table('sessions')
+            .select('id,created_at')
+            .or_('phone_number.is.null,search_results.is.null')
+            .gt('created_at', (now - INCOMPLETE_GRACE).isoformat())
+            .order('created_at').order('id').limit(1).execute().data) or []
+    return rows[0] if rows else None
+
+
+def next_watermark(last: dict, incomplete: dict = None) -> dict:
+    """
+    Advance to the last fetched session, but stay behind an incomplete one.
+
+    init/route.ts inserts sessions as in_progress and the phone number / search
+    results are filled in later, so a session created before this run can become
+    eligible after it. Holding the watermark just before it (1µs, Postgres'
+    resolution) makes the next run pick it up; already rendered users are skipped.
+    """
+    if incomplete is None or (incomplete['created_at'], incomplete['id']) > (last['created_at'], last['id']):
+        return {'created_at': last['created_at'], 'id': last['id']}
+    held = datetime.fromisoformat(incomplete['created_at'].replace('Z', '+00:00')) - timedelta(microseconds=1)
+    return {'created_at': held.isoformat(), 'id': ''}
+
+
+def split_time_windows(start_iso: str, end: datetime, count: int):
+    """Split (start, end] into `count` equal windows for concurrent fetching"""
+    start = datetime.fromisoformat(start_iso.replace('Z', '+00:00'))
+    step = (end - start) / count
+    bounds = [start + step * i for i in range(count)] + [end]
+    return [(bounds[i].isoformat(), bounds[i + 1].isoformat()) for i in range(count)]
+
+
+def fetch_window(supabase: Client, after: dict, window_end: str, page_size: int = BULK_PAGE_SIZE):
+    """
+    Keyset-paginate eligible sessions with (created_at, id) > after and created_at <= window_end.
+
+    Each page continues from the last (created_at, id) seen, so pages stay cheap at
+    any depth (no OFFSET) and rows inserted mid-run don't shift the pages.
+    """
+    sessions = []
+    cursor = dict(after)
+    while True:
+        query = eligible_sessions(supabase).lte('created_at', window_end)
+        if cursor['id']:
+            ts = f'"{cursor["created_at"]}"'  # quoted: timestamps contain reserved characters
+            query = query.or_(f'created_at.gt.{ts},and(created_at.eq.{ts},id.gt.{cursor["id"]})')
+        else:
+            query = query.gt('created_at', cursor['created_at'])
+        page = query.order('created_at').order('id').limit(page_size).execute().data or []
+
+        sessions.extend(page)
+        if len(page) < page_size:
+            return sessions
+        cursor = {'created_at': page[-1]['created_at'], 'id': page[-1]['id']}
+
+
+def create_bulk_results(windows: int = BULK_FETCH_WORKERS, force: bool = False):
+    """Render a page for every user whose latest eligible session is new since the last run"""
+    supabase = get_supabase()
+    state = {'watermark': {'created_at': EPOCH, 'id': ''}, 'rendered': {}} if force else load_bulk_state()
+    watermark = state['watermark']
+    now = datetime.now(timezone.utc)
+
+    print(f'\n{"="*80}')
+    print(f'BULK RESULT PAGES FROM SESSIONS (since {watermark["created_at"]})')
+    print(f'{"="*80}\n')
+
+    # A full rebuild splits from the oldest eligible session, not from 1970, so the
+    # windows actually divide the data instead of all but the last being empty
+    start = watermark['created_at']
+    if start == EPOCH:
+        start = earliest_session_time(supabase)
+        if start is None:
+            print('✅ No eligible sessions')
+            return
+
+    # Fetch concurrently: the first window resumes from the exact (created_at, id) watermark
+    time_windows = split_time_windows(start, now, windows)
+    afters = [watermark] + [{'created_at': start, 'id': ''} for start, _ in time_windows[1:]]
+    with ThreadPoolExecutor(max_workers=windows) as pool:
+        pages = list(pool.map(lambda args: fetch_window(supabase, args[0], args[1][1]),
+                              zip(afters, time_windows)))
+    sessions = [session for page in pages for session in page]
+    print(f'📊 Fetched {len(sessions)} new sessions in {windows} windows')
+
+    if not sessions:
+        print('✅ Nothing new to render')
+        return
+
+    # Latest eligible session per phone wins (a user's page shows their newest search)
+    latest = {}
+    for session in sessions:
+        key = (session['created_at'], session['id'])
+        phone = session['phone_number']
+        if phone not in latest or key > (latest[phone]['created_at'], latest[phone]['id']):
+            latest[phone] = session
+
+    to_render = [(phone, session) for phone, session in latest.items()
+                 if state['rendered'].get(phone) != session['session_id']]
+    skipped = len(latest) - len(to_render)
+    print(f'👥 {len(latest)} users with new sessions, {skipped} already rendered, {len(to_render)} to render')
+
+    def render(args):
+        phone, session = args
+        result_data = build_result_data(session, phone)
+        if not result_data['items'] and not result_data['search_results'].get('results'):
+            return phone, session, None
+        return phone, session, write_result_page(phone, result_data)
+
+    rendered = 0
+    with ThreadPoolExecutor(max_workers=BULK_RENDER_WORKERS) as pool:
+        for phone, session, html_file in pool.map(render, to_render):
+            if html_file is None:
+                continue
+            state['rendered'][phone] = session['session_id']
+            rendered += 1
 
-# Print results
-print(f'\n{"="*80}')
-print(f'✅ SUCCESS! Result page created! 🎉')
-print(f'{"="*80}\n')
-print(f'📱 Phone: {PHONE}')
-print(f'🔒 Secure Hash: {hashed_id}')
-print(f'📊 Items: {len(items)} detected')
-print(f'\n🔗 Result Link:')
-print(f'   https://fashionsource.vercel.app/results/{hashed_id}.html')
-print(f'\n💬 SMS Message:')
-print(f'   안녕하세요! 요청하신 이미지 분석 결과입니다: https://fashionsource.vercel.app/results/{hashed_id}.html')
-print(f'\n📂 File Location:')
-print(f'   {html_file}')
-print(f'\n💡 Next Step:')
-print(f'   Deploy to Vercel: cd /Users/levit/Desktop/mvp && vercel --prod')
-print()
+    last = max(sessions, key=lambda s: (s['created_at'], s['id']))
+    state['watermark'] = next_watermark(last, oldest_incomplete_session(supabase, now))
+    save_bulk_state(state)
 
+    print(f'\n✅ Rendered {rendered} result pages into {PUBLIC_DIR}')
+    print(f'💾 Watermark: {state["watermark"]["created_at"]} (state: {BULK_STATE_FILE})')
 
 
+def main():
+    import argparse
 
+    parser = argparse.ArgumentParser(description='Create result pages from Supabase sessions')
+    parser.add_argument('--phone', default=PHONE, help='Phone number for single-user mode')
+    parser.add_argument('--bulk', action='store_true', help='Render pages for all users with new sessions')
+    parser.add_argument('--windows', type=int, default=BULK_FETCH_WORKERS, help='Concurrent fetch windows in bulk mode')
+    parser.add_argument('--force', action='store_true', help='Ignore the saved watermark and re-render everything')
+    args = parser.parse_args()
 
+    if args.bulk:
+        create_bulk_results(windows=args.windows, force=args.force)
+    else:
+        create_single_result(args.phone)
 
 
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Similarity index over crops that already went through search.
+
+Popular items (the same bag, the same cap) come back from many users, and each
+crop costs a full Serper + GPT search again. Every searched crop is reduced to
+a cheap feature vector (RGB color histogram + downscaled grayscale signature,
+L2-normalized) held in one NumPy float32 matrix together with its category and
+search results. New crops are matched in a batch with one matrix product;
+a same-category neighbour above the similarity threshold hands over its results.
+
+Usage:
+    python3 crop_similarity_index.py stats batch4_results/crop_index
+    python3 crop_similarity_index.py query batch4_results/crop_index bag https://.../crop.jpg
+"""
+
+import copy
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import requests
+from PIL import Image, ImageOps
+
+# Features
+HIST_BINS = 4               # per RGB channel → 64 bins
+SIGNATURE_SIZE = 16         # 16x16 grayscale → 256 values
+HIST_WEIGHT = 0.6           # share of the vector norm given to color
+FEATURE_DIM = HIST_BINS ** 3 + SIGNATURE_SIZE ** 2
+FETCH_WORKERS = 8
+
+# Cosine similarity above which a prior crop's results are reused
+SIMILARITY_THRESHOLD = 0.93
+
+FEATURES_FILE = 'features.npy'
+ENTRIES_FILE = 'entries.json'
+
+
+def crop_features(img: Image.Image) -> np.ndarray:
+    """Unit-length color histogram + grayscale signature"""
+    img = ImageOps.exif_transpose(img).convert('RGB')
+    small = img.resize((64, 64), Image.BILINEAR)
+
+    rgb = np.asarray(small, dtype=np.uint8).reshape(-1, 3) // (256 // HIST_BINS)
+    bins = (rgb[:, 0].astype(np.int32) * HIST_BINS + rgb[:, 1]) * HIST_BINS + rgb[:, 2]
+    hist = np.bincount(bins, minlength=HIST_BINS ** 3).astype(np.float32)
+    hist = np.sqrt(hist / hist.sum())  # Hellinger: dot product ≈ Bhattacharyya
+
+    gray = np.asarray(small.convert('L').resize((SIGNATURE_SIZE, SIGNATURE_SIZE), Image.BILINEAR),
+                      dtype=np.float32).ravel()
+    gray -= gray.mean()
+    norm = np.linalg.norm(gray)
+    gray = gray / norm if norm else gray
+
+    vector = np.concatenate([hist * np.sqrt(HIST_WEIGHT), gray * np.sqrt(1 - HIST_WEIGHT)])
+    return vector / np.linalg.norm(vector)
+
+
+def fetch_features(urls: List[str]) -> List[Optional[np.ndarray]]:
+    """Features for each crop URL (None when it can't be fetched or decoded)"""
+    def fetch(url):
+        try:
+            response = requests.get(url, timeout=20)
+            response.raise_for_status()
+            with Image.open(io.BytesIO(response.content)) as img:
+                return crop_features(img)
+        except Exception:
+            return None
+
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(urls))) as pool:
+        return list(pool.map(fetch, urls))
+
+
+class CropSimilarityIndex:
+    """Persistent feature matrix + (category, crop URL, results) per searched crop"""
+
+    def __init__(self, index_dir, threshold: float = SIMILARITY_THRESHOLD):
+        self.index_dir = Path(index_dir)
+        self.threshold = threshold
+        self.features = np.zeros((0, FEATURE_DIM), dtype=np.float32)
+        self.entries: List[Dict] = []
+        self.stats = {'lookups': 0, 'hits': 0, 'lookup_seconds': 0.0}
+        self._pending: List[np.ndarray] = []
+        self._lock = threading.Lock()
+        self.load()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def load(self):
+        features_path = self.index_dir / FEATURES_FILE
+        entries_path = self.index_dir / ENTRIES_FILE
+        if not (features_path.exists() and entries_path.exists()):
+            return
+        features = np.load(features_path)
+        with open(entries_path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        if len(entries) != len(features) or features.shape[1:] != (FEATURE_DIM,):
+            print(f'⚠️  {self.index_dir}: index doesn\'t match the current features, starting empty')
+            return
+        self.features, self.entries = features, entries
+
+    def _matrix(self) -> np.ndarray:
+        """All features (fold in rows added since the last lookup); call with the lock held"""
+        if self._pending:
+            self.features = np.vstack([self.features] + self._pending)
+            self._pending = []
+        return self.features
+
+    def save(self):
+        with self._lock:
+            features, entries = self._matrix(), list(self.entries)
+
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        tmp_features = self.index_dir / f'{FEATURES_FILE}.tmp'
+        tmp_entries = self.index_dir / f'{ENTRIES_FILE}.tmp'
+        with open(tmp_features, 'wb') as f:
+            np.save(f, features)
+        with open(tmp_entries, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(tmp_features, self.index_dir / FEATURES_FILE)
+        os.replace(tmp_entries, self.index_dir / ENTRIES_FILE)
+
+    def add(self, features: np.ndarray, category: str, crop_url: str, results: List[Dict]):
+        with self._lock:
+            self._pending.append(features.astype(np.float32)[None, :])
+            self.entries.append({'category': category, 'crop_url': crop_url,
+                                 'results': copy.deepcopy(results)})
+
+    def lookup_batch(self, features: List[Optional[np.ndarray]], categories: List[str]) -> List[Optional[Dict]]:
+        """
+        Best same-category match above the threshold for each crop:
+        {'similarity', 'crop_url', 'results'} or None.
+        """
+        start_time = time.time()
+        matches: List[Optional[Dict]] = [None] * len(features)
+        rows = [i for i, f in enumerate(features) if f is not None]
+
+        with self._lock:
+            matrix = self._matrix()
+            if rows and len(matrix):
+                queries = np.stack([features[i] for i in rows]).astype(np.float32)
+                similarity = queries @ matrix.T
+
+                # Only a neighbour of the same category may hand over its results
+                indexed = np.array([e['category'] for e in self.entries])
+                wanted = np.array([categories[i] for i in rows])
+                similarity[wanted[:, None] != indexed[None, :]] = -1.0
+
+                best = similarity.argmax(axis=1)
+                scores = similarity[np.arange(len(rows)), best]
+                for row, column, score in zip(rows, best.tolist(), scores.tolist()):
+                    if score >= self.threshold:
+                        entry = self.entries[column]
+                        matches[row] = {'similarity': round(score, 4), 'crop_url': entry['crop_url'],
+                                        'results': copy.deepcopy(entry['results'])}
+
+            self.stats['lookups'] += len(features)
+            self.stats['hits'] += sum(1 for m in matches if m)
+            self.stats['lookup_seconds'] += time.time() - start_time
+        return matches
+
+    def print_report(self):
+        lookups = self.stats['lookups']
+        if not lookups:
+            return
+        print(f'\n🧩 Crop similarity index: {len(self)} crops, {self.stats["hits"]}/{lookups} reused '
+              f'({self.stats["hits"] / lookups:.0%} hit rate, '
+              f'{self.stats["lookup_seconds"] / lookups * 1000:.2f} ms/crop)')
+
+
+def main():
+    import argparse
+    from collections import Counter
+
+    parser = argparse.ArgumentParser(description='Crop similarity index')
+    parser.add_argument('command', choices=['stats', 'query'])
+    parser.add_argument('index_dir')
+    parser.add_argument('category', nargs='?')
+    parser.add_argument('crop_urls', nargs='*')
+    parser.add_argument('--threshold', type=float, default=SIMILARITY_THRESHOLD)
+    args = parser.parse_args()
+
+    index = CropSimilarityIndex(args.index_dir, threshold=args.threshold)
+    if args.command == 'stats':
+        print(f'🧩 {len(index)} crops in {args.index_dir}')
+        for category, count in Counter(e['category'] for e in index.entries).most_common():
+            print(f'   {category:<12} {count:>6}')
+        return
+
+    features = fetch_features(args.crop_urls)
+    for url, match in zip(args.crop_urls, index.lookup_batch(features, [args.category] * len(features))):
+        if match:
+            print(f'✅ {url} ≈ {match["crop_url"]} ({match["similarity"]:.3f}, {len(match["results"])} results)')
+        else:
+            print(f'➖ {url}: no match')
+    index.print_report()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
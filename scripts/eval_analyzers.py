@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Evaluate analyzer modes on a labeled image set.
+
+Replaces the one-off comparisons (test_dinox_brands.py, test_dinox_only.py,
+test_dinox_local_pipeline.py, proper_comparison_test.py) that ran 2-5
+hard-coded images one at a time and printed the output. Every (mode, image)
+pair runs concurrently; responses are cached on disk with their original
+latency, so re-scoring or adding a mode only calls what is missing. Detections
+are matched to the labels per category by IoU (vectorized), giving
+precision / recall next to latency and cost for each mode.
+
+Labels file (JSON list), boxes normalized [x1, y1, x2, y2] and optional:
+    [{"image_url": "https://...", "labels": [{"category": "bag", "bbox": [0.1, 0.4, 0.3, 0.7]}]}]
+
+Usage:
+    python3 eval_analyzers.py labels.json --modes gpt4o dinox-hybrid detect-dinox
+"""
+
+import hashlib
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import requests
+
+MODAL_API_URL = 'https://heeyunjeon-levit--fashion-crop-api-gpu-fastapi-app-v2.modal.run/analyze'
+FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:3000')
+CACHE_DIR = Path('./eval_cache')
+
+IOU_THRESHOLD = 0.5
+WORKERS_PER_MODE = 4
+TIMEOUT = 180
+
+# Approximate API cost per image (USD)
+COST_PER_IMAGE = {
+    'gpt4o': 0.03,          # GPT-4o detection + GroundingDINO crops
+    'dinox-hybrid': 0.003,  # DINO-X detection + GPT-4o-mini descriptions
+    'detect-dinox': 0.002,  # DINO-X detection only
+}
+
+# Category names differ between backends
+CATEGORY_ALIASES = {'accessories': 'accessory', 'top': 'tops', 'bottom': 'bottoms', 'dresses': 'dress'}
+
+
+def call_modal(image_url: str, use_dinox: bool) -> Dict:
+    response = requests.post(MODAL_API_URL, json={'imageUrl': image_url, 'use_dinox': use_dinox}, timeout=TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+def call_detect_dinox(image_url: str) -> Dict:
+    response = requests.post(f'{FRONTEND_URL}/api/detect-dinox', json={'imageUrl': image_url}, timeout=TIMEOUT)
+    response.raise_for_status()
+    data = response.json()
+    items = [{'category': box.get('mapped_category'), 'bbox': box.get('bbox'), 'confidence': box.get('confidence')}
+             for box in data.get('bboxes', [])]
+    return {'items': items, 'image_size': data.get('image_size')}
+
+
+ANALYZERS = {
+    'gpt4o': lambda url: call_modal(url, use_dinox=False),
+    'dinox-hybrid': lambda url: call_modal(url, use_dinox=True),
+    'detect-dinox': call_detect_dinox,
+}
+
+
+class ResponseCache:
+    """One JSON file per (mode, image): the response and the latency it took"""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, refresh: bool = False):
+        self.cache_dir = Path(cache_dir)
+        self.refresh = refresh
+        self.hits = 0
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def path(self, mode: str, image_url: str) -> Path:
+        digest = hashlib.sha1(f'{mode}\n{image_url}'.encode('utf-8')).hexdigest()[:16]
+        return self.cache_dir / f'{mode}_{digest}.json'
+
+    def run(self, mode: str, image_url: str) -> Dict:
+        path = self.path(mode, image_url)
+        if path.exists() and not self.refresh:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            with self._lock:
+                self.hits += 1
+            return entry
+
+        start_time = time.time()
+        try:
+            entry = {'response': ANALYZERS[mode](image_url), 'seconds': round(time.time() - start_time, 2)}
+        except Exception as e:
+            # Failures aren't cached, the next run retries them
+            return {'error': str(e), 'seconds': round(time.time() - start_time, 2)}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        return entry
+
+
+def normalize_category(category: Optional[str]) -> str:
+    category = (category or 'unknown').lower()
+    return CATEGORY_ALIASES.get(category, category)
+
+
+def normalized_box(bbox, image_size) -> Optional[List[float]]:
+    """[x1, y1, x2, y2] in 0-1, or None when the box can't be placed"""
+    if not bbox or len(bbox) != 4:
+        return None
+    if max(bbox) <= 1.0:
+        return list(bbox)
+    if image_size and len(image_size) == 2:
+        width, height = image_size
+        return [bbox[0] / width, bbox[1] / height, bbox[2] / width, bbox[3] / height]
+    return None
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of (n, 4) and (m, 4) boxes → (n, m)"""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.where(union > 0, intersection / np.where(union > 0, union, 1), 0.0)
+
+
+def greedy_matches(iou: np.ndarray, threshold: float = IOU_THRESHOLD) -> int:
+    """Number of one-to-one pairs, highest IoU first"""
+    iou = iou.copy()
+    matched = 0
+    while iou.size and iou.max() >= threshold:
+        row, column = np.unravel_index(iou.argmax(), iou.shape)
+        iou[row, :] = -1
+        iou[:, column] = -1
+        matched += 1
+    return matched
+
+
+def score_image(predictions: List[Dict], labels: List[Dict], image_size=None) -> Dict:
+    """
+    True positives per image: same category and IoU >= threshold when both sides
+    have a box; category-only when either side has none.
+    """
+    true_positives = 0
+    for category in {normalize_category(l.get('category')) for l in labels}:
+        label_boxes = [normalized_box(l.get('bbox'), None) for l in labels
+                       if normalize_category(l.get('category')) == category]
+        pred_boxes = [normalized_box(p.get('bbox'), image_size) for p in predictions
+                      if normalize_category(p.get('category')) == category]
+
+        boxed_labels = np.array([b for b in label_boxes if b], dtype=np.float64).reshape(-1, 4)
+        boxed_preds = np.array([b for b in pred_boxes if b], dtype=np.float64).reshape(-1, 4)
+        box_matches = greedy_matches(iou_matrix(boxed_preds, boxed_labels))
+
+        # A box-less label or prediction can pair with any leftover of its category
+        # (each such pair needs at least one box-less side)
+        unboxed = label_boxes.count(None) + pred_boxes.count(None)
+        spare_labels = len(label_boxes) - box_matches
+        spare_preds = len(pred_boxes) - box_matches
+        true_positives += box_matches + min(spare_labels, spare_preds, unboxed)
+
+    return {'tp': true_positives, 'predicted': len(predictions), 'labeled': len(labels)}
+
+
+def evaluate(dataset: List[Dict], modes: List[str], cache: ResponseCache) -> Dict[str, Dict]:
+    """Run every (mode, image) concurrently and aggregate metrics per mode"""
+    pairs = [(mode, entry) for mode in modes for entry in dataset]
+    with ThreadPoolExecutor(max_workers=max(1, WORKERS_PER_MODE * len(modes))) as pool:
+        runs = list(pool.map(lambda pair: (pair[0], pair[1], cache.run(pair[0], pair[1]['image_url'])), pairs))
+
+    report = {}
+    for mode in modes:
+        tp = predicted = labeled = failed = 0
+        latencies = []
+        for run_mode, entry, run in runs:
+            if run_mode != mode:
+                continue
+            if 'error' in run:
+                failed += 1
+                labeled += len(entry['labels'])
+                continue
+            latencies.append(run['seconds'])
+            response = run['response']
+            scores = score_image(response.get('items', []), entry['labels'], response.get('image_size'))
+            tp += scores['tp']
+            predicted += scores['predicted']
+            labeled += scores['labeled']
+
+        precision = tp / predicted if predicted else 0.0
+        recall = tp / labeled if labeled else 0.0
+        report[mode] = {
+            'images': len(dataset),
+            'failed': failed,
+            'precision': round(precision, 3),
+            'recall': round(recall, 3),
+            'f1': round(2 * precision * recall / (precision + recall), 3) if precision + recall else 0.0,
+            'latency_p50': round(statistics.median(latencies), 2) if latencies else None,
+            'latency_p90': round(float(np.percentile(latencies, 90)), 2) if latencies else None,
+            'cost_usd': round(COST_PER_IMAGE.get(mode, 0.0) * (len(dataset) - failed), 3),
+        }
+    return report
+
+
+def print_report(report: Dict[str, Dict]):
+    print(f'\n{"Mode":<14} {"Images":>6} {"Failed":>6} {"Prec":>6} {"Recall":>6} {"F1":>6} '
+          f'{"p50":>7} {"p90":>7} {"Cost":>8}')
+    print('-' * 76)
+    for mode, row in report.items():
+        p50 = f'{row["latency_p50"]:.1f}s' if row['latency_p50'] is not None else '-'
+        p90 = f'{row["latency_p90"]:.1f}s' if row['latency_p90'] is not None else '-'
+        print(f'{mode:<14} {row["images"]:>6} {row["failed"]:>6} {row["precision"]:>6.2f} {row["recall"]:>6.2f} '
+              f'{row["f1"]:>6.2f} {p50:>7} {p90:>7} ${row["cost_usd"]:>7.3f}')
+
+    scored = [(row['f1'], mode) for mode, row in report.items() if row['failed'] < row['images']]
+    if scored:
+        print(f'\n🏆 Best F1: {max(scored)[1]}')
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare analyzer modes on a labeled image set')
+    parser.add_argument('labels', help='JSON list of {image_url, labels: [{category, bbox?}]}')
+    parser.add_argument('--modes', nargs='+', choices=sorted(ANALYZERS), default=sorted(ANALYZERS))
+    parser.add_argument('--cache-dir', default=str(CACHE_DIR))
+    parser.add_argument('--refresh', action='store_true', help='Ignore cached responses')
+    parser.add_argument('--output', help='Write the comparison as JSON')
+    args = parser.parse_args()
+
+    with open(args.labels, 'r', encoding='utf-8') as f:
+        dataset = json.load(f)
+
+    print(f'🧪 Evaluating {", ".join(args.modes)} on {len(dataset)} labeled images...')
+    cache = ResponseCache(args.cache_dir, refresh=args.refresh)
+    start_time = time.time()
+    report = evaluate(dataset, args.modes, cache)
+    print(f'   ✅ Done in {time.time() - start_time:.1f}s ({cache.hits} cached responses)')
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f'💾 Saved to {args.output}')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
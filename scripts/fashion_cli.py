@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+One entry point for the batch, regenerate, publish, notify and report scripts.
+
+Subcommands are registered by module name only; a command's module (and its
+pandas / requests / supabase / PIL imports) is loaded when that command runs,
+so `--help` and the light commands start in a few tens of milliseconds. Each
+command calls the module's main() with argv set as `python3 <script>.py ARGS`
+would. Modules are imported under their own name, not run as __main__, so
+functions they send to a ProcessPoolExecutor still pickle by reference.
+
+Usage:
+    python3 fashion_cli.py --help
+    python3 fashion_cli.py regenerate --precompress
+    python3 fashion_cli.py startup          # startup-time benchmark
+"""
+
+import os
+import sys
+
+# name → (module, light, help); light commands must start within STARTUP_BUDGET_MS
+# of a bare `python -c pass`
+COMMANDS = {
+    'process': ('process_batch4', False, 'Run a Typeform batch: upload, analyze, search, render pages'),
+    'process-brands': ('process_brands_batch', False, 'Run the brand image batch through the full pipeline'),
+    'regenerate': ('regenerate_with_hashes', False, 'Re-render result pages with hashed filenames'),
+    'regenerate-plain': ('regenerate_html', False, 'Re-render result pages from batch_results JSON'),
+    'publish': ('publish_results', False, 'Delta-sync public/ pages and assets to S3'),
+    'notify': ('process_and_send_results', False, 'Process Typeform responses and send result messages'),
+    'preview': ('preview_messages', True, 'Preview result messages without sending them'),
+    'report': ('generate_brands_html', False, 'Generate the paginated brand batch report'),
+    'bench': ('bench_render', True, 'Render benchmark and budget gate for the page generators'),
+    'plan': ('batch_planner', True, 'Predict batch wall time and cost from past runs'),
+    'eval': ('eval_analyzers', False, 'Compare analyzer modes on a labeled image set'),
+    'warm': ('warm_pool', False, 'Keep analyze backends warm'),
+    'analytics': ('analytics_sync', False, 'Sync Supabase tables into the local analytics warehouse'),
+    'hash-phones': ('phone_hasher', True, 'Build the phone → hashed page id mapping'),
+    'compress': ('page_compressor', True, 'Minify pages and write .gz/.br siblings'),
+    'validate-links': ('link_validator', False, 'Prune dead product links and thumbnails'),
+    'mirror': ('thumbnail_mirror', False, 'Mirror product thumbnails into public/thumbs'),
+    'near-duplicates': ('phash_index', False, 'Build or query the screenshot near-duplicate index'),
+    'similar-crops': ('crop_similarity_index', False, 'Inspect or query the crop similarity index'),
+    'decode-heic': ('heic_decode', False, 'Decode HEIC/HEIF photos into the local JPEG/WebP cache'),
+    'cpu-profile': ('cpu_profile', True, 'Print a saved CPU profile (.pstats / .collapsed)'),
+    'memory-profile': ('mem_profile', True, 'Show or diff batch memory profiles'),
+}
+
+PROG = 'fashion_cli.py'
+STARTUP_BUDGET_MS = 100
+STARTUP_RUNS = 7
+
+
+def print_help():
+    width = max(len(name) for name in COMMANDS)
+    print(f'usage: {PROG} <command> [args...]\n')
+    print('commands:')
+    for name, (module, _, help_text) in COMMANDS.items():
+        print(f'  {name:<{width}}  {help_text}')
+    print(f'  {"startup":<{width}}  Measure CLI startup overhead against the {STARTUP_BUDGET_MS} ms budget')
+    print(f'\nRun `{PROG} <command> --help` for the options of a command.')
+
+
+def run_command(name: str, args) -> int:
+    """Import the command's module only now and call its main()"""
+    import importlib
+
+    module = COMMANDS[name][0]
+    scripts_dir = os.path.dirname(os.path.abspath(__file__))
+    if scripts_dir not in sys.path:
+        sys.path.insert(0, scripts_dir)
+
+    sys.argv = [f'{PROG} {name}'] + list(args)
+    try:
+        code = importlib.import_module(module).main()
+    except SystemExit as e:
+        code = e.code
+    return code if isinstance(code, int) else (0 if code is None else 1)
+
+
+def time_command(argv, runs: int = STARTUP_RUNS) -> float:
+    """Median wall time (ms) of a fresh interpreter running argv"""
+    import statistics
+    import subprocess
+    import time
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def startup_benchmark(args) -> int:
+    """
+    Cold-start overhead of the CLI and of importing each command's module.
+
+    The budget applies to time over a bare `python -c pass` measured in the same
+    run, so a slow machine or interpreter startup doesn't fail the gate.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(prog=f'{PROG} startup', description='CLI startup-time benchmark')
+    parser.add_argument('--runs', type=int, default=STARTUP_RUNS)
+    parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS,
+                        help='Allowed time over the bare interpreter')
+    parser.add_argument('--all', action='store_true', help='Also time the heavy commands')
+    options = parser.parse_args(args)
+
+    cli = os.path.abspath(__file__)
+    scripts_dir = os.path.dirname(cli)
+    interpreter = time_command(['-c', 'pass'], options.runs)
+    rows = [('python -c pass', interpreter, None), ('--help', time_command([cli, '--help'], options.runs), True)]
+    for name, (module, light, _) in COMMANDS.items():
+        if light or options.all:
+            import_code = f'import sys; sys.path.insert(0, {scripts_dir!r}); import {module}'
+            rows.append((f'{name} (import {module})', time_command(['-c', import_code], options.runs), light))
+
+    print(f'\n{"Startup":<46} {"Median":>9} {"Overhead":>10}  Budget +{options.budget_ms:.0f} ms')
+    over = 0
+    for label, ms, light in rows:
+        overhead = ms - interpreter
+        if light is None:
+            status = '(baseline)'
+        elif not light:
+            status = 'heavy'
+        elif overhead <= options.budget_ms:
+            status = '✅'
+        else:
+            status = '❌ over budget'
+            over += 1
+        print(f'{label:<46} {ms:>7.0f}ms {overhead:>+8.0f}ms  {status}')
+
+    if over:
+        print(f'\n❌ {over} light commands over the {options.budget_ms:.0f} ms startup budget')
+        return 1
+    print(f'\n✅ Light commands start within {options.budget_ms:.0f} ms of the bare interpreter')
+    return 0
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help', 'help'):
+        print_help()
+        return 0
+
+    name, args = argv[0], argv[1:]
+    if name == 'startup':
+        return startup_benchmark(args)
+    if name not in COMMANDS:
+        print(f'{PROG}: unknown command {name!r}\n', file=sys.stderr)
+        print_help()
+        return 2
+    return run_command(name, args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,177 +1,143 @@
 #!/usr/bin/env python3
 """
 Generate HTML report for brand batch processing results
+
+Records are streamed from the batch/retry JSON files and written out as paginated
+report pages plus a lightweight index page with the aggregate stats. Product
+sections inside each page are only rendered when their card scrolls into view.
 """
 
 import json
 import os
+from collections import Counter
 from datetime import datetime
+from html import escape
+from typing import Dict, Iterator, List, Optional
+
+from cpu_profile import CpuProfiler, add_profile_args
+
+try:
+    import ijson  # optional: streams the `results` array without loading the whole file
+except ImportError:
+    ijson = None
 
 # Paths
 RESULTS_FILE = "/Users/levit/Desktop/mvp/brands_results/brands_batch_20251121_084948.json"
 RETRY_FILE = "/Users/levit/Desktop/mvp/brands_results/brands_retry_20251121_090022.json"
 OUTPUT_FILE = "/Users/levit/Desktop/mvp/brands_results/brands_report.html"
+PAGE_SIZE = 50
+PRODUCTS_PER_CATEGORY = 3
 
-def load_results():
-    """Load both batch and retry results"""
-    with open(RESULTS_FILE, 'r', encoding='utf-8') as f:
-        batch_data = json.load(f)
-    
-    with open(RETRY_FILE, 'r', encoding='utf-8') as f:
-        retry_data = json.load(f)
-    
-    # Combine successful results
-    all_results = []
-    
-    # Add batch results
-    for result in batch_data['results']:
-        if result.get('success'):
-            all_results.append(result)
-    
-    # Add retry results
-    for result in retry_data['results']:
-        if result.get('success'):
-            all_results.append(result)
-    
-    return all_results, batch_data, retry_data
-
-def generate_html():
-    """Generate comprehensive HTML report"""
-    
-    all_results, batch_data, retry_data = load_results()
-    
-    total_images = batch_data['total_images']
-    successful = len(all_results)
-    
-    # Count total items and products
-    total_items = 0
-    total_products = 0
-    category_counts = {}
-    
-    for result in all_results:
-        items = result.get('analysis', {}).get('items', [])
-        total_items += len(items)
-        
-        search_results = result.get('search', {}).get('results', {})
-        for category, products in search_results.items():
-            total_products += len(products)
-            cat_name = category.split('_')[0]
-            category_counts[cat_name] = category_counts.get(cat_name, 0) + 1
-    
-    html = f"""<!DOCTYPE html>
-<html lang="ko">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Brand Images Processing Results</title>
-    <style>
-        * {{
+# Started by --profile-cpu
+CPU = CpuProfiler()
+
+REPORT_CSS = """        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             padding: 20px;
             min-height: 100vh;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1400px;
             margin: 0 auto;
-        }}
+        }
         
-        .header {{
+        .header {
             background: white;
             border-radius: 20px;
             padding: 40px;
             margin-bottom: 30px;
             box-shadow: 0 10px 40px rgba(0,0,0,0.1);
-        }}
+        }
         
-        .header h1 {{
+        .header h1 {
             font-size: 2.5em;
             color: #2d3748;
             margin-bottom: 20px;
-        }}
+        }
         
-        .stats {{
+        .stats {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 20px;
             margin-top: 30px;
-        }}
+        }
         
-        .stat-card {{
+        .stat-card {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 25px;
             border-radius: 15px;
             text-align: center;
-        }}
+        }
         
-        .stat-number {{
+        .stat-number {
             font-size: 3em;
             font-weight: bold;
             margin-bottom: 5px;
-        }}
+        }
         
-        .stat-label {{
+        .stat-label {
             font-size: 0.9em;
             opacity: 0.9;
-        }}
+        }
         
-        .category-breakdown {{
+        .category-breakdown {
             display: flex;
             flex-wrap: wrap;
             gap: 10px;
             margin-top: 20px;
-        }}
+        }
         
-        .category-badge {{
+        .category-badge {
             background: #e2e8f0;
             padding: 8px 15px;
             border-radius: 20px;
             font-size: 0.9em;
             color: #4a5568;
-        }}
+        }
         
-        .results-grid {{
+        .results-grid {
             display: grid;
             grid-template-columns: repeat(auto-fill, minmax(400px, 1fr));
             gap: 25px;
-        }}
+        }
         
-        .result-card {{
+        .result-card {
             background: white;
             border-radius: 20px;
             overflow: hidden;
             box-shadow: 0 10px 40px rgba(0,0,0,0.1);
             transition: transform 0.3s ease, box-shadow 0.3s ease;
-        }}
+        }
         
-        .result-card:hover {{
+        .result-card:hover {
             transform: translateY(-5px);
             box-shadow: 0 15px 50px rgba(0,0,0,0.15);
-        }}
+        }
         
-        .image-container {{
+        .image-container {
             position: relative;
             width: 100%;
             height: 300px;
             overflow: hidden;
             background: #f7fafc;
-        }}
+        }
         
-        .image-container img {{
+        .image-container img {
             width: 100%;
             height: 100%;
             object-fit: cover;
-        }}
+        }
         
-        .image-number {{
+        .image-number {
             position: absolute;
             top: 15px;
             left: 15px;
@@ -181,24 +147,24 @@ def generate_html():
             border-radius: 20px;
             font-weight: bold;
             font-size: 0.9em;
-        }}
+        }
         
-        .content {{
+        .content {
             padding: 25px;
-        }}
+        }
         
-        .filename {{
+        .filename {
             font-size: 0.8em;
             color: #718096;
             margin-bottom: 15px;
             word-break: break-all;
-        }}
+        }
         
-        .items-section {{
+        .items-section {
             margin-bottom: 20px;
-        }}
+        }
         
-        .section-title {{
+        .section-title {
             font-size: 1.1em;
             font-weight: bold;
             color: #2d3748;
@@ -206,54 +172,54 @@ def generate_html():
             display: flex;
             align-items: center;
             gap: 8px;
-        }}
+        }
         
-        .item {{
+        .item {
             background: #f7fafc;
             padding: 15px;
             border-radius: 12px;
             margin-bottom: 10px;
             border-left: 4px solid #667eea;
-        }}
+        }
         
-        .item-category {{
+        .item-category {
             font-weight: bold;
             color: #667eea;
             text-transform: capitalize;
             margin-bottom: 5px;
-        }}
+        }
         
-        .item-description {{
+        .item-description {
             color: #4a5568;
             font-size: 0.9em;
             line-height: 1.5;
-        }}
+        }
         
-        .products-section {{
+        .products-section {
             margin-top: 20px;
-        }}
+        }
         
-        .products-grid {{
+        .products-grid {
             display: grid;
             grid-template-columns: repeat(3, 1fr);
             gap: 10px;
-        }}
+        }
         
-        .product-card {{
+        .product-card {
             background: #fff;
             border: 2px solid #e2e8f0;
             border-radius: 10px;
             overflow: hidden;
             transition: all 0.3s ease;
             cursor: pointer;
-        }}
+        }
         
-        .product-card:hover {{
+        .product-card:hover {
             border-color: #667eea;
             box-shadow: 0 5px 15px rgba(102, 126, 234, 0.2);
-        }}
+        }
         
-        .product-image {{
+        .product-image {
             width: 100%;
             height: 120px;
             background: #f7fafc;
@@ -261,20 +227,20 @@ def generate_html():
             align-items: center;
             justify-content: center;
             overflow: hidden;
-        }}
+        }
         
-        .product-image img {{
+        .product-image img {
             width: 100%;
             height: 100%;
             object-fit: cover;
-        }}
+        }
         
-        .product-image.no-image {{
+        .product-image.no-image {
             color: #cbd5e0;
             font-size: 2em;
-        }}
+        }
         
-        .product-title {{
+        .product-title {
             padding: 10px;
             font-size: 0.75em;
             color: #4a5568;
@@ -283,16 +249,16 @@ def generate_html():
             -webkit-line-clamp: 2;
             -webkit-box-orient: vertical;
             overflow: hidden;
-        }}
+        }
         
-        .no-products {{
+        .no-products {
             text-align: center;
             padding: 20px;
             color: #a0aec0;
             font-style: italic;
-        }}
+        }
         
-        .processing-time {{
+        .processing-time {
             display: inline-block;
             background: #48bb78;
             color: white;
@@ -300,36 +266,319 @@ def generate_html():
             border-radius: 15px;
             font-size: 0.85em;
             margin-top: 10px;
-        }}
+        }
         
-        .footer {{
+        .footer {
             background: white;
             border-radius: 20px;
             padding: 30px;
             margin-top: 30px;
             text-align: center;
             color: #718096;
-        }}
+        }
         
-        @media (max-width: 768px) {{
-            .results-grid {{
+        @media (max-width: 768px) {
+            .results-grid {
                 grid-template-columns: 1fr;
-            }}
+            }
             
-            .products-grid {{
+            .products-grid {
                 grid-template-columns: 1fr;
-            }}
-        }}
-    </style>
+            }
+        }
+
+        .pagination {
+            display: flex;
+            justify-content: center;
+            flex-wrap: wrap;
+            gap: 10px;
+            margin: 30px 0;
+        }
+
+        .pagination a, .pagination span {
+            background: white;
+            color: #4a5568;
+            padding: 10px 18px;
+            border-radius: 20px;
+            text-decoration: none;
+            font-weight: bold;
+        }
+
+        .pagination .current {
+            background: #2d3748;
+            color: white;
+        }
+
+        .page-list {
+            display: grid;
+            grid-template-columns: repeat(auto-fill, minmax(260px, 1fr));
+            gap: 15px;
+            margin-top: 30px;
+        }
+
+        .page-link {
+            background: #f7fafc;
+            border-radius: 12px;
+            padding: 15px;
+            color: #2d3748;
+            text-decoration: none;
+            border-left: 4px solid #667eea;
+        }
+
+        .page-link small {
+            display: block;
+            color: #718096;
+            margin-top: 5px;
+            word-break: break-all;
+        }
+"""
+
+LAZY_PRODUCTS_JS = """
+    <script>
+        // Render product sections only when their card scrolls into view
+        (function() {
+            function expand(container) {
+                var template = container.querySelector('template');
+                if (template) {
+                    container.appendChild(template.content.cloneNode(true));
+                    template.remove();
+                }
+            }
+            var containers = document.querySelectorAll('.lazy-products');
+            if (!('IntersectionObserver' in window)) {
+                containers.forEach(expand);
+                return;
+            }
+            var observer = new IntersectionObserver(function(entries) {
+                entries.forEach(function(entry) {
+                    if (entry.isIntersecting) {
+                        expand(entry.target);
+                        observer.unobserve(entry.target);
+                    }
+                });
+            }, { rootMargin: '600px 0px' });
+            containers.forEach(function(container) { observer.observe(container); });
+        })();
+    </script>
+"""
+
+
+def iter_results(path: str, header: Optional[Dict] = None) -> Iterator[Dict]:
+    """Stream the records of one batch/retry file, filling `header` with its total_images"""
+    with open(path, 'rb') as f:
+        if ijson is not None:
+            if header is not None:
+                # The header precedes `results`, so this stops after the first few bytes
+                header['total_images'] = next(ijson.items(f, 'total_images'), 0)
+                f.seek(0)
+            yield from ijson.items(f, 'results.item', use_float=True)
+        else:
+            data = json.load(f)
+            if header is not None:
+                header['total_images'] = data.get('total_images', 0)
+            yield from data.pop('results')
+
+
+def load_results(paths=(RESULTS_FILE, RETRY_FILE), header: Optional[Dict] = None) -> Iterator[Dict]:
+    """Successful records from the batch and retry files, one at a time (header from the batch file)"""
+    for number, path in enumerate(paths):
+        for result in iter_results(path, header if number == 0 else None):
+            if result.get('success'):
+                yield result
+
+
+def page_filename(page_number: int) -> str:
+    base = os.path.splitext(os.path.basename(OUTPUT_FILE))[0]
+    return f"{base}_page_{page_number:03d}.html"
+
+
+def render_head(title: str) -> str:
+    return f"""<!DOCTYPE html>
+<html lang="ko">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <style>
+{REPORT_CSS}    </style>
 </head>
 <body>
     <div class="container">
+"""
+
+
+def render_footer() -> str:
+    return f"""
+        <div class="footer">
+            <p><strong>Generated:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+            <p style="margin-top: 10px;">AI Fashion Detection Pipeline • GPT-4o + GroundingDINO + Serper + GPT-4 Turbo</p>
+        </div>
+    </div>
+"""
+
+
+def render_pagination(page_number: int, total_pages: int) -> str:
+    links = [f'<a href="{os.path.basename(OUTPUT_FILE)}">Index</a>']
+    if page_number > 1:
+        links.append(f'<a href="{page_filename(page_number - 1)}">← Prev</a>')
+    links.append(f'<span class="current">Page {page_number} / {total_pages}</span>')
+    if page_number < total_pages:
+        links.append(f'<a href="{page_filename(page_number + 1)}">Next →</a>')
+    return '        <div class="pagination">' + ''.join(links) + '</div>\n'
+
+
+def render_products(search_results: Dict) -> str:
+    """Product matches for one image (placed inside a lazily expanded <template>)"""
+    if not search_results:
+        return '<div class="no-products">No products found</div>'
+
+    parts = []
+    for category_key, products in search_results.items():
+        parts.append(f"""
+                        <div style="margin-bottom: 20px;">
+                            <div style="font-size: 0.9em; color: #667eea; font-weight: bold; margin-bottom: 10px;">
+                                {escape(category_key.replace('_', ' ').title())}
+                            </div>
+                            <div class="products-grid">""")
+        for product in products[:PRODUCTS_PER_CATEGORY]:
+            link = escape(product.get('link', '#'), quote=True)
+            title = escape(product.get('title') or 'View Product')
+            thumbnail = product.get('thumbnail')
+            image = (f'<img src="{escape(thumbnail, quote=True)}" alt="{title}" loading="lazy">'
+                     if thumbnail else '📦')
+            parts.append(f"""
+                                <a href="{link}" target="_blank" class="product-card">
+                                    <div class="product-image{' no-image' if not thumbnail else ''}">{image}</div>
+                                    <div class="product-title">{title}</div>
+                                </a>""")
+        parts.append("""
+                            </div>
+                        </div>""")
+    return ''.join(parts)
+
+
+def render_card(idx: int, result: Dict) -> str:
+    image_name = escape(result.get('image_name', 'Unknown'))
+    image_url = escape(result.get('image_url', ''), quote=True)
+    processing_time = result.get('processing_time_seconds', 0)
+    items = result.get('analysis', {}).get('items', [])
+    search_results = result.get('search', {}).get('results', {})
+
+    items_html = ''.join(f"""
+                        <div class="item">
+                            <div class="item-category">{escape(item.get('category', 'unknown'))}</div>
+                            <div class="item-description">{escape(item.get('description', item.get('groundingdino_prompt', 'No description')) or '')}</div>
+                        </div>""" for item in items)
+
+    return f"""
+            <div class="result-card">
+                <div class="image-container">
+                    <img src="{image_url}" alt="{image_name}" loading="lazy">
+                    <div class="image-number">#{idx}</div>
+                </div>
+                <div class="content">
+                    <div class="filename">{image_name}</div>
+
+                    <div class="items-section">
+                        <div class="section-title">
+                            🔍 {len(items)} Item{"s" if len(items) != 1 else ""} Detected
+                        </div>{items_html}
+                    </div>
+
+                    <div class="products-section">
+                        <div class="section-title">
+                            🛍️ Product Matches
+                        </div>
+                        <div class="lazy-products"><template>{render_products(search_results)}
+                        </template></div>
+                    </div>
+
+                    <div class="processing-time">⏱️ {processing_time:.1f}s</div>
+                </div>
+            </div>
+"""
+
+
+def summarize_record(idx: int, result: Dict, category_rows: List[Dict]) -> Dict:
+    """Keep only the small fields needed for the index and aggregates"""
+    items = result.get('analysis', {}).get('items', [])
+    search_results = result.get('search', {}).get('results', {})
+    for category, products in search_results.items():
+        category_rows.append({'category': category.split('_')[0], 'products': len(products)})
+    return {'idx': idx, 'image_name': result.get('image_name', 'Unknown'), 'items': len(items)}
+
+
+def write_pages(records: Iterator[Dict], output_dir: str, page_size: int):
+    """Stream records into page files; returns per-record summaries and category rows"""
+    summaries = []
+    category_rows = []
+    page_number = 0
+    handle = None
+    page_paths = []
+
+    def close_page():
+        handle.write('        </div>\n')
+        handle.write('__PAGINATION__')
+        handle.write(render_footer())
+        handle.write(LAZY_PRODUCTS_JS)
+        handle.write('</body>\n</html>\n')
+        handle.close()
+
+    for idx, result in enumerate(records, 1):
+        if (idx - 1) % page_size == 0:
+            if handle:
+                close_page()
+            page_number += 1
+            path = os.path.join(output_dir, page_filename(page_number))
+            page_paths.append(path)
+            handle = open(path, 'w', encoding='utf-8')
+            handle.write(render_head(f'Brand Results - Page {page_number}'))
+            handle.write('__PAGINATION__')
+            handle.write('        <div class="results-grid">\n')
+        handle.write(render_card(idx, result))
+        summaries.append(summarize_record(idx, result, category_rows))
+
+    if handle:
+        close_page()
+
+    # Total page count is only known at the end: fill in the navigation placeholders
+    for number, path in enumerate(page_paths, 1):
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content.replace('__PAGINATION__', render_pagination(number, len(page_paths))))
+
+    return summaries, category_rows, page_paths
+
+
+def write_index(summaries: List[Dict], category_rows: List[Dict], page_size: int, total_images: int):
+    """Index page: aggregate stats and links to every page"""
+    successful = len(summaries)
+    total_items = sum(summary['items'] for summary in summaries)
+    total_products = sum(row['products'] for row in category_rows)
+    category_counts = Counter(row['category'] for row in category_rows).most_common()
+    success_rate = successful / total_images * 100 if total_images else 0
+
+    badges = ''.join(f'                <span class="category-badge">{escape(str(category).title())}: {count}</span>\n'
+                     for category, count in category_counts)
+
+    page_links = []
+    for page_number, start in enumerate(range(0, successful, page_size), 1):
+        page = summaries[start:start + page_size]
+        first, last = page[0]['idx'], page[-1]['idx']
+        names = ', '.join(escape(str(summary['image_name'])) for summary in page[:3])
+        page_items = sum(summary['items'] for summary in page)
+        page_links.append(f'                <a class="page-link" href="{page_filename(page_number)}">'
+                          f'<strong>Page {page_number}</strong> · #{first}–#{last} · {page_items} items'
+                          f'<small>{names}…</small></a>\n')
+
+    html = render_head('Brand Images Processing Results') + f"""
         <div class="header">
             <h1>🎨 Brand Images Processing Results</h1>
             <p style="color: #718096; font-size: 1.1em; margin-top: 10px;">
                 Processed {total_images} images through AI fashion detection pipeline
             </p>
-            
+
             <div class="stats">
                 <div class="stat-card">
                     <div class="stat-number">{successful}</div>
@@ -344,139 +593,61 @@ def generate_html():
                     <div class="stat-label">Product Links Found</div>
                 </div>
                 <div class="stat-card">
-                    <div class="stat-number">{(successful/total_images*100):.1f}%</div>
+                    <div class="stat-number">{success_rate:.1f}%</div>
                     <div class="stat-label">Success Rate</div>
                 </div>
             </div>
-            
+
             <div class="category-breakdown">
                 <span style="color: #2d3748; font-weight: bold;">Categories detected:</span>
-"""
-    
-    for category, count in sorted(category_counts.items(), key=lambda x: x[1], reverse=True):
-        html += f'                <span class="category-badge">{category.title()}: {count}</span>\n'
-    
-    html += """            </div>
-        </div>
-        
-        <div class="results-grid">
-"""
-    
-    # Add each result
-    for idx, result in enumerate(all_results, 1):
-        image_name = result.get('image_name', 'Unknown')
-        image_url = result.get('image_url', '')
-        processing_time = result.get('processing_time_seconds', 0)
-        
-        items = result.get('analysis', {}).get('items', [])
-        search_results = result.get('search', {}).get('results', {})
-        
-        html += f"""
-            <div class="result-card">
-                <div class="image-container">
-                    <img src="{image_url}" alt="{image_name}">
-                    <div class="image-number">#{idx}</div>
-                </div>
-                <div class="content">
-                    <div class="filename">{image_name}</div>
-                    
-                    <div class="items-section">
-                        <div class="section-title">
-                            🔍 {len(items)} Item{"s" if len(items) != 1 else ""} Detected
-                        </div>
-"""
-        
-        # Add detected items
-        for item in items:
-            category = item.get('category', 'unknown')
-            description = item.get('description', item.get('groundingdino_prompt', 'No description'))
-            
-            html += f"""
-                        <div class="item">
-                            <div class="item-category">{category}</div>
-                            <div class="item-description">{description}</div>
-                        </div>
-"""
-        
-        html += """
-                    </div>
-                    
-                    <div class="products-section">
-                        <div class="section-title">
-                            🛍️ Product Matches
-                        </div>
-"""
-        
-        # Add products for each category
-        if search_results:
-            for category_key, products in search_results.items():
-                html += f"""
-                        <div style="margin-bottom: 20px;">
-                            <div style="font-size: 0.9em; color: #667eea; font-weight: bold; margin-bottom: 10px;">
-                                {category_key.replace('_', ' ').title()}
-                            </div>
-                            <div class="products-grid">
-"""
-                
-                for product in products[:3]:  # Max 3 products
-                    link = product.get('link', '#')
-                    title = product.get('title', 'Product')
-                    thumbnail = product.get('thumbnail')
-                    
-                    html += f"""
-                                <a href="{link}" target="_blank" class="product-card">
-                                    <div class="product-image{'no-image' if not thumbnail else ''}">
-"""
-                    
-                    if thumbnail:
-                        html += f'                                        <img src="{thumbnail}" alt="{title}">\n'
-                    else:
-                        html += '                                        📦\n'
-                    
-                    html += f"""
-                                    </div>
-                                    <div class="product-title">{title if title else 'View Product'}</div>
-                                </a>
-"""
-                
-                html += """
-                            </div>
-                        </div>
-"""
-        else:
-            html += """
-                        <div class="no-products">No products found</div>
-"""
-        
-        html += f"""
-                    </div>
-                    
-                    <div class="processing-time">⏱️ {processing_time:.1f}s</div>
-                </div>
-            </div>
-"""
-    
-    html += f"""
-        </div>
-        
-        <div class="footer">
-            <p><strong>Generated:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-            <p style="margin-top: 10px;">AI Fashion Detection Pipeline • GPT-4o + GroundingDINO + Serper + GPT-4 Turbo</p>
+{badges}            </div>
+
+            <div class="page-list">
+{''.join(page_links)}            </div>
         </div>
-    </div>
-</body>
+""" + render_footer() + """</body>
 </html>
 """
-    
-    # Write HTML file
+
     with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
         f.write(html)
-    
-    print(f"✅ HTML report generated: {OUTPUT_FILE}")
+
+    return successful, total_items, total_products
+
+
+def generate_html(paths=(RESULTS_FILE, RETRY_FILE), page_size: int = PAGE_SIZE):
+    """Generate the paginated report and its index page"""
+    output_dir = os.path.dirname(OUTPUT_FILE) or '.'
+    os.makedirs(output_dir, exist_ok=True)
+
+    header = {}
+    with CPU.stage('pages'):
+        summaries, category_rows, page_paths = write_pages(load_results(paths, header), output_dir, page_size)
+    total_images = header.get('total_images', 0)
+    with CPU.stage('index'):
+        successful, total_items, total_products = write_index(summaries, category_rows, page_size, total_images)
+
+    print(f"✅ HTML report generated: {OUTPUT_FILE} ({len(page_paths)} pages of {page_size})")
     print(f"📊 Total successful images: {successful}/{total_images}")
     print(f"🎯 Total items detected: {total_items}")
     print(f"🛍️ Total products found: {total_products}")
 
-if __name__ == "__main__":
-    generate_html()
+def main():
+    global OUTPUT_FILE, CPU
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate paginated brand batch report')
+    parser.add_argument('files', nargs='*', default=[RESULTS_FILE, RETRY_FILE], help='Batch JSON first, then retry files')
+    parser.add_argument('--output', default=OUTPUT_FILE, help='Index page path (pages are written next to it)')
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE, help='Images per report page')
+    add_profile_args(parser)
+    args = parser.parse_args()
+
+    OUTPUT_FILE = args.output
+    CPU = CpuProfiler.from_args(args)
+    generate_html(args.files, args.page_size)
+    CPU.finish()
 
+
+if __name__ == "__main__":
+    main()
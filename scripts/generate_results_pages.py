@@ -8,6 +8,7 @@ import os
 from pathlib import Path
 from datetime import datetime
 from typing import Dict
+from cpu_profile import CpuProfiler, add_profile_args
 
 def generate_html_page(phone: str, results: Dict) -> str:
     """Generate HTML page matching the MVP design exactly"""
@@ -272,6 +273,13 @@ def generate_html_page(phone: str, results: Dict) -> str:
 
 
 def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Generate HTML result pages from batch_user_results JSON')
+    add_profile_args(parser)
+    args = parser.parse_args()
+    cpu = CpuProfiler.from_args(args)
+    
     results_dir = './batch_user_results'
     output_dir = './batch_user_results/html_pages'
     os.makedirs(output_dir, exist_ok=True)
@@ -290,10 +298,12 @@ def main():
     for result_file in result_files:
         phone = result_file.stem.replace('_results', '')
         
-        with open(result_file, 'r', encoding='utf-8') as f:
-            results = json.load(f)
+        with cpu.stage('load'):
+            with open(result_file, 'r', encoding='utf-8') as f:
+                results = json.load(f)
         
-        html = generate_html_page(phone, results)
+        with cpu.stage('render'):
+            html = generate_html_page(phone, results)
         
         output_file = os.path.join(output_dir, f"{phone}.html")
         with open(output_file, 'w', encoding='utf-8') as f:
@@ -309,6 +319,8 @@ def main():
     print(f"2. Share the URLs via SMS/KakaoTalk")
     print(f"3. Open locally: open {output_dir}/[phone].html")
     print(f"{'='*60}")
+    
+    cpu.finish()
 
 
 if __name__ == '__main__':
@@ -7,6 +7,7 @@ import os
 from pathlib import Path
 from datetime import datetime
 from typing import Dict
+from cpu_profile import CpuProfiler, add_profile_args
 
 def generate_html_page(phone: str, results: Dict) -> str:
     """Generate HTML page matching the MVP design exactly"""
@@ -352,6 +353,13 @@ def generate_html_page(phone: str, results: Dict) -> str:
 
 
 def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Generate MVP-design HTML result pages from single_user_test JSON')
+    add_profile_args(parser)
+    args = parser.parse_args()
+    cpu = CpuProfiler.from_args(args)
+    
     results_dir = './single_user_test'
     output_dir = './single_user_test'
     os.makedirs(output_dir, exist_ok=True)
@@ -370,10 +378,12 @@ def main():
     for result_file in result_files:
         phone = result_file.stem.replace('_result', '')
         
-        with open(result_file, 'r', encoding='utf-8') as f:
-            results = json.load(f)
+        with cpu.stage('load'):
+            with open(result_file, 'r', encoding='utf-8') as f:
+                results = json.load(f)
         
-        html = generate_html_page(phone, results)
+        with cpu.stage('render'):
+            html = generate_html_page(phone, results)
         
         output_file = os.path.join(output_dir, f"{phone}_result.html")
         with open(output_file, 'w', encoding='utf-8') as f:
@@ -403,6 +413,8 @@ def main():
     print(f"📁 Public: {public_dir}")
     print(f"\nOpen locally: open {output_dir}/{phone}_result.html")
     print(f"{'='*60}")
+    
+    cpu.finish()
 
 
 if __name__ == '__main__':
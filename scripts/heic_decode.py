@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Local HEIC/HEIF decoding before upload.
+
+iPhone originals used to go up as HEIC and come back down through
+app/api/convert-heic, paying the network twice for the largest payload in the
+batch. HEIC files / bytes are instead decoded here in a process pool (PIL +
+pillow-heif), orientation-fixed, capped at MAX_SIDE and re-encoded as
+JPEG/WebP. Results are cached by content hash, so re-runs and retries of the
+same photo decode once.
+
+Without pillow-heif installed everything passes through unchanged and the
+server-side conversion keeps working as before.
+
+Usage:
+    python3 heic_decode.py ~/Desktop/brands/*.HEIC --format webp
+"""
+
+import hashlib
+import io
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    from PIL import Image, ImageOps
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+    HEIF_SUPPORTED = True
+except ImportError:
+    HEIF_SUPPORTED = False
+
+HEIC_EXTENSIONS = ('.heic', '.heif')
+# ISO-BMFF brands written by iPhones and other HEIF encoders
+HEIF_BRANDS = (b'heic', b'heix', b'hevc', b'hevx', b'heim', b'heis', b'mif1', b'msf1')
+
+CACHE_DIR = Path(os.getenv('DECODE_CACHE_DIR', os.path.expanduser('~/.cache/fashionsource/decoded')))
+OUTPUT_FORMAT = 'jpeg'      # jpeg | webp
+QUALITY = 90
+MAX_SIDE = 2048             # the analyze backend downsizes past this anyway
+DECODE_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+
+def is_heic_path(path) -> bool:
+    return str(path).lower().endswith(HEIC_EXTENSIONS)
+
+
+def is_heic_bytes(data: bytes) -> bool:
+    """`ftyp` box with a HEIF brand at the start of the file"""
+    return len(data) >= 12 and data[4:8] == b'ftyp' and data[8:12] in HEIF_BRANDS
+
+
+def upload_name(filename: str, head: bytes) -> tuple:
+    """(filename, mime type) matching what is actually uploaded"""
+    stem, ext = os.path.splitext(filename)
+    if head[:3] == b'\xff\xd8\xff':
+        return (filename if ext.lower() in ('.jpg', '.jpeg') else f'{stem}.jpg'), 'image/jpeg'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return f'{stem}.webp', 'image/webp'
+    return filename, 'image/jpeg'
+
+
+def cache_path(digest: str, cache_dir, fmt: str, quality: int, max_side: int) -> Path:
+    ext = 'jpg' if fmt == 'jpeg' else fmt
+    return Path(cache_dir) / f'{digest[:2]}/{digest}_{max_side}_{quality}.{ext}'
+
+
+def _encode(data: bytes, output: Path, fmt: str, quality: int, max_side: int):
+    with Image.open(io.BytesIO(data)) as img:
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((max_side, max_side), Image.LANCZOS)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        output.parent.mkdir(parents=True, exist_ok=True)
+        tmp = output.with_name(f'{output.name}.{os.getpid()}.tmp')
+        img.save(tmp, format=fmt.upper(), quality=quality)
+    os.replace(tmp, output)
+
+
+def decode_bytes(data: bytes, cache_dir=CACHE_DIR, fmt: str = OUTPUT_FORMAT,
+                 quality: int = QUALITY, max_side: int = MAX_SIDE) -> Dict:
+    """Decode HEIC bytes into the cache (runs in a worker process)"""
+    start_time = time.time()
+    output = cache_path(hashlib.sha256(data).hexdigest(), cache_dir, fmt, quality, max_side)
+    cached = output.exists()
+    if not cached:
+        _encode(data, output, fmt, quality, max_side)
+    return {
+        'output': str(output),
+        'cached': cached,
+        'input_bytes': len(data),
+        'output_bytes': output.stat().st_size,
+        'seconds': round(time.time() - start_time, 3),
+    }
+
+
+def decode_file(path: str, cache_dir=CACHE_DIR, fmt: str = OUTPUT_FORMAT,
+                quality: int = QUALITY, max_side: int = MAX_SIDE) -> Dict:
+    with open(path, 'rb') as f:
+        data = f.read()
+    return dict(decode_bytes(data, cache_dir, fmt, quality, max_side), path=str(path))
+
+
+class DecodePool:
+    """Process pool for HEIC decodes; everything else passes straight through"""
+
+    def __init__(self, cache_dir=CACHE_DIR, fmt: str = OUTPUT_FORMAT, quality: int = QUALITY,
+                 max_side: int = MAX_SIDE, workers: int = DECODE_WORKERS):
+        self.options = (str(cache_dir), fmt, quality, max_side)
+        self.fmt = fmt
+        self.workers = workers
+        self.enabled = HEIF_SUPPORTED
+        self.decoded: List[Dict] = []
+        self.failed = 0
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def submit(self, path) -> Optional[Future]:
+        """Start decoding a HEIC file (None for other formats or without pillow-heif)"""
+        if not (self.enabled and is_heic_path(path)):
+            return None
+        return self._executor().submit(decode_file, str(path), *self.options)
+
+    def _record(self, future: Future) -> Optional[Dict]:
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f'   ⚠️  Local HEIC decode failed, uploading the original: {e}')
+            with self._lock:
+                self.failed += 1
+            return None
+        with self._lock:
+            self.decoded.append(result)
+        return result
+
+    def prepared_path(self, path, future: Optional[Future] = None) -> str:
+        """Path to upload: the decoded JPEG/WebP, or the original"""
+        future = future or self.submit(path)
+        result = self._record(future) if future else None
+        return result['output'] if result else str(path)
+
+    def prepare_bytes(self, data: bytes) -> bytes:
+        """Downloaded image bytes to upload: decoded if they are HEIC"""
+        if not (self.enabled and is_heic_bytes(data)):
+            return data
+        result = self._record(self._executor().submit(decode_bytes, data, *self.options))
+        if not result:
+            return data
+        with open(result['output'], 'rb') as f:
+            return f.read()
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def print_report(self):
+        if not (self.decoded or self.failed):
+            return
+        hits = sum(1 for r in self.decoded if r['cached'])
+        input_bytes = sum(r['input_bytes'] for r in self.decoded)
+        output_bytes = sum(r['output_bytes'] for r in self.decoded)
+        decode_seconds = sum(r['seconds'] for r in self.decoded if not r['cached'])
+        print(f'\n🍏 HEIC decoded locally: {len(self.decoded)} images ({hits} from cache, {self.failed} failed), '
+              f'{input_bytes / 1024 / 1024:.1f} MB → {output_bytes / 1024 / 1024:.1f} MB {self.fmt.upper()}, '
+              f'{decode_seconds:.1f}s decoding')
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Decode HEIC/HEIF images into the local cache')
+    parser.add_argument('images', nargs='+')
+    parser.add_argument('--format', choices=['jpeg', 'webp'], default=OUTPUT_FORMAT)
+    parser.add_argument('--quality', type=int, default=QUALITY)
+    parser.add_argument('--max-side', type=int, default=MAX_SIDE)
+    parser.add_argument('--cache-dir', default=str(CACHE_DIR))
+    args = parser.parse_args()
+
+    if not HEIF_SUPPORTED:
+        print('❌ pillow-heif is not installed (pip install pillow-heif)')
+        return 1
+
+    pool = DecodePool(args.cache_dir, args.format, args.quality, args.max_side)
+    futures = [(path, pool.submit(path)) for path in args.images]
+    for path, future in futures:
+        print(f'✅ {os.path.basename(path)} → {pool.prepared_path(path, future)}')
+    pool.close()
+    pool.print_report()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
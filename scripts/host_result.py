@@ -136,6 +136,22 @@ def use_ngrok():
     
     return True
 
+def publish_to_object_storage():
+    """Delta-sync public/results (and mirrored images) to S3 without a redeploy"""
+    print("\n" + "="*60)
+    print("Option 4: Publish to S3 (delta sync)")
+    print("="*60)
+    
+    from publish_results import publish
+    
+    try:
+        stats = publish()
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+    
+    return stats['failed'] == 0
+
 def main():
     print("="*60)
     print("Host Result - Make It Accessible from Any Device")
@@ -156,8 +172,12 @@ def main():
     print("   ✅ Instant public URL")
     print("   ⚠️  Requires ngrok installed")
     print("   ⚠️  URL changes each time")
+    print("\n4. S3 / object storage (Delta Sync)")
+    print("   ✅ Uploads only new or changed pages")
+    print("   ✅ No full site redeploy")
+    print("   ⚠️  Requires AWS_S3_BUCKET_NAME and credentials")
     
-    choice = input("\nEnter choice (1, 2, or 3): ").strip()
+    choice = input("\nEnter choice (1, 2, 3, or 4): ").strip()
     
     if choice == '1':
         copy_to_vercel_public()
@@ -165,6 +185,8 @@ def main():
         use_local_server()
     elif choice == '3':
         use_ngrok()
+    elif choice == '4':
+        publish_to_object_storage()
     else:
         print("Invalid choice")
 
@@ -72,9 +72,15 @@ def generate_html_page(phone: str, results: Dict) -> str:
         
         # Find the cropped image for this category
         cropped_img = ""
+        cropped_attrs = ""
         for item in items:
             if item.get('category') == category_key:
                 cropped_img = item.get('croppedImageUrl', '')
+                # Responsive variants and blurred placeholder (see responsive_images.py)
+                if item.get('croppedSrcset'):
+                    cropped_attrs += f' srcset="{item["croppedSrcset"]}" sizes="{item.get("croppedSizes", "72px")}"'
+                if item.get('croppedLqip'):
+                    cropped_attrs += f' style="background-image: url({item["croppedLqip"]})"'
                 break
         
         # Build product cards (horizontal scroll) - show ALL products
@@ -83,12 +89,14 @@ def generate_html_page(phone: str, results: Dict) -> str:
             title = product.get('title', '상품')
             link = product.get('link', '#')
             thumbnail = product.get('thumbnail', '')
+            lqip = product.get('thumbnailLqip', '')
+            lqip_attr = f' style="background-image: url({lqip})"' if lqip else ''
             
             if len(title) > 30:
                 title = title[:30] + '...'
             
             # Add referrerpolicy to help load external images
-            img_html = f'<img src="{thumbnail}" alt="{title}" referrerpolicy="no-referrer" loading="lazy" />' if thumbnail else '<div class="no-img">No Image</div>'
+            img_html = f'<img src="{thumbnail}" alt="{title}" referrerpolicy="no-referrer" loading="lazy"{lqip_attr} />' if thumbnail else '<div class="no-img">No Image</div>'
             
             products_html += f"""
                 <a href="{link}" target="_blank" class="product-card">
@@ -102,7 +110,7 @@ def generate_html_page(phone: str, results: Dict) -> str:
         categories_html += f"""
                 <div class="category-section">
                     <div class="category-header">
-                        <img src="{cropped_img}" alt="{category_ko}" class="cropped-thumb" />
+                        <img src="{cropped_img}"{cropped_attrs} alt="{category_ko}" class="cropped-thumb" width="72" height="72" />
                         <div class="category-info">
                             <h2>{category_ko}</h2>
                             <p>{num_products}개 상품</p>
@@ -258,6 +266,7 @@ def generate_html_page(phone: str, results: Dict) -> str:
             border-radius: 12px;
             object-fit: cover;
             background: #f5f5f5;
+            background-size: cover;
         }}
         
         .category-info h2 {{
@@ -307,6 +316,7 @@ def generate_html_page(phone: str, results: Dict) -> str:
             width: 100%;
             height: 100%;
             object-fit: cover;
+            background-size: cover;
         }}
         
         .no-img {{
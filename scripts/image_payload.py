@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Shared image payloads for upload / analyze / DINO-X calls.
+
+Replaces the per-script image_to_base64 helpers, which read the whole file,
+base64-encode it into a str and embed that in a JSON body (3+ full copies).
+
+- upload_file: multipart upload streamed straight from the file; the API gets
+  the bytes and hands back a URL to pass by reference.
+- post_json_with_image: when the API insists on a data URI, the JSON body is
+  streamed with the base64 encoded chunk by chunk from a memoryview over an
+  mmap of the file, so no full-size copy is ever held in memory.
+- track_peak: tracemalloc peak per image.
+"""
+
+import base64
+import json
+import mmap
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+import requests
+
+MIME_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.webp': 'image/webp',
+    '.heic': 'image/heic',
+    '.heif': 'image/heif',
+}
+CHUNK_BYTES = 3 * 64 * 1024  # multiple of 3 so chunks encode without padding
+PLACEHOLDER = '__IMAGE_PAYLOAD__'
+
+
+def mime_type(image_path: str) -> str:
+    return MIME_TYPES.get(os.path.splitext(str(image_path))[1].lower(), 'image/jpeg')
+
+
+def base64_length(size: int) -> int:
+    return 4 * ((size + 2) // 3)
+
+
+class StreamingBody:
+    """File-like request body built from byte pieces; requests streams it with a known length"""
+
+    def __init__(self, pieces: Iterator[bytes], length: int):
+        self._pieces = pieces
+        self._piece = b''
+        self._pos = 0
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0:
+            rest = self._piece[self._pos:] + b''.join(self._pieces)
+            self._piece, self._pos = b'', 0
+            return rest
+        while self._pos >= len(self._piece):
+            piece = next(self._pieces, None)
+            if piece is None:
+                return b''
+            self._piece, self._pos = piece, 0
+        data = self._piece[self._pos:self._pos + size]
+        self._pos += len(data)
+        return data
+
+
+@contextmanager
+def mapped(image_path: str):
+    """Read-only memoryview over the file (empty files can't be mmapped)"""
+    with open(image_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield memoryview(b'')
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                yield view
+            finally:
+                view.release()
+
+
+def iter_base64(view: memoryview) -> Iterator[bytes]:
+    for offset in range(0, len(view), CHUNK_BYTES):
+        yield base64.b64encode(view[offset:offset + CHUNK_BYTES])
+
+
+def data_uri(image_path: str) -> str:
+    """Data URI string, for SDKs that need one (a single encoded copy)"""
+    with mapped(image_path) as view:
+        return f'data:{mime_type(image_path)};base64,' + base64.b64encode(view).decode('ascii')
+
+
+def _chain(prefix: bytes, middle: Iterator[bytes], suffix: bytes) -> Iterator[bytes]:
+    yield prefix
+    yield from middle
+    yield suffix
+
+
+def json_image_body(payload: Dict, view: memoryview, image_path: str, field: str = 'image',
+                    as_data_uri: bool = True) -> StreamingBody:
+    """JSON body of `payload` with payload[field] = the base64 image, encoded lazily"""
+    body = dict(payload)
+    body[field] = PLACEHOLDER
+    prefix, suffix = json.dumps(body, ensure_ascii=False).encode('utf-8').split(PLACEHOLDER.encode('ascii'))
+    if as_data_uri:
+        prefix += f'data:{mime_type(image_path)};base64,'.encode('ascii')
+    length = len(prefix) + base64_length(len(view)) + len(suffix)
+    return StreamingBody(_chain(prefix, iter_base64(view), suffix), length)
+
+
+def post_json_with_image(url: str, payload: Dict, image_path: str, field: str = 'image',
+                         headers: Optional[Dict] = None, timeout: float = 60,
+                         as_data_uri: bool = True) -> requests.Response:
+    """
+    POST `payload` as JSON with payload[field] set to the image (data URI, or bare
+    base64 with as_data_uri=False), streaming the encoded image into the body.
+    """
+    with mapped(image_path) as view:
+        body = json_image_body(payload, view, image_path, field, as_data_uri)
+        headers = dict(headers or {}, **{'Content-Type': 'application/json'})
+        return requests.post(url, data=body, headers=headers, timeout=timeout)
+
+
+def upload_file(url: str, image_path: str, field: str = 'file', timeout: float = 60,
+                extra_fields: Optional[Dict[str, str]] = None) -> requests.Response:
+    """Multipart upload streamed from the file (raw bytes, no base64)"""
+    boundary = uuid.uuid4().hex
+    filename = os.path.basename(str(image_path))
+    head = b''
+    for name, value in (extra_fields or {}).items():
+        head += (f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+                 f'{value}\r\n').encode('utf-8')
+    head += (f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+             f'Content-Type: {mime_type(image_path)}\r\n\r\n').encode('utf-8')
+    tail = f'\r\n--{boundary}--\r\n'.encode('ascii')
+
+    with open(image_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        file_chunks = iter(lambda: f.read(CHUNK_BYTES), b'')
+        body = StreamingBody(_chain(head, file_chunks, tail), len(head) + size + len(tail))
+        return requests.post(url, data=body, timeout=timeout,
+                             headers={'Content-Type': f'multipart/form-data; boundary={boundary}'})
+
+
+@contextmanager
+def track_peak(label: str, report: Optional[Dict] = None):
+    """Print (and optionally record) the peak Python memory allocated inside the block"""
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start_time = time.time()
+    try:
+        yield
+    finally:
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        if started_here:
+            tracemalloc.stop()
+        print(f'   🧠 {label}: peak {peak / 1024:.0f} KB in {time.time() - start_time:.2f}s')
+        if report is not None:
+            report[label] = peak
+
+
+def main():
+    """Compare peak memory of the old data-URI string vs the streamed body"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Peak memory of image payload strategies')
+    parser.add_argument('images', nargs='+')
+    args = parser.parse_args()
+
+    for image_path in args.images:
+        size = os.path.getsize(image_path)
+        print(f'\n📸 {os.path.basename(image_path)} ({size / 1024:.0f} KB)')
+        with track_peak('json + data URI string'):
+            with open(image_path, 'rb') as f:
+                encoded = base64.b64encode(f.read()).decode('utf-8')
+            json.dumps({'image': f'data:{mime_type(image_path)};base64,{encoded}'}).encode('utf-8')
+            del encoded
+        with track_peak('streamed data URI body'):
+            with mapped(image_path) as view:
+                stream = json_image_body({}, view, image_path)
+                while stream.read(64 * 1024):
+                    pass
+
+
+if __name__ == '__main__':
+    sys.exit(main())
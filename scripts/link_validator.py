@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Validate product links and thumbnails before rendering and prune the dead ones.
+
+Every URL in a batch is checked in parallel (HEAD, falling back to GET) with a
+per-domain connection limit, and results are cached on disk with a TTL so
+regenerating pages doesn't re-check the same shops.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from thumbnail_mirror import USER_AGENT, iter_products
+
+# Configuration
+CACHE_FILE = Path('./link_cache.json')
+CACHE_TTL_SECONDS = 24 * 3600
+CHECK_WORKERS = 32
+PER_DOMAIN_LIMIT = 4
+CHECK_TIMEOUT = 10
+HEAD_FALLBACK_STATUSES = {400, 403, 405, 501}  # shops that reject HEAD but serve GET
+LOGIN_WALL_MARKERS = ('/login', '/signin', '/sign-in', '/member/login', 'nid.naver.com')
+
+# Link states
+ALIVE = 'alive'
+DEAD = 'dead'
+UNKNOWN = 'unknown'  # timeouts / 5xx: keep the product and don't cache the result
+
+
+def load_cache(cache_file: Path = CACHE_FILE) -> Dict[str, Dict]:
+    if not cache_file.exists():
+        return {}
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return {}
+    now = time.time()
+    return {url: entry for url, entry in cache.items() if now - entry.get('checked_at', 0) < CACHE_TTL_SECONDS}
+
+
+def cache_key(url: str, expect_image: bool) -> str:
+    """The verdict depends on the image Content-Type check, so links and thumbnails are cached apart"""
+    return f'{"image" if expect_image else "link"}:{url}'
+
+
+def save_cache(cache: Dict[str, Dict], cache_file: Path = CACHE_FILE):
+    tmp_file = Path(f'{cache_file}.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp_file, cache_file)
+
+
+def classify_response(response: requests.Response, expect_image: bool = False) -> str:
+    if response.status_code >= 500:
+        return UNKNOWN
+    if response.status_code >= 400:
+        return DEAD
+    final_url = response.url.lower()
+    if any(marker in final_url for marker in LOGIN_WALL_MARKERS):
+        return DEAD
+    if expect_image and not response.headers.get('Content-Type', 'image/').startswith('image/'):
+        return DEAD
+    return ALIVE
+
+
+class LinkValidator:
+    """Thread-pool URL checker with per-domain limits and a TTL cache"""
+
+    def __init__(self, cache_file: Path = CACHE_FILE, workers: int = CHECK_WORKERS,
+                 per_domain_limit: int = PER_DOMAIN_LIMIT):
+        self.cache_file = cache_file
+        self.cache = load_cache(cache_file)
+        self.workers = workers
+        self.per_domain_limit = per_domain_limit
+        self._domain_locks = defaultdict(lambda: threading.BoundedSemaphore(self.per_domain_limit))
+        self._lock = threading.Lock()
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+        adapter = requests.adapters.HTTPAdapter(pool_connections=64, pool_maxsize=workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _domain_semaphore(self, domain: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            return self._domain_locks[domain]
+
+    def check_url(self, url: str, expect_image: bool = False) -> str:
+        """HEAD with GET fallback; returns ALIVE, DEAD or UNKNOWN"""
+        with self._domain_semaphore(urlparse(url).netloc):
+            try:
+                response = self.session.head(url, timeout=CHECK_TIMEOUT, allow_redirects=True)
+                if response.status_code not in HEAD_FALLBACK_STATUSES:
+                    return classify_response(response, expect_image)
+            except requests.RequestException:
+                pass
+            try:
+                with self.session.get(url, timeout=CHECK_TIMEOUT, allow_redirects=True, stream=True) as response:
+                    return classify_response(response, expect_image)
+            except requests.RequestException:
+                return UNKNOWN
+
+    def check_many(self, urls: Set[Tuple[str, bool]]) -> Dict[str, str]:
+        """
+        Check (url, expect_image) pairs in parallel, serving fresh entries from the cache.
+
+        States are keyed by cache_key(), so a URL used both as a product link and as
+        a thumbnail gets a verdict for each check.
+        """
+        states = {}
+        to_check = []
+        for url, expect_image in urls:
+            key = cache_key(url, expect_image)
+            cached = self.cache.get(key)
+            if cached:
+                states[key] = cached['state']
+            else:
+                to_check.append((url, expect_image))
+
+        if to_check:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                checked = pool.map(lambda args: self.check_url(*args), to_check)
+                now = time.time()
+                for (url, expect_image), state in zip(to_check, checked):
+                    key = cache_key(url, expect_image)
+                    states[key] = state
+                    if state != UNKNOWN:
+                        self.cache[key] = {'state': state, 'checked_at': now}
+            save_cache(self.cache, self.cache_file)
+        return states
+
+
+def prune_dead_products(result_datas: List[Dict], demote: bool = False,
+                        validator: Optional[LinkValidator] = None) -> Dict:
+    """
+    Drop products whose link is dead (or move them to the end with demote=True) and
+    clear dead thumbnails so they render as "No Image" after the live cards.
+    """
+    validator = validator or LinkValidator()
+
+    urls = set()
+    for result_data in result_datas:
+        for product in iter_products(result_data):
+            link = product.get('link', '')
+            if link.startswith('http'):
+                urls.add((link, False))
+            # Already mirrored thumbnails are local and need no check
+            thumbnail = product.get('thumbnail') or ''
+            if thumbnail.startswith('http'):
+                urls.add((thumbnail, True))
+
+    print(f'  🔗 Validating {len(urls)} product links and thumbnails...')
+    start_time = time.time()
+    states = validator.check_many(urls)
+
+    domain_stats = defaultdict(lambda: {'links': 0, 'dead_links': 0, 'thumbnails': 0, 'dead_thumbnails': 0})
+    stats = {'checked': len(urls), 'dropped': 0, 'demoted': 0, 'thumbnails_cleared': 0}
+
+    for result_data in result_datas:
+        search_results = result_data.get('search_results', {}).get('results', {})
+        for category, products in search_results.items():
+            alive, demoted = [], []
+            for product in products or []:
+                link = product.get('link', '')
+                domain = urlparse(link).netloc or 'unknown'
+                domain_stats[domain]['links'] += 1
+
+                if states.get(cache_key(link, False)) == DEAD:
+                    domain_stats[domain]['dead_links'] += 1
+                    if demote:
+                        stats['demoted'] += 1
+                        demoted.append(product)
+                    else:
+                        stats['dropped'] += 1
+                    continue
+
+                thumbnail = product.get('thumbnail') or ''
+                if thumbnail.startswith('http'):
+                    domain_stats[domain]['thumbnails'] += 1
+                    if states.get(cache_key(thumbnail, True)) == DEAD:
+                        domain_stats[domain]['dead_thumbnails'] += 1
+                        product['thumbnail'] = ''
+                        stats['thumbnails_cleared'] += 1
+                        demoted.append(product)
+                        continue
+                alive.append(product)
+            search_results[category] = alive + demoted
+
+    stats['domains'] = dict(domain_stats)
+    stats['elapsed_seconds'] = round(time.time() - start_time, 2)
+    print(f'  ✅ {stats["dropped"]} dropped, {stats["demoted"]} demoted, '
+          f'{stats["thumbnails_cleared"]} dead thumbnails ({stats["elapsed_seconds"]}s)')
+    return stats
+
+
+def print_domain_report(stats: Dict, top: int = 15):
+    """Per shop domain dead-link rates, worst first"""
+    rows = sorted(stats.get('domains', {}).items(),
+                  key=lambda kv: (kv[1]['dead_links'] + kv[1]['dead_thumbnails'], kv[1]['links']), reverse=True)
+    print(f'\n{"Domain":<40} {"Links":>6} {"Dead":>6} {"Thumbs":>7} {"Dead":>6}')
+    print('-' * 70)
+    for domain, row in rows[:top]:
+        print(f'{domain[:40]:<40} {row["links"]:>6} {row["dead_links"]:>6} {row["thumbnails"]:>7} {row["dead_thumbnails"]:>6}')
+
+
+def main():
+    """Prune dead products from result JSON files in place"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Drop dead product links and thumbnails from result JSON files')
+    parser.add_argument('result_files', nargs='+', help='*_result.json files to rewrite')
+    parser.add_argument('--demote', action='store_true', help='Move dead products to the end instead of dropping them')
+    parser.add_argument('--dry-run', action='store_true', help='Only report, do not rewrite files')
+    args = parser.parse_args()
+
+    result_datas = []
+    for path in args.result_files:
+        with open(path, 'r', encoding='utf-8') as f:
+            result_datas.append(json.load(f))
+
+    stats = prune_dead_products(result_datas, demote=args.demote)
+    print_domain_report(stats)
+
+    if not args.dry_run:
+        for path, result_data in zip(args.result_files, result_datas):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(result_data, f, indent=2, ensure_ascii=False)
+        print(f'\n✅ Rewrote {len(result_datas)} result files')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
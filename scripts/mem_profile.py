@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Per-stage memory profiling for batch runs.
+
+With --profile-memory the batch runner wraps every stage (download, upload,
+analyze, search, render) in MemoryProfiler.stage(). Each stage records the
+peak it reached above its starting point and what it left allocated, and a
+tracemalloc snapshot taken at the stage boundary attributes the growth to call
+sites. The JSON report keeps the top allocators overall and per stage; `diff`
+compares two reports so a change that holds on to more memory shows up.
+
+Usage:
+    python3 mem_profile.py show batch4_results/memory_profile_20250101_120000.json
+    python3 mem_profile.py diff old_profile.json new_profile.json
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+TRACE_FRAMES = 8
+TOP_SITES = 15
+SNAPSHOT_EVERY = 1      # snapshot every Nth call of a stage (snapshots cost time on big heaps)
+
+
+def site_name(frame) -> str:
+    parts = frame.filename.replace('\\', '/').split('/')
+    return f'{"/".join(parts[-2:])}:{frame.lineno}'
+
+
+class MemoryProfiler:
+    """tracemalloc snapshots at stage boundaries; a no-op until start()"""
+
+    def __init__(self, frames: int = TRACE_FRAMES, snapshot_every: int = SNAPSHOT_EVERY):
+        self.frames = frames
+        self.snapshot_every = max(1, snapshot_every)
+        self.enabled = False
+        self.started_at = None
+        self.stages: Dict[str, Dict] = defaultdict(lambda: {'calls': 0, 'peak_bytes': 0, 'retained_bytes': 0})
+        self.stage_sites: Dict[str, Counter] = defaultdict(Counter)
+        self._lock = threading.Lock()
+        self._active = 0
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self.enabled = True
+        self.started_at = time.time()
+        return self
+
+    @staticmethod
+    def _snapshot():
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+        ])
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+
+        with self._lock:
+            self._active += 1
+            calls = self.stages[name]['calls'] + 1
+            self.stages[name]['calls'] = calls
+        take_snapshot = calls % self.snapshot_every == 0
+        before = self._snapshot() if take_snapshot else None
+        with self._lock:
+            # Stages of concurrent users overlap, so only reset the peak when nothing else runs
+            if self._active == 1:
+                tracemalloc.reset_peak()
+        start_current = tracemalloc.get_traced_memory()[0]
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            after = self._snapshot() if take_snapshot else None
+            with self._lock:
+                self._active -= 1
+                stats = self.stages[name]
+                stats['peak_bytes'] = max(stats['peak_bytes'], peak - start_current)
+                stats['retained_bytes'] += current - start_current
+                if take_snapshot:
+                    for diff in after.compare_to(before, 'lineno'):
+                        if diff.size_diff > 0:
+                            self.stage_sites[name][site_name(diff.traceback[0])] += diff.size_diff
+
+    def report(self) -> Dict:
+        current, peak = tracemalloc.get_traced_memory() if self.enabled else (0, 0)
+        top = []
+        if self.enabled:
+            for stat in self._snapshot().statistics('lineno')[:TOP_SITES]:
+                top.append({'site': site_name(stat.traceback[0]), 'bytes': stat.size, 'count': stat.count})
+        with self._lock:
+            return {
+                'created_at': datetime.now().isoformat(),
+                'duration_seconds': round(time.time() - self.started_at, 1) if self.started_at else 0,
+                'current_bytes': current,
+                'peak_bytes': peak,
+                'stages': {name: dict(stats) for name, stats in self.stages.items()},
+                'stage_sites': {name: [{'site': site, 'bytes': size} for site, size in sites.most_common(TOP_SITES)]
+                                for name, sites in self.stage_sites.items()},
+                'top_allocators': top,
+            }
+
+    def write_report(self, output_dir, label: str = 'memory_profile') -> Optional[str]:
+        if not self.enabled:
+            return None
+        report = self.report()
+        path = os.path.join(str(output_dir), f'{label}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print_report(report)
+        print(f'💾 Memory profile: {path}')
+        return path
+
+
+def mb(size: float) -> str:
+    return f'{size / (1024 * 1024):.1f} MB'
+
+
+def print_report(report: Dict):
+    print(f'\n🧠 Memory: peak {mb(report["peak_bytes"])}, still allocated {mb(report["current_bytes"])}')
+    print(f'{"Stage":<14} {"Calls":>6} {"Peak":>10} {"Retained":>10}')
+    for name, stats in report['stages'].items():
+        print(f'{name:<14} {stats["calls"]:>6} {mb(stats["peak_bytes"]):>10} {mb(stats["retained_bytes"]):>10}')
+
+    for name, sites in report['stage_sites'].items():
+        if sites:
+            print(f'\n   {name}: top growth')
+            for site in sites[:5]:
+                print(f'      {mb(site["bytes"]):>9}  {site["site"]}')
+
+    print(f'\n   Largest live allocations at the end of the run')
+    for site in report['top_allocators'][:10]:
+        print(f'      {mb(site["bytes"]):>9}  {site["site"]} ({site["count"]} blocks)')
+
+
+def diff_reports(old: Dict, new: Dict) -> List[Dict]:
+    """Per call site change in live bytes at the end of the run, largest growth first"""
+    old_sites = {s['site']: s['bytes'] for s in old['top_allocators']}
+    new_sites = {s['site']: s['bytes'] for s in new['top_allocators']}
+    rows = [{'site': site, 'old': old_sites.get(site, 0), 'new': new_sites.get(site, 0),
+             'delta': new_sites.get(site, 0) - old_sites.get(site, 0)}
+            for site in set(old_sites) | set(new_sites)]
+    return sorted(rows, key=lambda row: row['delta'], reverse=True)
+
+
+def print_diff(old: Dict, new: Dict):
+    print(f'🧠 Peak {mb(old["peak_bytes"])} → {mb(new["peak_bytes"])}, '
+          f'retained {mb(old["current_bytes"])} → {mb(new["current_bytes"])}')
+    print(f'\n{"Stage":<14} {"Peak (old → new)":>26} {"Retained (old → new)":>26}')
+    for name in sorted(set(old['stages']) | set(new['stages'])):
+        o = old['stages'].get(name, {'peak_bytes': 0, 'retained_bytes': 0})
+        n = new['stages'].get(name, {'peak_bytes': 0, 'retained_bytes': 0})
+        print(f'{name:<14} {mb(o["peak_bytes"]):>11} → {mb(n["peak_bytes"]):>11} '
+              f'{mb(o["retained_bytes"]):>11} → {mb(n["retained_bytes"]):>11}')
+
+    print(f'\n{"Delta":>10}  Call site')
+    for row in diff_reports(old, new)[:TOP_SITES]:
+        sign = '+' if row['delta'] >= 0 else '-'
+        print(f'{sign}{mb(abs(row["delta"])):>9}  {row["site"]}')
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Show or diff batch memory profiles')
+    parser.add_argument('command', choices=['show', 'diff'])
+    parser.add_argument('reports', nargs='+')
+    args = parser.parse_args()
+
+    loaded = []
+    for path in args.reports:
+        with open(path, 'r', encoding='utf-8') as f:
+            loaded.append(json.load(f))
+
+    if args.command == 'show':
+        for report in loaded:
+            print_report(report)
+    elif len(loaded) != 2:
+        parser.error('diff needs exactly two reports')
+    else:
+        print_diff(*loaded)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Minify published result pages and write precompressed .gz / .br siblings.
+
+Static hosting can then serve the precompressed bytes directly instead of
+compressing every response on the fly.
+"""
+
+import gzip
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+# Configuration
+RESULTS_DIR = Path('./public/results')
+COMPRESS_WORKERS = os.cpu_count() or 4
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+# Blocks that are minified with their own rules (or left verbatim)
+RAW_BLOCK_RE = re.compile(r'(<(style|script|pre|textarea)\b[^>]*>)(.*?)(</\2\s*>)', re.IGNORECASE | re.DOTALL)
+HTML_COMMENT_RE = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+CSS_TOKEN_RE = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/)', re.DOTALL)
+
+
+def minify_markup(html: str) -> str:
+    """Drop comments and indentation; whitespace containing a newline becomes a single newline"""
+    html = HTML_COMMENT_RE.sub('', html)
+    return re.sub(r'[ \t]*\n\s*', '\n', html)
+
+
+def minify_css(css: str) -> str:
+    """Remove comments and whitespace around punctuation, leaving quoted strings untouched"""
+    out = []
+    for idx, token in enumerate(CSS_TOKEN_RE.split(css)):
+        if idx % 2 == 1:
+            if not token.startswith('/*'):
+                out.append(token)
+            continue
+        token = re.sub(r'\s+', ' ', token)
+        token = re.sub(r'\s*([{};,>])\s*', r'\1', token)
+        token = re.sub(r':\s+', ':', token)  # only after ':' so `a :hover` keeps its meaning
+        out.append(token)
+    return ''.join(out).replace(';}', '}').strip()
+
+
+def minify_js(js: str) -> str:
+    """
+    Line-level JS minification that cannot change semantics: newlines are kept for
+    automatic semicolon insertion, only indentation, blank lines and whole-line
+    `//` comments are dropped, and template literal bodies are kept verbatim.
+    """
+    out = []
+    in_template = False
+    for line in js.split('\n'):
+        if in_template:
+            out.append(line)
+        else:
+            stripped = line.strip()
+            if stripped and not stripped.startswith('//'):
+                out.append(stripped)
+        if len(re.findall(r'(?<!\\)`', line)) % 2 == 1:
+            in_template = not in_template
+    return '\n'.join(out)
+
+
+def minify_html(html: str) -> str:
+    """Minify a full page, handling inline <style>/<script> blocks separately"""
+    out = []
+    pos = 0
+    for match in RAW_BLOCK_RE.finditer(html):
+        out.append(minify_markup(html[pos:match.start()]))
+        open_tag, tag, body, close_tag = match.group(1), match.group(2).lower(), match.group(3), match.group(4)
+        if tag == 'style':
+            body = minify_css(body)
+        elif tag == 'script' and 'src=' not in open_tag.lower():
+            body = minify_js(body)
+        out.append(f'{open_tag}{body}{close_tag}')
+        pos = match.end()
+    out.append(minify_markup(html[pos:]))
+    return ''.join(out).strip() + '\n'
+
+
+def compress_file(path: str, minify: bool = True) -> Dict:
+    """Minify one page in place and write its .gz/.br siblings (runs in a worker process)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        original = f.read()
+
+    text = minify_html(original) if minify else original
+    if text != original:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    data = text.encode('utf-8')
+    gz_data = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    with open(f'{path}.gz', 'wb') as f:
+        f.write(gz_data)
+
+    br_size = None
+    if brotli is not None:
+        br_data = brotli.compress(data, mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY)
+        with open(f'{path}.br', 'wb') as f:
+            f.write(br_data)
+        br_size = len(br_data)
+
+    return {
+        'path': path,
+        'original_bytes': len(original.encode('utf-8')),
+        'minified_bytes': len(data),
+        'gzip_bytes': len(gz_data),
+        'brotli_bytes': br_size,
+    }
+
+
+def collect_pages(paths: Iterable) -> List[str]:
+    """Expand directories into their .html files"""
+    pages = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            pages.extend(str(p) for p in sorted(path.glob('*.html')))
+        elif path.suffix == '.html':
+            pages.append(str(path))
+    return pages
+
+
+def compress_pages(paths: Iterable, minify: bool = True, workers: int = COMPRESS_WORKERS) -> Dict:
+    """Minify and precompress pages in a worker pool, returning a batch report"""
+    pages = collect_pages(paths)
+    start_time = time.time()
+
+    if brotli is None:
+        print('⚠️  brotli not installed (pip install brotli) - writing .gz only')
+
+    files = []
+    if pages:
+        # Imported here: multiprocessing is most of this module's import time
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            files = list(pool.map(compress_file, pages, [minify] * len(pages), chunksize=8))
+
+    report = {
+        'files': len(files),
+        'original_bytes': sum(f['original_bytes'] for f in files),
+        'minified_bytes': sum(f['minified_bytes'] for f in files),
+        'gzip_bytes': sum(f['gzip_bytes'] for f in files),
+        'brotli_bytes': sum(f['brotli_bytes'] for f in files) if brotli is not None else None,
+        'elapsed_seconds': round(time.time() - start_time, 2),
+        'details': files,
+    }
+    return report
+
+
+def print_compression_report(report: Dict):
+    """Print per-batch totals"""
+    original = report['original_bytes'] or 1
+
+    def line(label, size):
+        print(f'   {label:<10} {size / 1024:>10.1f} KB  ({size / original * 100:5.1f}%)')
+
+    print(f'\n{"="*60}')
+    print(f'COMPRESSION REPORT - {report["files"]} pages in {report["elapsed_seconds"]}s')
+    print(f'{"="*60}')
+    line('Original', report['original_bytes'])
+    line('Minified', report['minified_bytes'])
+    line('Gzip', report['gzip_bytes'])
+    if report['brotli_bytes'] is not None:
+        line('Brotli', report['brotli_bytes'])
+    print(f'{"="*60}\n')
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Minify result pages and write .gz/.br siblings')
+    parser.add_argument('paths', nargs='*', default=[str(RESULTS_DIR)], help='HTML files or directories (default: public/results)')
+    parser.add_argument('--no-minify', action='store_true', help='Only precompress, leave HTML as is')
+    parser.add_argument('--workers', type=int, default=COMPRESS_WORKERS, help='Worker processes')
+    args = parser.parse_args()
+
+    report = compress_pages(args.paths, minify=not args.no_minify, workers=args.workers)
+    print_compression_report(report)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate index for incoming screenshots.
+
+The same outfit often comes back as a different screenshot (NAVER, TikTok Lite,
+Instagram): other status bar, other crop, recompressed. Exact hashes miss those,
+so every processed original gets a 64-bit pHash (DCT) and dHash (gradient),
+computed after trimming the status/navigation bars. Hashes live in one NumPy
+uint64 array (n x 2) next to a JSON list of result keys; lookups walk a BK-tree
+over the pHash for everything within a Hamming radius, then confirm on dHash.
+
+Usage:
+    python3 phash_index.py build batch4_results/phash_index img1.jpg img2.jpg ...
+    python3 phash_index.py query batch4_results/phash_index screenshot.jpg
+"""
+
+import io
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageOps
+
+# Hashing
+TRIM_TOP = 0.07             # status bar
+TRIM_BOTTOM = 0.06          # navigation bar / app tab bar
+HASH_SIZE = 8               # 8x8 bits = 64-bit hashes
+PHASH_SAMPLE = 32           # pHash DCT input size
+
+# Matching (Hamming distance out of 64)
+PHASH_RADIUS = 8
+DHASH_RADIUS = 12
+
+HASHES_FILE = 'hashes.npy'
+KEYS_FILE = 'keys.json'
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+DCT = _dct_matrix(PHASH_SAMPLE)
+
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(bits.astype(np.uint8).ravel()).tobytes(), 'big')
+
+
+def _trimmed_gray(img: Image.Image) -> Image.Image:
+    img = ImageOps.exif_transpose(img).convert('L')
+    width, height = img.size
+    if height > width:  # phone screenshot: drop the system bars
+        img = img.crop((0, int(height * TRIM_TOP), width, int(height * (1 - TRIM_BOTTOM))))
+    return img
+
+
+def image_hashes(img: Image.Image) -> Tuple[int, int]:
+    """(pHash, dHash) of an image"""
+    gray = _trimmed_gray(img)
+
+    pixels = np.asarray(gray.resize((PHASH_SAMPLE, PHASH_SAMPLE), Image.LANCZOS), dtype=np.float64)
+    low = (DCT @ pixels @ DCT.T)[:HASH_SIZE, :HASH_SIZE]
+    phash = _bits_to_int(low > np.median(low.ravel()[1:]))
+
+    pixels = np.asarray(gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS), dtype=np.int16)
+    dhash = _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+    return phash, dhash
+
+
+def hashes_from_bytes(data: bytes) -> Tuple[int, int]:
+    with Image.open(io.BytesIO(data)) as img:
+        return image_hashes(img)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class BKTree:
+    """Metric tree over 64-bit hashes; `search` prunes with the triangle inequality"""
+
+    def __init__(self):
+        self.nodes: List[Tuple[int, int, Dict[int, int]]] = []  # (hash, row, {distance: child})
+
+    def add(self, value: int, row: int):
+        if not self.nodes:
+            self.nodes.append((value, row, {}))
+            return
+        node = 0
+        while True:
+            node_value, _, children = self.nodes[node]
+            distance = hamming(value, node_value)
+            child = children.get(distance)
+            if child is None:
+                children[distance] = len(self.nodes)
+                self.nodes.append((value, row, {}))
+                return
+            node = child
+
+    def search(self, value: int, radius: int) -> List[Tuple[int, int]]:
+        """(distance, row) for every hash within `radius`"""
+        if not self.nodes:
+            return []
+        matches = []
+        stack = [0]
+        while stack:
+            node_value, row, children = self.nodes[stack.pop()]
+            distance = hamming(value, node_value)
+            if distance <= radius:
+                matches.append((distance, row))
+            for child_distance, child in children.items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+        return matches
+
+
+class NearDuplicateIndex:
+    """Persistent pHash/dHash index: result key per processed original"""
+
+    def __init__(self, index_dir, phash_radius: int = PHASH_RADIUS, dhash_radius: int = DHASH_RADIUS):
+        self.index_dir = Path(index_dir)
+        self.phash_radius = phash_radius
+        self.dhash_radius = dhash_radius
+        self.hashes = np.zeros((0, 2), dtype=np.uint64)
+        self.keys: List[str] = []
+        self.tree = BKTree()
+        self.stats = {'lookups': 0, 'hits': 0, 'lookup_seconds': 0.0}
+        self._pending: List[Tuple[int, int]] = []
+        self._lock = threading.Lock()
+        self.load()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def load(self):
+        hashes_path = self.index_dir / HASHES_FILE
+        keys_path = self.index_dir / KEYS_FILE
+        if not (hashes_path.exists() and keys_path.exists()):
+            return
+        hashes = np.load(hashes_path)
+        with open(keys_path, 'r', encoding='utf-8') as f:
+            keys = json.load(f)
+        if len(keys) != len(hashes):
+            print(f'⚠️  {self.index_dir}: {len(keys)} keys for {len(hashes)} hashes, ignoring index')
+            return
+        self.hashes, self.keys = hashes, keys
+        for row, phash in enumerate(hashes[:, 0].tolist()):
+            self.tree.add(phash, row)
+
+    def save(self):
+        with self._lock:
+            if self._pending:
+                added = np.array(self._pending, dtype=np.uint64)
+                self.hashes = np.concatenate([self.hashes, added])
+                self._pending = []
+            hashes, keys = self.hashes, list(self.keys)
+
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        tmp_hashes = self.index_dir / f'{HASHES_FILE}.tmp'
+        tmp_keys = self.index_dir / f'{KEYS_FILE}.tmp'
+        with open(tmp_hashes, 'wb') as f:
+            np.save(f, hashes)
+        with open(tmp_keys, 'w', encoding='utf-8') as f:
+            json.dump(keys, f)
+        os.replace(tmp_hashes, self.index_dir / HASHES_FILE)
+        os.replace(tmp_keys, self.index_dir / KEYS_FILE)
+
+    def _dhash(self, row: int) -> int:
+        if row < len(self.hashes):
+            return int(self.hashes[row, 1])
+        return self._pending[row - len(self.hashes)][1]
+
+    def add(self, key: str, hashes: Tuple[int, int]):
+        with self._lock:
+            row = len(self.keys)
+            self.keys.append(key)
+            self._pending.append(hashes)
+            self.tree.add(hashes[0], row)
+
+    def lookup(self, hashes: Tuple[int, int]) -> Optional[Dict]:
+        """Closest prior image within both radii, or None"""
+        start_time = time.time()
+        phash, dhash = hashes
+        with self._lock:
+            best = None
+            for distance, row in self.tree.search(phash, self.phash_radius):
+                dhash_distance = hamming(dhash, self._dhash(row))
+                if dhash_distance > self.dhash_radius:
+                    continue
+                score = distance + dhash_distance
+                if best is None or score < best['score']:
+                    best = {'key': self.keys[row], 'phash_distance': distance,
+                            'dhash_distance': dhash_distance, 'score': score}
+            self.stats['lookups'] += 1
+            self.stats['hits'] += best is not None
+            self.stats['lookup_seconds'] += time.time() - start_time
+        return best
+
+    def print_report(self):
+        lookups = self.stats['lookups']
+        if not lookups:
+            return
+        print(f'\n🪞 Near-duplicate index: {len(self)} originals, {self.stats["hits"]}/{lookups} lookups reused '
+              f'({self.stats["lookup_seconds"] / lookups * 1000:.2f} ms/lookup)')
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Perceptual-hash near-duplicate index')
+    parser.add_argument('command', choices=['build', 'query'])
+    parser.add_argument('index_dir')
+    parser.add_argument('images', nargs='+')
+    parser.add_argument('--radius', type=int, default=PHASH_RADIUS, help='pHash Hamming radius')
+    args = parser.parse_args()
+
+    index = NearDuplicateIndex(args.index_dir, phash_radius=args.radius)
+    for image_path in args.images:
+        with Image.open(image_path) as img:
+            hashes = image_hashes(img)
+        if args.command == 'build':
+            index.add(Path(image_path).stem, hashes)
+            continue
+        match = index.lookup(hashes)
+        if match:
+            print(f'✅ {image_path} ≈ {match["key"]} (pHash {match["phash_distance"]}, dHash {match["dhash_distance"]})')
+        else:
+            print(f'➖ {image_path}: no near duplicate')
+
+    if args.command == 'build':
+        index.save()
+        print(f'💾 {len(index)} originals in {args.index_dir}')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -39,7 +39,7 @@ def create_phone_mapping():
     print(f"✅ Created mapping for {len(mapping)} phone numbers")
     return mapping
 
-if __name__ == '__main__':
+def main():
     # Test
     test_phone = "1040455757"
     hashed = hash_phone(test_phone)
@@ -55,3 +55,6 @@ if __name__ == '__main__':
     for i, (phone, hashed) in enumerate(list(mapping.items())[:5]):
         print(f"  {phone} → {hashed}")
 
+
+if __name__ == '__main__':
+    main()
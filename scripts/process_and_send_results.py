@@ -12,7 +12,6 @@ Usage:
     python3 process_and_send_results.py --mode [test|production]
 """
 
-import pandas as pd
 import requests
 import time
 import json
@@ -20,6 +19,7 @@ import os
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 import argparse
+from cpu_profile import CpuProfiler, add_profile_args
 
 # Configuration
 EXCEL_FILE_PATH = '/Users/levit/Desktop/file+phonenumber.xlsx'
@@ -34,6 +34,9 @@ TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID')
 TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN')
 TWILIO_FROM_NUMBER = os.getenv('TWILIO_FROM_NUMBER')
 
+# Started by --profile-cpu
+CPU = CpuProfiler()
+
 class PipelineProcessor:
     def __init__(self, backend_url: str, results_dir: str = './batch_user_results'):
         self.backend_url = backend_url
@@ -150,24 +153,28 @@ class PipelineProcessor:
         }
         
         # Step 1: Download image
-        local_path = self.download_image(image_url, phone)
+        with CPU.stage('download'):
+            local_path = self.download_image(image_url, phone)
         if not local_path:
             return result
         
         # Step 2: Upload to backend (get S3 URL)
-        uploaded_url = self.upload_to_backend(local_path)
+        with CPU.stage('upload'):
+            uploaded_url = self.upload_to_backend(local_path)
         if not uploaded_url:
             return result
         result['uploaded_url'] = uploaded_url
         
         # Step 3: Crop items
-        crop_data = self.crop_items(uploaded_url)
+        with CPU.stage('analyze'):
+            crop_data = self.crop_items(uploaded_url)
         if not crop_data:
             return result
         result['cropped_data'] = crop_data
         
         # Step 4: Search for products
-        search_data = self.search_items(crop_data, uploaded_url)
+        with CPU.stage('search'):
+            search_data = self.search_items(crop_data, uploaded_url)
         if not search_data:
             return result
         result['search_results'] = search_data
@@ -279,8 +286,14 @@ def main():
                        help='Skip processing, only send messages (assumes results exist)')
     parser.add_argument('--skip-sending', action='store_true',
                        help='Skip sending messages, only process images')
+    add_profile_args(parser)
     args = parser.parse_args()
     
+    global CPU
+    CPU = CpuProfiler.from_args(args)
+    
+    import pandas as pd  # only needed once the batch actually runs (not for --help)
+    
     # Read Excel file
     print("📖 Reading Excel file...")
     df = pd.read_excel(EXCEL_FILE_PATH)
@@ -340,7 +353,9 @@ def main():
         # Send message to user
         if not args.skip_sending and result:
             print(f"\n📱 Sending message to {phone}...")
-            if sender.send_message(phone, result):
+            with CPU.stage('send'):
+                sent = sender.send_message(phone, result)
+            if sent:
                 results_summary['messages_sent'] += 1
             else:
                 results_summary['messages_failed'] += 1
@@ -368,6 +383,8 @@ def main():
     print(f"Messages failed: {results_summary['messages_failed']}")
     print(f"Summary saved to: {summary_file}")
     print(f"{'='*60}")
+    
+    CPU.finish()
 
 
 if __name__ == '__main__':
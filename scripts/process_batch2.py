@@ -11,6 +11,7 @@ import pandas as pd
 from pathlib import Path
 from datetime import datetime
 from html_generator_mobile import generate_html_page
+from cpu_profile import CpuProfiler, add_profile_args
 
 # Configuration
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:3001')
@@ -18,6 +19,9 @@ EXCEL_FILE = '/Users/levit/Desktop/file+phonenumber2.xlsx'
 OUTPUT_DIR = './batch2_results'
 PUBLIC_DIR = './public/results'
 
+# Started by --profile-cpu
+CPU = CpuProfiler()
+
 def ensure_dirs():
     """Create necessary directories."""
     Path(OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
@@ -114,17 +118,20 @@ def process_user(user, index, total):
         # 1. Download image
         print("📥 Downloading...")
         image_path = f"{OUTPUT_DIR}/{phone}_original.jpg"
-        download_image(image_url, image_path)
+        with CPU.stage('download'):
+            download_image(image_url, image_path)
         print(f"✅ Downloaded")
         
         # 2. Upload to frontend
         print("📤 Uploading...")
-        uploaded_url = upload_to_frontend(image_path)
+        with CPU.stage('upload'):
+            uploaded_url = upload_to_frontend(image_path)
         print(f"✅ Uploaded")
         
         # 3. Analyze and crop
         print("✂️  Analyzing...")
-        cropped_images = analyze_and_crop(uploaded_url)
+        with CPU.stage('analyze'):
+            cropped_images = analyze_and_crop(uploaded_url)
         print(f"✅ Found {len(cropped_images)} items")
         
         # Skip if no items found
@@ -134,7 +141,8 @@ def process_user(user, index, total):
         else:
             # 4. Search
             print("🔍 Searching...")
-            search_results = search_items(uploaded_url, cropped_images)
+            with CPU.stage('search'):
+                search_results = search_items(uploaded_url, cropped_images)
         
         # Count total shopping links
         total_links = 0
@@ -170,7 +178,8 @@ def process_user(user, index, total):
         
         # 6. Generate HTML
         print("🎨 Generating HTML...")
-        html = generate_html_page(phone, result_data)
+        with CPU.stage('render'):
+            html = generate_html_page(phone, result_data)
         
         html_path = f"{OUTPUT_DIR}/{phone}_result.html"
         with open(html_path, 'w', encoding='utf-8') as f:
@@ -199,6 +208,15 @@ def process_user(user, index, total):
         }
 
 def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Process batch 2 users')
+    add_profile_args(parser)
+    args = parser.parse_args()
+    
+    global CPU
+    CPU = CpuProfiler.from_args(args)
+    
     print("=" * 60)
     print("BATCH 2 PROCESSING - NEW 17 USERS")
     print("=" * 60)
@@ -254,6 +272,8 @@ def main():
     if success_count > 0:
         print("\n✅ All HTML files are in: ./public/results/")
         print("📦 Run 'npx vercel --prod --yes' to deploy all links!")
+    
+    CPU.finish()
 
 if __name__ == '__main__':
     main()
@@ -10,6 +10,7 @@ from pathlib import Path
 from datetime import datetime
 from phone_hasher import hash_phone
 from html_generator_mobile import generate_html_page
+from cpu_profile import CpuProfiler, add_profile_args
 
 # Configuration
 EXCEL_FILE = '/Users/levit/Desktop/file+phonenumber3.xlsx'
@@ -18,6 +19,9 @@ BATCH_NAME = 'batch3'
 OUTPUT_DIR = Path('./batch3_results')
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+# Started by --profile-cpu
+CPU = CpuProfiler()
+
 def upload_to_frontend(image_url: str):
     """Download image from URL and upload to frontend"""
     try:
@@ -128,13 +132,16 @@ def process_user(phone: str, image_url: str):
         print(f'{"="*80}')
         
         # Step 1: Upload image
-        uploaded_url = upload_to_frontend(image_url)
+        with CPU.stage('upload'):
+            uploaded_url = upload_to_frontend(image_url)
         
         # Step 2: Analyze and crop
-        items = analyze_and_crop(uploaded_url)
+        with CPU.stage('analyze'):
+            items = analyze_and_crop(uploaded_url)
         
         # Step 3: Search products
-        search_data = search_products(items, uploaded_url)
+        with CPU.stage('search'):
+            search_data = search_products(items, uploaded_url)
         
         # Step 4: Save results
         result_data = {
@@ -151,7 +158,8 @@ def process_user(phone: str, image_url: str):
         
         # Step 5: Generate HTML with hashed filename
         hashed_id = hash_phone(phone)
-        html_content = generate_html_page(phone, result_data)
+        with CPU.stage('render'):
+            html_content = generate_html_page(phone, result_data)
         
         # Save to public/results with hashed name
         public_dir = Path('./public/results')
@@ -189,6 +197,15 @@ def process_user(phone: str, image_url: str):
 
 def main():
     """Main processing function"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Process batch 3 users')
+    add_profile_args(parser)
+    args = parser.parse_args()
+    
+    global CPU
+    CPU = CpuProfiler.from_args(args)
+    
     print('\n' + '='*80)
     print('BATCH 3 PROCESSING')
     print('='*80 + '\n')
@@ -268,6 +285,8 @@ def main():
         for result in results:
             if result['status'] == 'failed':
                 print(f'   - {result["phone"]}: {result["error"]}')
+    
+    CPU.finish()
 
 if __name__ == '__main__':
     main()
@@ -3,6 +3,7 @@
 Process Batch 3 Final - 58 users
 Uses deployed API at fashionsource.vercel.app
 """
+import argparse
 import pandas as pd
 import requests
 import json
@@ -13,6 +14,7 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent))
 from phone_hasher import hash_phone
 from html_generator_mobile import generate_html_page
+from cpu_profile import CpuProfiler, add_profile_args
 
 # Configuration
 EXCEL_FILE = '/Users/levit/Desktop/final_file+phonenumber3.xlsx'
@@ -20,6 +22,10 @@ API_BASE = 'https://fashionsource.vercel.app'
 OUTPUT_DIR = Path('./batch3_results')
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+parser = argparse.ArgumentParser(description='Process the batch 3 final users against the deployed API')
+add_profile_args(parser)
+CPU = CpuProfiler.from_args(parser.parse_args())
+
 print('\n' + '='*80)
 print('BATCH 3 FINAL - PROCESSING 58 USERS')
 print('='*80)
@@ -38,36 +44,38 @@ def process_user(phone, image_url):
         print(f'{"="*80}')
         
         # Step 1: Upload image
-        print(f'  📥 Downloading image...')
-        img_response = requests.get(image_url, timeout=30)
-        img_response.raise_for_status()
-        
-        filename = image_url.split('/')[-1] or 'image.jpg'
-        print(f'  📤 Uploading to API...')
-        
-        files = {'file': (filename, img_response.content, 'image/jpeg')}
-        upload_response = requests.post(
-            f'{API_BASE}/api/upload',
-            files=files,
-            timeout=60
-        )
-        upload_response.raise_for_status()
-        uploaded_url = upload_response.json().get('imageUrl')
+        with CPU.stage('upload'):
+            print(f'  📥 Downloading image...')
+            img_response = requests.get(image_url, timeout=30)
+            img_response.raise_for_status()
+        
+            filename = image_url.split('/')[-1] or 'image.jpg'
+            print(f'  📤 Uploading to API...')
+        
+            files = {'file': (filename, img_response.content, 'image/jpeg')}
+            upload_response = requests.post(
+                f'{API_BASE}/api/upload',
+                files=files,
+                timeout=60
+            )
+            upload_response.raise_for_status()
+            uploaded_url = upload_response.json().get('imageUrl')
         
-        if not uploaded_url:
-            raise Exception('No imageUrl in response')
+            if not uploaded_url:
+                raise Exception('No imageUrl in response')
         
         print(f'  ✅ Uploaded')
         
         # Step 2: Analyze and crop
         print(f'  🤖 Analyzing with AI...')
-        analyze_response = requests.post(
-            f'{API_BASE}/api/analyze',
-            json={'imageUrl': uploaded_url},
-            timeout=300  # 5 minutes for cold starts
-        )
-        analyze_response.raise_for_status()
-        analyze_data = analyze_response.json()
+        with CPU.stage('analyze'):
+            analyze_response = requests.post(
+                f'{API_BASE}/api/analyze',
+                json={'imageUrl': uploaded_url},
+                timeout=300  # 5 minutes for cold starts
+            )
+            analyze_response.raise_for_status()
+            analyze_data = analyze_response.json()
         items = analyze_data.get('items', [])
         
         print(f'  ✅ Found {len(items)} items')
@@ -89,17 +97,18 @@ def process_user(phone, image_url):
                 categories.append(category)
                 cropped_images[key] = item.get('croppedImageUrl', '')
             
-            search_response = requests.post(
-                f'{API_BASE}/api/search',
-                json={
-                    'categories': categories,
-                    'croppedImages': cropped_images,
-                    'originalImageUrl': uploaded_url
-                },
-                timeout=300
-            )
-            search_response.raise_for_status()
-            search_data = search_response.json()
+            with CPU.stage('search'):
+                search_response = requests.post(
+                    f'{API_BASE}/api/search',
+                    json={
+                        'categories': categories,
+                        'croppedImages': cropped_images,
+                        'originalImageUrl': uploaded_url
+                    },
+                    timeout=300
+                )
+                search_response.raise_for_status()
+                search_data = search_response.json()
             
             total_links = sum(len(links) for links in search_data.get('results', {}).values())
             print(f'  ✅ Found {total_links} shopping links')
@@ -120,7 +129,8 @@ def process_user(phone, image_url):
         
         # Step 5: Generate HTML with hashed filename
         hashed_id = hash_phone(phone)
-        html_content = generate_html_page(phone, result_data)
+        with CPU.stage('render'):
+            html_content = generate_html_page(phone, result_data)
         
         # Save to public/results
         public_dir = Path('./public/results')
@@ -227,3 +237,5 @@ if successful > 0:
 print('🎉 Batch 3 processing complete!')
 print('📤 Ready to deploy HTML files and send links to users\n')
 
+CPU.finish()
+
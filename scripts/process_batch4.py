@@ -5,16 +5,30 @@ Process Batch 4 users from file+phonenumber4.xlsx (89 users)
 import pandas as pd
 import requests
 import json
-import time
 from pathlib import Path
 from datetime import datetime
 import sys
 import os
+from contextlib import contextmanager
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 from phone_hasher import hash_phone
 from html_generator_mobile import generate_html_page
+from link_validator import prune_dead_products
+from product_dedup import dedupe_search_results
+from thumbnail_mirror import mirror_thumbnails
+from responsive_images import add_responsive_images
+from page_compressor import compress_pages, print_compression_report
+from batch_scheduler import PAUSE_SECONDS, POLICIES, estimate_jobs, order_jobs, print_schedule_report, run_scheduled
+from warm_pool import WarmPool
+from backend_client import AnalyzeClient, SingleFlight, fingerprint
+from client_crop import client_side_crop
+from phash_index import NearDuplicateIndex, hashes_from_bytes
+from crop_similarity_index import CropSimilarityIndex, fetch_features
+from mem_profile import MemoryProfiler
+from cpu_profile import CpuProfiler, add_profile_args
+from heic_decode import DecodePool, is_heic_bytes, upload_name
 
 # Configuration
 EXCEL_FILE = '/Users/levit/Desktop/file+phonenumber4.xlsx'
@@ -23,6 +37,31 @@ BATCH_NAME = 'batch4'
 OUTPUT_DIR = Path('./batch4_results')
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+# Set by --direct-backends: analyze straight on the GPU backends (routed + hedged) instead of /api/analyze
+ANALYZE_CLIENT = None
+
+# Set by --reuse-near-duplicates: perceptual hashes of every processed original
+NEAR_DUPLICATES = None
+PHASH_INDEX_DIR = OUTPUT_DIR / 'phash_index'
+
+# Set by --reuse-similar-crops: features + search results of every searched crop
+CROP_INDEX = None
+CROP_INDEX_DIR = OUTPUT_DIR / 'crop_index'
+
+# Started by --profile-memory: tracemalloc snapshots at every stage boundary
+MEMORY = MemoryProfiler()
+
+# Started by --profile-cpu (see cpu_profile.add_profile_args)
+CPU = CpuProfiler()
+
+# HEIC/HEIF uploads are decoded locally (--no-local-heic to send them as-is)
+DECODER = DecodePool()
+
+# Duplicate rows / the same screenshot from two phones share one in-flight call
+UPLOAD_FLIGHTS = SingleFlight('upload')
+ANALYZE_FLIGHTS = SingleFlight('analyze')
+SEARCH_FLIGHTS = SingleFlight('search')
+
 def clean_phone(phone_str):
     """Clean phone number - remove 82 country code prefix and convert to format"""
     phone = str(int(float(phone_str)))  # Convert from float to string, remove decimals
@@ -33,28 +72,35 @@ def clean_phone(phone_str):
     
     return phone
 
-def upload_to_frontend(image_url: str):
-    """Download image from Typeform URL and upload to frontend"""
+def download_image(image_url: str) -> bytes:
+    """Download the original image from Typeform"""
+    print(f'  📥 Downloading image from Typeform...')
+    img_response = requests.get(image_url, timeout=30)
+    img_response.raise_for_status()
+    return img_response.content
+
+def upload_to_frontend(image_url: str, image_bytes: bytes = None):
+    """Download image from Typeform URL (unless already downloaded) and upload to frontend"""
     try:
-        print(f'  📥 Downloading image from Typeform...')
-        
-        # Download the image
-        img_response = requests.get(image_url, timeout=30)
-        img_response.raise_for_status()
+        if image_bytes is None:
+            image_bytes = download_image(image_url)
         
         # Get filename from URL or use default
         filename = image_url.split('/')[-1] or 'image.jpg'
         
-        # Upload to frontend
-        files = {'file': (filename, img_response.content, 'image/jpeg')}
-        upload_response = requests.post(
-            f'{FRONTEND_URL}/api/upload',
-            files=files,
-            timeout=60
-        )
-        upload_response.raise_for_status()
-        
-        data = upload_response.json()
+        # Upload to frontend (identical bytes already uploading → share that upload)
+        def upload():
+            name, mime_type = upload_name(filename, image_bytes[:12])
+            files = {'file': (name, image_bytes, mime_type)}
+            upload_response = requests.post(
+                f'{FRONTEND_URL}/api/upload',
+                files=files,
+                timeout=60
+            )
+            upload_response.raise_for_status()
+            return upload_response.json()
+        
+        data = UPLOAD_FLIGHTS.do(fingerprint(image_bytes), upload)
         uploaded_url = data.get('imageUrl')
         
         if not uploaded_url:
@@ -72,14 +118,20 @@ def analyze_and_crop(image_url: str):
     try:
         print(f'  🤖 Analyzing and cropping...')
         
-        response = requests.post(
-            f'{FRONTEND_URL}/api/analyze',
-            json={'imageUrl': image_url},
-            timeout=180
-        )
-        response.raise_for_status()
+        if ANALYZE_CLIENT:
+            data = ANALYZE_CLIENT.analyze(image_url)
+        else:
+            def analyze():
+                response = requests.post(
+                    f'{FRONTEND_URL}/api/analyze',
+                    json={'imageUrl': image_url},
+                    timeout=180
+                )
+                response.raise_for_status()
+                return response.json()
+            
+            data = ANALYZE_FLIGHTS.do(fingerprint(image_url), analyze)
         
-        data = response.json()
         items = data.get('items', [])
         
         print(f'  ✅ Found {len(items)} items')
@@ -99,30 +151,55 @@ def search_products(items: list, original_image_url: str):
             print(f'  ⚠️  No items to search')
             return {'results': {}}
         
-        print(f'  🔍 Searching for {len(items)} items...')
+        keys = [f"{item.get('category', 'unknown')}_{idx + 1}" for idx, item in enumerate(items)]
+        
+        # Crops that look like an already searched item of the same category reuse its results
+        reused = {}
+        features = [None] * len(items)
+        if CROP_INDEX is not None:
+            features = fetch_features([item.get('croppedImageUrl', '') for item in items])
+            matches = CROP_INDEX.lookup_batch(features, [item.get('category', 'unknown') for item in items])
+            for key, match in zip(keys, matches):
+                if match:
+                    reused[key] = match['results']
+                    print(f'  🧩 {key}: reusing results of a similar crop ({match["similarity"]:.3f})')
         
         # Build request
         categories = []
         cropped_images = {}
         
-        for idx, item in enumerate(items):
-            category = item.get('category', 'unknown')
-            key = f"{category}_{idx + 1}"
-            categories.append(category)
+        for key, item in zip(keys, items):
+            if key in reused:
+                continue
+            categories.append(item.get('category', 'unknown'))
             cropped_images[key] = item.get('croppedImageUrl', '')
         
-        response = requests.post(
-            f'{FRONTEND_URL}/api/search',
-            json={
-                'categories': categories,
-                'croppedImages': cropped_images,
-                'originalImageUrl': original_image_url
-            },
-            timeout=180
-        )
-        response.raise_for_status()
-        
-        data = response.json()
+        print(f'  🔍 Searching for {len(cropped_images)} items...')
+        
+        payload = {
+            'categories': categories,
+            'croppedImages': cropped_images,
+            'originalImageUrl': original_image_url
+        }
+        
+        def search():
+            response = requests.post(
+                f'{FRONTEND_URL}/api/search',
+                json=payload,
+                timeout=180
+            )
+            response.raise_for_status()
+            return response.json()
+        
+        data = SEARCH_FLIGHTS.do(fingerprint(payload), search) if cropped_images else {'results': {}}
+        
+        if CROP_INDEX is not None:
+            searched = data.get('results', {})
+            for key, item, item_features in zip(keys, items, features):
+                if key in cropped_images and item_features is not None and searched.get(key):
+                    CROP_INDEX.add(item_features, item.get('category', 'unknown'),
+                                   item.get('croppedImageUrl', ''), searched[key])
+            data.setdefault('results', {}).update(reused)
         results = data.get('results', {})
         
         # Count total links
@@ -135,21 +212,73 @@ def search_products(items: list, original_image_url: str):
         print(f'  ❌ Search failed: {e}')
         raise
 
-def process_user(phone: str, image_url: str):
+@contextmanager
+def stage(name: str):
+    """Stage boundary for the memory and CPU profilers (no-ops unless enabled)"""
+    with MEMORY.stage(name), CPU.stage(name):
+        yield
+
+def find_prior_result(image_hashes):
+    """Saved result of a near-identical original, if there is one"""
+    match = NEAR_DUPLICATES.lookup(image_hashes)
+    if not match:
+        return None
+    json_file = OUTPUT_DIR / f'{match["key"]}_result.json'
+    try:
+        with open(json_file, 'r', encoding='utf-8') as f:
+            prior = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if prior.get('status') != 'success':
+        return None
+    print(f'  🪞 Near duplicate of {match["key"]} (pHash distance {match["phash_distance"]}), reusing its result')
+    return prior
+
+def process_user(phone: str, image_url: str, mirror: bool = False, responsive: bool = False,
+                 prune: bool = False, client_crop: bool = False, dedupe: bool = False):
     """Process a single user"""
     try:
         print(f'\n{"="*80}')
         print(f'Processing: {phone}')
         print(f'{"="*80}')
         
-        # Step 1: Upload image
-        uploaded_url = upload_to_frontend(image_url)
-        
-        # Step 2: Analyze and crop
-        items = analyze_and_crop(uploaded_url)
-        
-        # Step 3: Search products
-        search_data = search_products(items, uploaded_url)
+        with stage('download'):
+            image_bytes = download_image(image_url)
+        if is_heic_bytes(image_bytes):
+            with stage('decode'):
+                image_bytes = DECODER.prepare_bytes(image_bytes)
+        
+        # Step 0: A near-identical screenshot was already processed → reuse its result
+        prior, image_hashes = None, None
+        if NEAR_DUPLICATES is not None:
+            try:
+                with stage('dedupe'):
+                    image_hashes = hashes_from_bytes(image_bytes)
+                    prior = find_prior_result(image_hashes)
+            except Exception as e:
+                print(f'  ⚠️  Near-duplicate check failed: {e}')
+        
+        if prior:
+            uploaded_url, items, search_data = prior['original_url'], prior['items'], prior['search_results']
+        else:
+            # Step 1: Upload image
+            with stage('upload'):
+                uploaded_url = upload_to_frontend(image_url, image_bytes)
+            
+            # Step 2: Analyze and crop (client-side from detection boxes when enabled)
+            with stage('analyze'):
+                items = None
+                if client_crop:
+                    try:
+                        items = client_side_crop(image_bytes, uploaded_url, FRONTEND_URL)
+                    except Exception as e:
+                        print(f'  ⚠️  Client-side crop failed, falling back to analyze: {e}')
+                if not items:
+                    items = analyze_and_crop(uploaded_url)
+            
+            # Step 3: Search products
+            with stage('search'):
+                search_data = search_products(items, uploaded_url)
         
         # Step 4: Save results
         result_data = {
@@ -160,21 +289,41 @@ def process_user(phone: str, image_url: str):
             'status': 'success'
         }
         
-        # Save JSON
-        json_file = OUTPUT_DIR / f'{phone}_result.json'
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(result_data, f, indent=2, ensure_ascii=False)
-        
-        # Step 5: Generate HTML with hashed filename
-        hashed_id = hash_phone(phone)
-        html_content = generate_html_page(phone, result_data)
-        
-        # Save to public/results with hashed name
-        public_dir = Path('./public/results')
-        public_dir.mkdir(parents=True, exist_ok=True)
-        html_file = public_dir / f'{hashed_id}.html'
-        with open(html_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        with stage('postprocess'):
+            # Step 4a: Same listing under several crops / tracking params → keep it once
+            if dedupe:
+                dedupe_search_results(search_data)
+            
+            # Step 4b: Drop dead product links / thumbnails before rendering
+            if prune:
+                prune_dead_products([result_data])
+            
+            # Step 4c: Mirror product thumbnails so the page doesn't hotlink shops
+            if mirror:
+                mirror_thumbnails([result_data])
+            
+            # Step 4d: Responsive crop variants and blurred placeholders
+            if responsive:
+                add_responsive_images([result_data])
+        
+        with stage('render'):
+            # Save JSON
+            json_file = OUTPUT_DIR / f'{phone}_result.json'
+            with open(json_file, 'w', encoding='utf-8') as f:
+                json.dump(result_data, f, indent=2, ensure_ascii=False)
+            if image_hashes and not prior:
+                NEAR_DUPLICATES.add(phone, image_hashes)
+            
+            # Step 5: Generate HTML with hashed filename
+            hashed_id = hash_phone(phone)
+            html_content = generate_html_page(phone, result_data)
+            
+            # Save to public/results with hashed name
+            public_dir = Path('./public/results')
+            public_dir.mkdir(parents=True, exist_ok=True)
+            html_file = public_dir / f'{hashed_id}.html'
+            with open(html_file, 'w', encoding='utf-8') as f:
+                f.write(html_content)
         
         # Count results
         items_detected = len(items)
@@ -192,6 +341,7 @@ def process_user(phone: str, image_url: str):
             'items_detected': items_detected,
             'total_links': total_links,
             'hashed_id': hashed_id,
+            'html_file': str(html_file),
             'link': f'https://fashionsource.vercel.app/results/{hashed_id}.html'
         }
         
@@ -210,8 +360,45 @@ def main():
     parser = argparse.ArgumentParser(description='Process Batch 4 users')
     parser.add_argument('--count', type=int, default=None, help='Number of users to process (default: all)')
     parser.add_argument('--test', action='store_true', help='Test mode: process only first 10 users')
+    parser.add_argument('--prune-dead-links', action='store_true', help='Drop products with dead links or thumbnails before rendering')
+    parser.add_argument('--dedupe-products', action='store_true', help='Remove duplicate listings within and across categories')
+    parser.add_argument('--mirror-thumbnails', action='store_true', help='Mirror and resize product thumbnails into public/thumbs')
+    parser.add_argument('--responsive-images', action='store_true', help='Add crop srcset variants and LQIP placeholders')
+    parser.add_argument('--precompress', action='store_true', help='Minify pages and write .gz/.br siblings after the batch')
+    parser.add_argument('--workers', type=int, default=1, help='Users processed concurrently')
+    parser.add_argument('--schedule', choices=POLICIES, default='fifo',
+                        help='Dispatch order: sjf (cheapest first), ljf (costliest first), fifo (file order)')
+    parser.add_argument('--warm-pool', action='store_true', help='Pre-warm analyze backends and keep them warm during the batch')
+    parser.add_argument('--direct-backends', action='store_true',
+                        help='Analyze on the GPU backends directly (routed by latency, circuit breakers, hedged)')
+    parser.add_argument('--reuse-near-duplicates', action='store_true',
+                        help='Reuse the result of a perceptually near-identical screenshot processed earlier')
+    parser.add_argument('--reuse-similar-crops', action='store_true',
+                        help='Reuse search results of visually similar, already searched crops of the same category')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='tracemalloc snapshots per stage; writes a memory_profile_*.json report')
+    parser.add_argument('--client-crop', action='store_true',
+                        help='Crop items locally from /api/detect-dinox boxes (falls back to analyze)')
+    parser.add_argument('--no-local-heic', action='store_true',
+                        help='Upload HEIC/HEIF images as-is instead of decoding them locally')
+    add_profile_args(parser)
     args = parser.parse_args()
     
+    global ANALYZE_CLIENT, NEAR_DUPLICATES, CROP_INDEX, CPU
+    if args.direct_backends:
+        ANALYZE_CLIENT = AnalyzeClient()
+    if args.reuse_near_duplicates:
+        NEAR_DUPLICATES = NearDuplicateIndex(PHASH_INDEX_DIR)
+    if args.reuse_similar_crops:
+        CROP_INDEX = CropSimilarityIndex(CROP_INDEX_DIR)
+    CPU = CpuProfiler.from_args(args)
+    if args.no_local_heic:
+        DECODER.enabled = False
+    if args.profile_memory:
+        MEMORY.start()
+        if args.workers > 1:
+            print('⚠️  --profile-memory with --workers > 1: stages overlap, per-stage numbers are approximate')
+    
     print('\n' + '='*80)
     print('BATCH 4 PROCESSING - 89 USERS')
     print('='*80 + '\n')
@@ -256,24 +443,49 @@ def main():
     
     print(f'\n🚀 Processing {users_to_process} users...\n')
     
-    results = []
-    successful = 0
-    failed = 0
+    jobs = [{'key': row['cleaned_phone'], 'image_url': row[image_col]} for _, row in df.iterrows()]
+    if args.schedule != 'fifo':
+        jobs = order_jobs(estimate_jobs(jobs, OUTPUT_DIR), args.schedule)
     
-    for idx, row in df.iterrows():
-        phone = row['cleaned_phone']
-        image_url = row[image_col]
-        
-        result = process_user(phone, image_url)
-        results.append(result)
-        
-        if result['status'] == 'success':
-            successful += 1
-        else:
-            failed += 1
-        
-        # Small delay between users
-        time.sleep(2)
+    def run_job(job):
+        return process_user(job['key'], job['image_url'], mirror=args.mirror_thumbnails,
+                            responsive=args.responsive_images, prune=args.prune_dead_links,
+                            client_crop=args.client_crop, dedupe=args.dedupe_products)
+    
+    warm_pool = WarmPool(concurrency=args.workers).start() if args.warm_pool else None
+    try:
+        # Small delay between users (outside each job's time-to-result)
+        results = run_scheduled(jobs, run_job, workers=args.workers, pause_seconds=PAUSE_SECONDS)
+    finally:
+        if warm_pool:
+            warm_pool.stop()
+            warm_pool.print_report()
+        if NEAR_DUPLICATES is not None:
+            NEAR_DUPLICATES.save()
+            NEAR_DUPLICATES.print_report()
+        if CROP_INDEX is not None:
+            CROP_INDEX.save()
+            CROP_INDEX.print_report()
+        DECODER.close()
+        DECODER.print_report()
+    if ANALYZE_CLIENT:
+        ANALYZE_CLIENT.print_metrics()
+        ANALYZE_CLIENT.close()
+    if args.workers > 1:
+        UPLOAD_FLIGHTS.print_report()
+        if not ANALYZE_CLIENT:
+            ANALYZE_FLIGHTS.print_report()
+        SEARCH_FLIGHTS.print_report()
+    successful = sum(1 for r in results if r['status'] == 'success')
+    failed = len(results) - successful
+    
+    if args.schedule != 'fifo':
+        print_schedule_report(jobs, results, args.schedule, args.workers, PAUSE_SECONDS)
+    
+    # Minify and precompress every page written in this batch
+    if args.precompress:
+        html_files = [r['html_file'] for r in results if r['status'] == 'success']
+        print_compression_report(compress_pages(html_files))
     
     # Save summary
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -327,6 +539,10 @@ def main():
             if result['status'] == 'failed':
                 print(f'   - {result["phone"]}: {result["error"]}')
     
+    # Peak / retained memory per stage and the call sites behind them
+    MEMORY.write_report(OUTPUT_DIR)
+    CPU.finish()
+    
     print('\n✅ Batch 4 processing complete!')
     print(f'Next step: Send SMS messages using {csv_file}')
 
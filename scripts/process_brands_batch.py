@@ -8,27 +8,40 @@ import sys
 import time
 import json
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from batch_planner import BatchPlanner, api_calls, load_run_records, print_plan
+from cpu_profile import CpuProfiler, add_profile_args
+from heic_decode import HEIF_SUPPORTED, DecodePool, upload_name
 
 # Configuration
 BRANDS_DIR = "/Users/levit/Desktop/brands"
 RESULTS_DIR = "/Users/levit/Desktop/mvp/brands_results"
 API_BASE_URL = "http://localhost:3000"  # Your Next.js dev server
 
+# Started by --profile-cpu
+CPU = CpuProfiler()
+
+# HEIC/HEIF originals are decoded locally before upload (--no-local-heic to send them as-is)
+DECODER = DecodePool()
+
 # Create results directory
 os.makedirs(RESULTS_DIR, exist_ok=True)
 
-def upload_image_to_api(image_path):
-    """Upload image via the Next.js upload API"""
+def upload_image_to_api(image_path, upload_path=None):
+    """Upload image via the Next.js upload API (upload_path: locally decoded copy)"""
     print(f"\n📤 Uploading: {os.path.basename(image_path)}")
     
     try:
-        with open(image_path, 'rb') as f:
-            files = {'file': (os.path.basename(image_path), f, 'image/jpeg')}
+        with open(upload_path or image_path, 'rb') as f:
+            filename, mime_type = upload_name(os.path.basename(image_path), f.read(12))
+            f.seek(0)
+            files = {'file': (filename, f, mime_type)}
             response = requests.post(
                 f"{API_BASE_URL}/api/upload",
                 files=files,
@@ -125,7 +138,7 @@ def search_products(analyzed_data, original_image_url):
         print(f"❌ Search error: {e}")
         return None
 
-def process_single_image(image_path, image_number, total_images):
+def process_single_image(image_path, image_number, total_images, decode_future=None):
     """Process a single image through the full pipeline"""
     print(f"\n{'='*80}")
     print(f"Processing image {image_number}/{total_images}: {os.path.basename(image_path)}")
@@ -137,32 +150,53 @@ def process_single_image(image_path, image_number, total_images):
         'image_name': os.path.basename(image_path),
         'timestamp': datetime.now().isoformat(),
         'success': False,
-        'error': None
+        'error': None,
+        'stage_times': {}
     }
+    stage_times = result['stage_times']
     
     try:
+        # Step 0: HEIC → JPEG/WebP (started in the decode pool before the batch)
+        upload_path = None
+        if decode_future is not None:
+            stage_start = time.time()
+            with CPU.stage('decode'):
+                upload_path = DECODER.prepared_path(image_path, decode_future)
+            stage_times['decode'] = round(time.time() - stage_start, 2)
+        
         # Step 1: Upload image
-        image_url = upload_image_to_api(image_path)
+        stage_start = time.time()
+        with CPU.stage('upload'):
+            image_url = upload_image_to_api(image_path, upload_path)
+        stage_times['upload'] = round(time.time() - stage_start, 2)
         if not image_url:
             result['error'] = 'Upload failed'
             return result
         result['image_url'] = image_url
         
         # Step 2: Analyze image (GPT-4o + cropping)
-        analyzed_data = analyze_image(image_url)
+        stage_start = time.time()
+        with CPU.stage('analyze'):
+            analyzed_data = analyze_image(image_url)
+        stage_times['analyze'] = round(time.time() - stage_start, 2)
         if not analyzed_data:
             result['error'] = 'Analysis failed'
             return result
         result['analysis'] = analyzed_data
+        result['items_detected'] = len(analyzed_data.get('items', []))
         
         # Note: Even if 0 items detected, we continue to search (fallback mode)
         
         # Step 3: Search for products
-        search_data = search_products(analyzed_data, image_url)
+        stage_start = time.time()
+        with CPU.stage('search'):
+            search_data = search_products(analyzed_data, image_url)
+        stage_times['search'] = round(time.time() - stage_start, 2)
         if not search_data:
             result['error'] = 'Search failed'
             return result
         result['search'] = search_data
+        result['api_calls'] = api_calls(search_data)
         
         # Success!
         result['success'] = True
@@ -179,6 +213,22 @@ def process_single_image(image_path, image_number, total_images):
 
 def main():
     """Process all images in the brands directory"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Process brand images through the full pipeline')
+    parser.add_argument('--workers', type=int, default=1, help='Images processed concurrently')
+    parser.add_argument('--deadline-minutes', type=float, default=None,
+                        help='Recommend the concurrency that finishes within this time')
+    parser.add_argument('--no-local-heic', action='store_true',
+                        help='Upload HEIC/HEIF originals as-is instead of decoding them locally')
+    add_profile_args(parser)
+    args = parser.parse_args()
+    
+    global CPU
+    CPU = CpuProfiler.from_args(args)
+    if args.no_local_heic:
+        DECODER.enabled = False
+    
     print(f"{'='*80}")
     print(f"BRAND IMAGES BATCH PROCESSING")
     print(f"{'='*80}")
@@ -208,29 +258,41 @@ def main():
     print(f"   2. GPT-4o analysis + item cropping")
     print(f"   3. Serper product search (3x per item)")
     print(f"   4. GPT-4 Turbo product selection")
-    print(f"\n💰 Estimated cost: $15-25")
-    print(f"⏱️  Estimated time: 10-15 minutes\n")
+    print()
     
-    # Process all images
-    all_results = []
-    successful = 0
-    failed = 0
+    # Predict time and cost from previous runs' stage timings
+    planner = BatchPlanner(load_run_records(RESULTS_DIR))
+    print_plan(planner, total_images, args.workers, args.deadline_minutes)
+    print()
     
+    # Process all images
     batch_start_time = time.time()
     
-    for idx, image_path in enumerate(image_files, 1):
-        result = process_single_image(image_path, idx, total_images)
-        all_results.append(result)
-        
-        if result['success']:
-            successful += 1
-        else:
-            failed += 1
+    # Decode every HEIC up front in the process pool; uploads overlap with the rest
+    decode_futures = {path: DECODER.submit(path) for path in image_files}
+    heic_count = sum(1 for future in decode_futures.values() if future is not None)
+    if heic_count:
+        print(f"🍏 Decoding {heic_count} HEIC images locally ({DECODER.workers} processes)\n")
+    elif not HEIF_SUPPORTED and any(f.lower().endswith(('.heic', '.heif')) for f in image_files):
+        print("⚠️  pillow-heif not installed: HEIC images are uploaded as-is\n")
+    
+    def run_image(job):
+        idx, image_path = job
+        result = process_single_image(image_path, idx, total_images, decode_futures[image_path])
         
         # Small delay between images to avoid rate limiting
         if idx < total_images:
             print(f"\n⏸️  Waiting 2s before next image...")
             time.sleep(2)
+        return result
+    
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            all_results = list(pool.map(run_image, enumerate(image_files, 1)))
+    finally:
+        DECODER.close()
+    successful = sum(1 for r in all_results if r['success'])
+    failed = total_images - successful
     
     # Save results
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -242,11 +304,13 @@ def main():
         'successful': successful,
         'failed': failed,
         'total_time_seconds': round(time.time() - batch_start_time, 2),
+        'workers': args.workers,
         'results': all_results
     }
     
-    with open(results_file, 'w', encoding='utf-8') as f:
-        json.dump(batch_summary, f, indent=2, ensure_ascii=False)
+    with CPU.stage('save'):
+        with open(results_file, 'w', encoding='utf-8') as f:
+            json.dump(batch_summary, f, indent=2, ensure_ascii=False)
     
     # Print summary
     print(f"\n{'='*80}")
@@ -264,6 +328,9 @@ def main():
         for result in all_results:
             if not result['success']:
                 print(f"   - {result['image_name']}: {result.get('error', 'Unknown error')}")
+    
+    DECODER.print_report()
+    CPU.finish()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Canonicalize product URLs and dedupe products within and across categories.
+
+The same shop listing often comes back under several crops (`tops_1`, `tops_2`, ...)
+or with different tracking parameters. Each link is reduced to a canonical form
+(known shop URL shapes map to their product ID) and hashed, and every product is
+kept only once - in the category where it ranked highest, unless that would
+leave another category empty.
+"""
+
+import hashlib
+import json
+import re
+import sys
+from typing import Dict
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+# Click / campaign / analytics params only; anything a shop might key a listing on
+# (sort, search, xcode, source, ...) stays in the canonical URL
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'igshid', 'mc_cid', 'mc_eid', 'ref_', 'referrer',
+    'spm', 'scm', 'pvid', 'algo_pvid', 'algo_expid', 'aff_platform', 'aff_trace_key',
+    'nacn', 'napm', 'n_media', 'n_query', 'n_rank', 'n_ad_group', 'n_ad', 'n_keyword', 'n_campaign_type',
+    'gfdt', '_ga', '_gl',
+}
+TRACKING_PREFIXES = ('utm_', 'pf_', 'trk', 'tracking')
+
+# (host pattern, path/query pattern, canonical key template) - first match wins
+SHOP_PATTERNS = [
+    (r'farfetch\.com$', r'item-(\d+)', 'farfetch:{0}'),
+    (r'global\.musinsa\.com$', r'/goods/(\d+)', 'musinsa-global:{0}'),
+    (r'musinsa\.com$', r'/(?:products|app/goods|goods)/(\d+)', 'musinsa:{0}'),
+    (r'coupang\.com$', r'/vp/products/(\d+)', 'coupang:{0}'),
+    (r'(amazon\.[a-z.]+)$', r'/(?:dp|gp/product|gp/aw/d)/([A-Z0-9]{10})', '{host}:{0}'),
+    (r'29cm\.co\.kr$', r'/products/(\d+)', '29cm:{0}'),
+    (r'zigzag\.kr$', r'/products/(\d+)', 'zigzag:{0}'),
+    (r'ebay\.[a-z.]+$', r'/itm/(?:[^/]+/)?(\d+)', 'ebay:{0}'),
+    (r'zara\.com$', r'-p(\d+)\.html', 'zara:{0}'),
+    (r'aliexpress\.[a-z.]+$', r'/(?:item|i)/(\d+)\.html', 'aliexpress:{0}'),
+    (r'(?:global)?bunjang\.co\.kr$', r'/products/(\d+)', 'bunjang:{0}'),
+    (r'(smartstore|brand)\.naver\.com$', r'/([^/]+)/products/(\d+)', 'naver:{1}'),
+    (r'ssg\.com$', r'itemId=(\d+)', 'ssg:{0}'),
+    (r'elandmall\.co\.kr$', r'itemNo=(\d+)', 'elandmall:{0}'),
+    (r'lotteimall\.com$', r'goods_no=(\d+)', 'lotteimall:{0}'),
+    (r'kream\.co\.kr$', r'/products/(\d+)', 'kream:{0}'),
+    (r'ssense\.com$', r'/(\d{6,})', 'ssense:{0}'),
+    (r'etsy\.com$', r'/listing/(\d+)', 'etsy:{0}'),
+    (r'hm\.com$', r'productpage\.(\d+)', 'hm:{0}'),
+]
+_COMPILED_PATTERNS = [(re.compile(h), re.compile(p), t) for h, p, t in SHOP_PATTERNS]
+
+
+def normalize_host(netloc: str) -> str:
+    host = netloc.lower().split('@')[-1].split(':')[0]
+    for prefix in ('www.', 'www2.', 'm.', 'mobile.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    return host
+
+
+def canonicalize_url(url: str) -> str:
+    """Canonical form of a product URL (shop:product_id for known shops)"""
+    if not url:
+        return ''
+    parsed = urlparse(url.strip())
+    host = normalize_host(parsed.netloc)
+
+    for host_re, target_re, template in _COMPILED_PATTERNS:
+        host_match = host_re.search(host)
+        if not host_match:
+            continue
+        match = target_re.search(f'{parsed.path}?{parsed.query}')
+        if match:
+            return template.format(*match.groups(), host=host_match.group(1) if host_match.groups() else host)
+
+    query = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=False)
+             if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)]
+    path = re.sub(r'/+', '/', parsed.path).rstrip('/') or '/'
+    canonical = f'{host}{path}'
+    if query:
+        canonical += '?' + urlencode(sorted(query))
+    return canonical
+
+
+def product_key(url: str) -> str:
+    """Short stable hash of the canonical URL"""
+    return hashlib.sha1(canonicalize_url(url).encode('utf-8')).hexdigest()[:16]
+
+
+def dedupe_search_results(search_data: Dict) -> Dict:
+    """
+    Dedupe products in a search response (`{'results': {category: [products]}}`) in place.
+
+    A product seen under several categories stays where it ranked best (ties go to
+    the earlier category) - unless removing it would empty a category, whose item
+    would then vanish from the page; it is kept in both then. Returns counts of
+    removed duplicates.
+    """
+    results = search_data.get('results', {}) if search_data else {}
+    stats = {'products': 0, 'within_category': 0, 'across_categories': 0, 'kept_last': 0}
+
+    # Best (rank, category order) per product
+    best = {}
+    for cat_idx, (category, products) in enumerate(results.items()):
+        for rank, product in enumerate(products or []):
+            stats['products'] += 1
+            link = product.get('link', '')
+            if not link:
+                continue
+            key = product_key(link)
+            product['product_key'] = key
+            if key not in best or (rank, cat_idx) < best[key]:
+                best[key] = (rank, cat_idx)
+
+    for cat_idx, (category, products) in enumerate(results.items()):
+        kept = []
+        seen = set()
+        first_moved = None
+        for rank, product in enumerate(products or []):
+            key = product.get('product_key')
+            if not key:
+                kept.append(product)
+                continue
+            if key in seen:
+                stats['within_category'] += 1
+                continue
+            seen.add(key)
+            if best[key][1] != cat_idx:
+                stats['across_categories'] += 1
+                first_moved = first_moved or product
+                continue
+            kept.append(product)
+        if not kept and first_moved:
+            # Every product ranked better elsewhere: keep the best one here too
+            kept.append(first_moved)
+            stats['across_categories'] -= 1
+            stats['kept_last'] += 1
+        results[category] = kept
+
+    removed = stats['within_category'] + stats['across_categories']
+    if removed:
+        print(f'  🧹 Removed {removed} duplicate products '
+              f'({stats["within_category"]} within, {stats["across_categories"]} across categories)')
+    return stats
+
+
+def main():
+    """Dedupe products in result JSON files in place"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Dedupe products in result JSON files')
+    parser.add_argument('result_files', nargs='+', help='*_result.json files to rewrite')
+    parser.add_argument('--dry-run', action='store_true', help='Only report, do not rewrite files')
+    args = parser.parse_args()
+
+    total_removed = 0
+    for path in args.result_files:
+        with open(path, 'r', encoding='utf-8') as f:
+            result_data = json.load(f)
+        stats = dedupe_search_results(result_data.get('search_results', {}))
+        total_removed += stats['within_category'] + stats['across_categories']
+        if not args.dry_run:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(result_data, f, indent=2, ensure_ascii=False)
+
+    print(f'\n✅ {total_removed} duplicates removed across {len(args.result_files)} files')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
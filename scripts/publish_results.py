@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Publish result pages and image assets to S3-compatible storage with delta sync.
+
+Only files whose content hash differs from the remote manifest are uploaded, so
+publishing a batch no longer needs a full Vercel redeploy. Works against AWS S3,
+MinIO or a moto server via S3_ENDPOINT_URL.
+
+Usage:
+    python3 publish_results.py                    # results + thumbs + crops
+    python3 publish_results.py --dry-run
+    S3_ENDPOINT_URL=http://localhost:9000 python3 publish_results.py --bucket test
+"""
+
+import hashlib
+import json
+import mimetypes
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+
+from cpu_profile import CpuProfiler, add_profile_args
+
+# Configuration
+PUBLIC_DIR = Path('./public')
+PUBLISH_DIRS = ['results', 'thumbs', 'crops']
+S3_BUCKET = os.getenv('AWS_S3_BUCKET_NAME')
+S3_REGION = os.getenv('AWS_REGION', 'us-east-1')
+S3_ENDPOINT_URL = os.getenv('S3_ENDPOINT_URL')  # MinIO / moto / R2; unset for AWS
+KEY_PREFIX = os.getenv('S3_KEY_PREFIX', '')
+MANIFEST_KEY = '_publish_manifest.json'
+UPLOAD_WORKERS = 16
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+MULTIPART_CONCURRENCY = 4
+
+# Pages keep their name when regenerated, so they must revalidate; images are named by content hash
+CACHE_CONTROL_PAGES = 'public, max-age=60, must-revalidate'
+CACHE_CONTROL_IMMUTABLE = 'public, max-age=31536000, immutable'
+IMMUTABLE_DIRS = {'thumbs', 'crops'}
+PRECOMPRESSED_SUFFIXES = ('.gz', '.br')
+
+# Started by --profile-cpu
+CPU = CpuProfiler()
+
+
+def sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def build_local_manifest(public_dir: Path, dirs: List[str], use_precompressed: bool = True) -> Dict[str, Dict]:
+    """
+    Map object key -> {path, sha256, size, headers} for every publishable file.
+
+    With use_precompressed, a page that has a .gz sibling is uploaded as the gzip
+    bytes under the .html key with Content-Encoding: gzip.
+    """
+    files = []
+    for dirname in dirs:
+        root = public_dir / dirname
+        if not root.exists():
+            continue
+        for path in sorted(root.rglob('*')):
+            if path.is_file() and not path.name.endswith(PRECOMPRESSED_SUFFIXES) and not path.name.endswith('.tmp'):
+                files.append((dirname, path))
+
+    def describe(entry):
+        dirname, path = entry
+        key = KEY_PREFIX + path.relative_to(public_dir).as_posix()
+        content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type in ('application/json', 'application/javascript'):
+            content_type += '; charset=utf-8'
+        headers = {
+            'ContentType': content_type,
+            'CacheControl': CACHE_CONTROL_IMMUTABLE if dirname in IMMUTABLE_DIRS else CACHE_CONTROL_PAGES,
+        }
+        upload_path = path
+        gz_path = path.with_name(path.name + '.gz')
+        if use_precompressed and path.suffix == '.html' and gz_path.exists() \
+                and gz_path.stat().st_mtime >= path.stat().st_mtime:
+            upload_path = gz_path
+            headers['ContentEncoding'] = 'gzip'
+        return key, {
+            'path': str(upload_path),
+            'sha256': sha256_file(upload_path),
+            'size': upload_path.stat().st_size,
+            'headers': headers,
+        }
+
+    with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as pool:
+        return dict(pool.map(describe, files))
+
+
+def get_s3_client(endpoint_url: Optional[str] = S3_ENDPOINT_URL, region: str = S3_REGION):
+    return boto3.client('s3', endpoint_url=endpoint_url, region_name=region)
+
+
+def load_remote_manifest(s3, bucket: str) -> Dict[str, Dict]:
+    """Remote manifest, or empty when nothing was published yet"""
+    try:
+        response = s3.get_object(Bucket=bucket, Key=KEY_PREFIX + MANIFEST_KEY)
+        return json.loads(response['Body'].read())
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in ('NoSuchKey', '404'):
+            return {}
+        raise
+
+
+def diff_manifests(local: Dict[str, Dict], remote: Dict[str, Dict]):
+    """Keys to upload (new or changed) and keys that only exist remotely"""
+    changed = [key for key, entry in local.items()
+               if remote.get(key, {}).get('sha256') != entry['sha256']
+               or remote.get(key, {}).get('headers') != entry['headers']]
+    removed = [key for key in remote if key not in local]
+    return changed, removed
+
+
+def publish(bucket: str = S3_BUCKET, public_dir: Path = PUBLIC_DIR, dirs: List[str] = PUBLISH_DIRS,
+            dry_run: bool = False, delete: bool = False, use_precompressed: bool = True, s3=None) -> Dict:
+    """Upload new/changed files and update the remote manifest"""
+    if not bucket:
+        raise ValueError('No bucket configured (set AWS_S3_BUCKET_NAME or pass --bucket)')
+
+    start_time = time.time()
+    s3 = s3 or get_s3_client()
+
+    print(f'📦 Hashing local files in {public_dir} ({", ".join(dirs)})...')
+    with CPU.stage('hash'):
+        local = build_local_manifest(Path(public_dir), dirs, use_precompressed)
+    with CPU.stage('manifest'):
+        remote = load_remote_manifest(s3, bucket)
+        changed, removed = diff_manifests(local, remote)
+
+    print(f'   Local: {len(local)} files | Remote: {len(remote)} | '
+          f'Changed/new: {len(changed)} | Remote-only: {len(removed)}')
+
+    stats = {'local': len(local), 'uploaded': 0, 'uploaded_bytes': 0, 'failed': 0,
+             'unchanged': len(local) - len(changed), 'deleted': 0}
+    if dry_run:
+        for key in changed:
+            print(f'   would upload: {key}')
+        if delete:
+            for key in removed:
+                print(f'   would delete: {key}')
+        return stats
+
+    transfer_config = TransferConfig(
+        multipart_threshold=MULTIPART_THRESHOLD,
+        multipart_chunksize=MULTIPART_CHUNKSIZE,
+        max_concurrency=MULTIPART_CONCURRENCY,
+    )
+
+    def upload(key):
+        entry = local[key]
+        with CPU.stage('upload'):
+            s3.upload_file(entry['path'], bucket, key, ExtraArgs=entry['headers'], Config=transfer_config)
+        return key
+
+    new_remote = {key: entry for key, entry in remote.items() if key in local or not delete}
+    with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as pool:
+        futures = {pool.submit(upload, key): key for key in changed}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                stats['failed'] += 1
+                print(f'   ❌ {key}: {e}')
+                continue
+            entry = local[key]
+            new_remote[key] = {'sha256': entry['sha256'], 'size': entry['size'], 'headers': entry['headers']}
+            stats['uploaded'] += 1
+            stats['uploaded_bytes'] += entry['size']
+
+    if delete and removed:
+        with CPU.stage('delete'):
+            for i in range(0, len(removed), 1000):
+                chunk = removed[i:i + 1000]
+                s3.delete_objects(Bucket=bucket, Delete={'Objects': [{'Key': key} for key in chunk], 'Quiet': True})
+                stats['deleted'] += len(chunk)
+
+    # Manifest last, so an interrupted run re-uploads whatever did not finish
+    s3.put_object(
+        Bucket=bucket,
+        Key=KEY_PREFIX + MANIFEST_KEY,
+        Body=json.dumps(new_remote, indent=1, sort_keys=True).encode('utf-8'),
+        ContentType='application/json',
+        CacheControl='no-cache',
+    )
+
+    stats['elapsed_seconds'] = round(time.time() - start_time, 2)
+    print(f'✅ Uploaded {stats["uploaded"]} files ({stats["uploaded_bytes"] / 1024:.0f} KB), '
+          f'{stats["unchanged"]} unchanged, {stats["deleted"]} deleted, {stats["failed"]} failed '
+          f'in {stats["elapsed_seconds"]}s')
+    return stats
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Delta-sync public/ result pages and assets to S3')
+    parser.add_argument('--bucket', default=S3_BUCKET, help='Target bucket (default: $AWS_S3_BUCKET_NAME)')
+    parser.add_argument('--public-dir', default=str(PUBLIC_DIR), help='Local public directory')
+    parser.add_argument('--dirs', nargs='+', default=PUBLISH_DIRS, help='Subdirectories to publish')
+    parser.add_argument('--endpoint-url', default=S3_ENDPOINT_URL, help='S3-compatible endpoint (MinIO, moto)')
+    parser.add_argument('--dry-run', action='store_true', help='Only show what would change')
+    parser.add_argument('--delete', action='store_true', help='Delete remote files that no longer exist locally')
+    parser.add_argument('--no-precompressed', action='store_true', help='Upload plain HTML even if .gz siblings exist')
+    add_profile_args(parser)
+    args = parser.parse_args()
+
+    global CPU
+    CPU = CpuProfiler.from_args(args)
+
+    stats = publish(
+        bucket=args.bucket,
+        public_dir=Path(args.public_dir),
+        dirs=args.dirs,
+        dry_run=args.dry_run,
+        delete=args.delete,
+        use_precompressed=not args.no_precompressed,
+        s3=get_s3_client(args.endpoint_url),
+    )
+    CPU.finish()
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,11 +6,19 @@ import os
 import json
 from pathlib import Path
 from html_generator_mobile import generate_html_page
+from cpu_profile import CpuProfiler, add_profile_args
 
 BATCH_DIR = './batch_results'
 PUBLIC_DIR = './public/results'
 
 def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Regenerate HTML files from JSON results')
+    add_profile_args(parser)
+    args = parser.parse_args()
+    cpu = CpuProfiler.from_args(args)
+    
     print("=" * 60)
     print("Regenerating HTML files from JSON results")
     print("=" * 60)
@@ -30,21 +38,24 @@ def main():
         
         try:
             # Load JSON
-            with open(json_path, 'r', encoding='utf-8') as f:
-                result_data = json.load(f)
+            with cpu.stage('load'):
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    result_data = json.load(f)
             
             # Generate HTML
-            html = generate_html_page(phone, result_data)
+            with cpu.stage('render'):
+                html = generate_html_page(phone, result_data)
             
-            # Save to batch_results
-            html_path = json_path.parent / f"{phone}_result.html"
-            with open(html_path, 'w', encoding='utf-8') as f:
-                f.write(html)
-            
-            # Copy to public
-            public_path = Path(PUBLIC_DIR) / f"{phone}.html"
-            with open(public_path, 'w', encoding='utf-8') as f:
-                f.write(html)
+            with cpu.stage('write'):
+                # Save to batch_results
+                html_path = json_path.parent / f"{phone}_result.html"
+                with open(html_path, 'w', encoding='utf-8') as f:
+                    f.write(html)
+                
+                # Copy to public
+                public_path = Path(PUBLIC_DIR) / f"{phone}.html"
+                with open(public_path, 'w', encoding='utf-8') as f:
+                    f.write(html)
             
             print(f"✅ {phone}")
             success_count += 1
@@ -58,6 +69,8 @@ def main():
     print("=" * 60)
     print(f"\n✅ HTML files updated in: {PUBLIC_DIR}/")
     print("📦 Run 'npx vercel --prod --yes' to deploy!")
+    
+    cpu.finish()
 
 if __name__ == '__main__':
     main()
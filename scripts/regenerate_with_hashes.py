@@ -4,71 +4,96 @@ import os
 from pathlib import Path
 from phone_hasher import hash_phone
 from html_generator_mobile import generate_html_page
+from cpu_profile import CpuProfiler, add_profile_args
 
-def regenerate_all_with_hashes():
-    """
-    Regenerate all HTML files with hashed filenames for privacy
-    Phone numbers are still used internally for tracking, just not in URLs
-    """
-    
-    # Load mapping
-    with open('phone_hash_mapping.json', 'r') as f:
-        mapping = json.load(f)
-    
-    count = 0
-    
-    # Process Batch 1
-    batch1_dir = Path('./batch_results')
-    for result_file in batch1_dir.glob('*_result.json'):
-        phone = result_file.stem.replace('_result', '')
-        hashed_id = mapping.get(phone)
-        
-        if not hashed_id:
-            print(f"⚠️  No hash found for {phone}, skipping")
+RESULT_DIRS = [Path('./batch_results'), Path('./batch2_results')]
+
+# Started by --profile-cpu
+CPU = CpuProfiler()
+
+def load_batch_results(mapping):
+    """Load (phone, hashed_id, results) for every result JSON that has a hash"""
+    entries = []
+    for result_dir in RESULT_DIRS:
+        if not result_dir.exists():
             continue
-        
-        # Load result data
-        with open(result_file, 'r', encoding='utf-8') as f:
-            results = json.load(f)
-        
-        # Generate HTML (phone still used internally for tracking)
-        html = generate_html_page(phone, results)
-        
-        # Save with HASHED filename to public/results
-        public_file = Path('./public/results') / f"{hashed_id}.html"
-        public_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(public_file, 'w', encoding='utf-8') as f:
-            f.write(html)
-        
-        count += 1
-        print(f"✅ {phone} → {hashed_id}.html")
-    
-    # Process Batch 2
-    batch2_dir = Path('./batch2_results')
-    if batch2_dir.exists():
-        for result_file in batch2_dir.glob('*_result.json'):
+        for result_file in result_dir.glob('*_result.json'):
             phone = result_file.stem.replace('_result', '')
             hashed_id = mapping.get(phone)
-            
+
             if not hashed_id:
                 print(f"⚠️  No hash found for {phone}, skipping")
                 continue
-            
+
             # Load result data
             with open(result_file, 'r', encoding='utf-8') as f:
                 results = json.load(f)
-            
-            # Generate HTML
+
+            entries.append((phone, hashed_id, results))
+    return entries
+
+def regenerate_all_with_hashes(mirror=False, responsive=False, precompress=False, prune=False, dedupe=False):
+    """
+    Regenerate all HTML files with hashed filenames for privacy
+    Phone numbers are still used internally for tracking, just not in URLs
+    """
+
+    # Load mapping
+    with open('phone_hash_mapping.json', 'r') as f:
+        mapping = json.load(f)
+
+    with CPU.stage('load'):
+        entries = load_batch_results(mapping)
+
+    # Drop duplicate listings within and across categories
+    if dedupe:
+        from product_dedup import dedupe_search_results
+        with CPU.stage('dedupe'):
+            for _, _, results in entries:
+                dedupe_search_results(results.get('search_results', {}))
+
+    # Check every product in the batch in parallel and drop dead links before rendering
+    if prune:
+        from link_validator import prune_dead_products, print_domain_report
+        with CPU.stage('prune'):
+            print_domain_report(prune_dead_products([results for _, _, results in entries]))
+
+    # Mirror thumbnails for the whole batch at once so shared images are fetched once
+    if mirror:
+        from thumbnail_mirror import mirror_thumbnails
+        with CPU.stage('mirror'):
+            mirror_thumbnails([results for _, _, results in entries])
+
+    # Crop srcset variants and blurred placeholders
+    if responsive:
+        from responsive_images import add_responsive_images
+        with CPU.stage('responsive'):
+            add_responsive_images([results for _, _, results in entries])
+
+    count = 0
+    written = []
+
+    with CPU.stage('render'):
+        for phone, hashed_id, results in entries:
+            # Generate HTML (phone still used internally for tracking)
             html = generate_html_page(phone, results)
-            
-            # Save with HASHED filename
+
+            # Save with HASHED filename to public/results
             public_file = Path('./public/results') / f"{hashed_id}.html"
+            public_file.parent.mkdir(parents=True, exist_ok=True)
             with open(public_file, 'w', encoding='utf-8') as f:
                 f.write(html)
-            
+
             count += 1
+            written.append(public_file)
             print(f"✅ {phone} → {hashed_id}.html")
-    
+
+    # Minify and write .gz/.br siblings for static hosting
+    if precompress:
+        from page_compressor import compress_pages, print_compression_report
+        with CPU.stage('precompress'):
+            print_compression_report(compress_pages(written))
+
     print()
     print(f"🎉 Regenerated {count} HTML files with secure hashed URLs!")
     print()
@@ -76,9 +101,28 @@ def regenerate_all_with_hashes():
     sample_phones = list(mapping.items())[:3]
     for phone, hashed in sample_phones:
         print(f"  {phone}: https://fashionsource.vercel.app/results/{hashed}.html")
-    
+
     return mapping
 
-if __name__ == '__main__':
-    regenerate_all_with_hashes()
+def main():
+    global CPU
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Regenerate result pages with hashed filenames')
+    parser.add_argument('--dedupe-products', action='store_true', help='Remove duplicate listings within and across categories')
+    parser.add_argument('--prune-dead-links', action='store_true', help='Drop products with dead links or thumbnails before rendering')
+    parser.add_argument('--mirror-thumbnails', action='store_true', help='Mirror and resize product thumbnails into public/thumbs')
+    parser.add_argument('--responsive-images', action='store_true', help='Add crop srcset variants and LQIP placeholders')
+    parser.add_argument('--precompress', action='store_true', help='Minify pages and write .gz/.br siblings')
+    add_profile_args(parser)
+    args = parser.parse_args()
+
+    CPU = CpuProfiler.from_args(args)
+    regenerate_all_with_hashes(mirror=args.mirror_thumbnails, responsive=args.responsive_images,
+                               precompress=args.precompress, prune=args.prune_dead_links,
+                               dedupe=args.dedupe_products)
+    CPU.finish()
 
+
+if __name__ == '__main__':
+    main()
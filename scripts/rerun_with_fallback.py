@@ -9,6 +9,7 @@ import time
 import json
 import requests
 from datetime import datetime
+from cpu_profile import CpuProfiler, add_profile_args
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -18,6 +19,9 @@ BRANDS_DIR = "/Users/levit/Desktop/brands"
 RESULTS_DIR = "/Users/levit/Desktop/mvp/brands_results"
 API_BASE_URL = "http://localhost:3000"
 
+# Started by --profile-cpu
+CPU = CpuProfiler()
+
 # Failed images to retry with fallback
 FAILED_IMAGES = [
     "0214d4bd3a05-IMG_6128 복사본.png",  # Houndstooth bag screenshot
@@ -148,21 +152,24 @@ def process_single_image(image_path, image_number, total_images):
     
     try:
         # Step 1: Upload
-        image_url = upload_image_to_api(image_path)
+        with CPU.stage('upload'):
+            image_url = upload_image_to_api(image_path)
         if not image_url:
             result['error'] = 'Upload failed'
             return result
         result['image_url'] = image_url
         
         # Step 2: Analyze
-        analyzed_data = analyze_image(image_url)
+        with CPU.stage('analyze'):
+            analyzed_data = analyze_image(image_url)
         if not analyzed_data:
             result['error'] = 'Analysis failed'
             return result
         result['analysis'] = analyzed_data
         
         # Step 3: Search (with fallback if needed)
-        search_data = search_products(analyzed_data, image_url)
+        with CPU.stage('search'):
+            search_data = search_products(analyzed_data, image_url)
         if not search_data:
             result['error'] = 'Search failed'
             return result
@@ -188,6 +195,15 @@ def process_single_image(image_path, image_number, total_images):
 
 def main():
     """Rerun failed images with fallback system"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Rerun previously failed images with the fallback search')
+    add_profile_args(parser)
+    args = parser.parse_args()
+    
+    global CPU
+    CPU = CpuProfiler.from_args(args)
+    
     print(f"{'='*80}")
     print(f"TESTING FALLBACK SYSTEM ON PREVIOUSLY FAILED IMAGES")
     print(f"{'='*80}")
@@ -261,6 +277,8 @@ def main():
                 print(f"      Category: {meta.get('detectedCategory', 'unknown')}")
                 print(f"      Products: {len(result.get('search', {}).get('results', {}))}")
                 print(f"      Time: {result.get('processing_time_seconds', 0):.1f}s")
+    
+    CPU.finish()
 
 if __name__ == "__main__":
     main()
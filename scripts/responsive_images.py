@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Responsive crop thumbnails and inline low-quality placeholders (LQIP) for result pages.
+
+Each cropped item image is rendered at several widths for `srcset`, and every crop
+and product image gets a tiny blurred JPEG data URI that is painted instantly while
+the real image loads.
+"""
+
+import base64
+import hashlib
+import io
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from PIL import Image, ImageFilter, ImageOps
+
+from thumbnail_mirror import (
+    FETCH_WORKERS, RESIZE_WORKERS, THUMBS_DIR, THUMBS_URL_PREFIX, USER_AGENT,
+    fetch_thumbnail, iter_products, resolve_format,
+)
+
+# Configuration
+CROPS_DIR = Path('./public/crops')
+CROPS_URL_PREFIX = '/crops'
+CROP_WIDTHS = (72, 144, 216)  # .cropped-thumb is 72x72 CSS px: 1x, 2x, 3x
+CROP_SIZES = '72px'
+CROP_FALLBACK_WIDTH = 144
+IMAGE_FORMAT = 'webp'
+IMAGE_QUALITY = 78
+LQIP_WIDTH = 16
+LQIP_QUALITY = 40
+
+
+def _open_rgb(data: bytes) -> Image.Image:
+    img = Image.open(io.BytesIO(data))
+    img = ImageOps.exif_transpose(img)
+    return img.convert('RGB')
+
+
+def _lqip_from_image(img: Image.Image) -> str:
+    """Tiny blurred JPEG as a data URI (a few hundred bytes)"""
+    height = max(1, round(img.height * LQIP_WIDTH / img.width))
+    tiny = img.resize((LQIP_WIDTH, height), Image.BILINEAR).filter(ImageFilter.GaussianBlur(1))
+    buffer = io.BytesIO()
+    tiny.save(buffer, format='JPEG', quality=LQIP_QUALITY, optimize=True)
+    return 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def lqip_data_uri(data: bytes) -> Optional[str]:
+    """Placeholder for one image (runs in a worker process)"""
+    try:
+        return _lqip_from_image(_open_rgb(data))
+    except Exception:
+        return None
+
+
+def render_crop_variants(data: bytes, output_dir: str, stem: str, widths=CROP_WIDTHS,
+                         fmt: str = IMAGE_FORMAT) -> Tuple[List[int], Optional[str]]:
+    """Write square crops at each width plus the placeholder (runs in a worker process)"""
+    try:
+        img = _open_rgb(data)
+    except Exception:
+        return [], None
+
+    written = []
+    for width in widths:
+        path = os.path.join(output_dir, f'{stem}-{width}.{fmt}')
+        if not os.path.exists(path):
+            variant = ImageOps.fit(img, (width, width), Image.LANCZOS)
+            tmp_path = f'{path}.tmp'
+            variant.save(tmp_path, format=fmt.upper(), quality=IMAGE_QUALITY)
+            os.replace(tmp_path, path)
+        written.append(width)
+    return written, _lqip_from_image(ImageOps.fit(img, (LQIP_WIDTH * 4, LQIP_WIDTH * 4)))
+
+
+def _read_image_source(session: requests.Session, url: str) -> Optional[bytes]:
+    """Read a mirrored thumbnail from disk, otherwise fetch it"""
+    prefix = THUMBS_URL_PREFIX.rstrip('/') + '/'
+    if url.startswith(prefix):
+        path = THUMBS_DIR / url[len(prefix):]
+        return path.read_bytes() if path.exists() else None
+    if url.startswith('http'):
+        return fetch_thumbnail(session, url)
+    return None
+
+
+def add_responsive_images(result_datas: List[Dict], output_dir: Path = CROPS_DIR,
+                          url_prefix: str = CROPS_URL_PREFIX, fmt: str = IMAGE_FORMAT) -> Dict:
+    """
+    Add srcset variants and placeholders to results in place.
+
+    Items gain `croppedSrcset`, `croppedSizes` and `croppedLqip` (with `croppedImageUrl`
+    switched to the local fallback width); products gain `thumbnailLqip`.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    fmt = resolve_format(fmt)
+
+    items = [item for result_data in result_datas for item in result_data.get('items', [])
+             if (item.get('originalCroppedImageUrl') or item.get('croppedImageUrl', '')).startswith('http')]
+    products = [product for result_data in result_datas for product in iter_products(result_data)
+                if product.get('thumbnail') and not product.get('thumbnailLqip')]
+    crop_urls = list(dict.fromkeys(item.get('originalCroppedImageUrl') or item['croppedImageUrl'] for item in items))
+    thumb_urls = list(dict.fromkeys(product['thumbnail'] for product in products))
+
+    stats = {'crops': len(crop_urls), 'crop_variants': 0, 'placeholders': 0, 'failed': 0}
+    if not crop_urls and not thumb_urls:
+        return stats
+
+    print(f'  🪄 Building srcset for {len(crop_urls)} crops and placeholders for {len(thumb_urls)} thumbnails...')
+
+    session = requests.Session()
+    session.headers['User-Agent'] = USER_AGENT
+    all_urls = crop_urls + thumb_urls
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        downloads = dict(zip(all_urls, pool.map(lambda u: _read_image_source(session, u), all_urls)))
+
+    crop_outputs = {}
+    thumb_lqips = {}
+    with ProcessPoolExecutor(max_workers=RESIZE_WORKERS) as pool:
+        crop_jobs = {}
+        for url in crop_urls:
+            data = downloads.get(url)
+            if data is None:
+                stats['failed'] += 1
+                continue
+            stem = hashlib.sha256(data).hexdigest()[:20]
+            crop_jobs[url] = (stem, pool.submit(render_crop_variants, data, str(output_dir), stem, CROP_WIDTHS, fmt))
+        thumb_jobs = {url: pool.submit(lqip_data_uri, downloads[url])
+                      for url in thumb_urls if downloads.get(url) is not None}
+        stats['failed'] += len(thumb_urls) - len(thumb_jobs)
+
+        for url, (stem, future) in crop_jobs.items():
+            widths, lqip = future.result()
+            if widths:
+                crop_outputs[url] = (stem, widths, lqip)
+                stats['crop_variants'] += len(widths)
+            else:
+                stats['failed'] += 1
+        for url, future in thumb_jobs.items():
+            lqip = future.result()
+            if lqip:
+                thumb_lqips[url] = lqip
+            else:
+                stats['failed'] += 1
+
+    prefix = url_prefix.rstrip('/')
+    for item in items:
+        source_url = item.get('originalCroppedImageUrl') or item['croppedImageUrl']
+        output = crop_outputs.get(source_url)
+        if not output:
+            continue
+        stem, widths, lqip = output
+        fallback = CROP_FALLBACK_WIDTH if CROP_FALLBACK_WIDTH in widths else widths[0]
+        item['originalCroppedImageUrl'] = source_url
+        item['croppedImageUrl'] = f'{prefix}/{stem}-{fallback}.{fmt}'
+        item['croppedSrcset'] = ', '.join(f'{prefix}/{stem}-{w}.{fmt} {w}w' for w in widths)
+        item['croppedSizes'] = CROP_SIZES
+        if lqip:
+            item['croppedLqip'] = lqip
+            stats['placeholders'] += 1
+
+    for product in products:
+        lqip = thumb_lqips.get(product['thumbnail'])
+        if lqip:
+            product['thumbnailLqip'] = lqip
+            stats['placeholders'] += 1
+
+    print(f'  ✅ {stats["crop_variants"]} crop variants, {stats["placeholders"]} placeholders, {stats["failed"]} failed')
+    return stats
+
+
+def main():
+    """Add srcset variants and placeholders to result JSON files in place"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Add responsive crops and LQIP placeholders to result JSON files')
+    parser.add_argument('result_files', nargs='+', help='*_result.json files to rewrite')
+    parser.add_argument('--output-dir', default=str(CROPS_DIR), help='Where crop variants are written')
+    args = parser.parse_args()
+
+    result_datas = []
+    for path in args.result_files:
+        with open(path, 'r', encoding='utf-8') as f:
+            result_datas.append(json.load(f))
+
+    add_responsive_images(result_datas, Path(args.output_dir))
+
+    for path, result_data in zip(args.result_files, result_datas):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(result_data, f, indent=2, ensure_ascii=False)
+
+    print(f'\n✅ Rewrote {len(result_datas)} result files')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -11,6 +11,7 @@ import pandas as pd
 from pathlib import Path
 from datetime import datetime
 from html_generator_mobile import generate_html_page
+from cpu_profile import CpuProfiler, add_profile_args
 
 # Configuration
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:3001')
@@ -18,6 +19,9 @@ EXCEL_FILE = '/Users/levit/Desktop/file+phonenumber2.xlsx'
 OUTPUT_DIR = './batch2_results'
 PUBLIC_DIR = './public/results'
 
+# Started by --profile-cpu
+CPU = CpuProfiler()
+
 # Failed users to retry
 FAILED_PHONES = [
     '821024362637',
@@ -136,17 +140,20 @@ def process_user(user, index, total):
         # 1. Download image
         print("📥 Downloading...")
         image_path = f"{OUTPUT_DIR}/{phone}_original.jpg"
-        download_image(image_url, image_path)
+        with CPU.stage('download'):
+            download_image(image_url, image_path)
         print(f"✅ Downloaded ({os.path.getsize(image_path)/1024:.1f} KB)")
         
         # 2. Upload to frontend
         print("📤 Uploading...")
-        uploaded_url = upload_to_frontend(image_path)
+        with CPU.stage('upload'):
+            uploaded_url = upload_to_frontend(image_path)
         print(f"✅ Uploaded")
         
         # 3. Analyze and crop
         print("✂️  Analyzing...")
-        cropped_images = analyze_and_crop(uploaded_url)
+        with CPU.stage('analyze'):
+            cropped_images = analyze_and_crop(uploaded_url)
         print(f"✅ Found {len(cropped_images)} items")
         
         # Skip if no items found
@@ -156,7 +163,8 @@ def process_user(user, index, total):
         else:
             # 4. Search
             print("🔍 Searching...")
-            search_results = search_items(uploaded_url, cropped_images)
+            with CPU.stage('search'):
+                search_results = search_items(uploaded_url, cropped_images)
         
         # Count total shopping links
         total_links = 0
@@ -191,7 +199,8 @@ def process_user(user, index, total):
         
         # 6. Generate HTML
         print("🎨 Generating HTML...")
-        html = generate_html_page(phone, result_data)
+        with CPU.stage('render'):
+            html = generate_html_page(phone, result_data)
         
         html_path = f"{OUTPUT_DIR}/{phone}_result.html"
         with open(html_path, 'w', encoding='utf-8') as f:
@@ -220,6 +229,15 @@ def process_user(user, index, total):
         }
 
 def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Retry the failed batch 2 users')
+    add_profile_args(parser)
+    args = parser.parse_args()
+    
+    global CPU
+    CPU = CpuProfiler.from_args(args)
+    
     print("=" * 60)
     print("RETRY FAILED BATCH 2 USERS")
     print("=" * 60)
@@ -283,6 +301,8 @@ def main():
         for r in results:
             if r['status'] == 'failed':
                 print(f"   ❌ {r['phone']}: {r.get('error', 'Unknown error')}")
+    
+    CPU.finish()
 
 if __name__ == '__main__':
     main()
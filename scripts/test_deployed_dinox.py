@@ -7,10 +7,12 @@ import os
 import sys
 import json
 import time
-import base64
 import requests
 from pathlib import Path
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from image_payload import track_peak, upload_file
+
 # Configuration
 BRANDS_DIR = Path("/Users/levit/Desktop/brands")
 MODAL_API_URL = "https://heeyunjeon-levit--fashion-crop-api-gpu-fastapi-app-v2.modal.run/analyze"
@@ -19,22 +21,12 @@ UPLOAD_API_URL = "https://fashionsource.vercel.app/api/upload"
 # Test image
 TEST_IMAGE = "5d96eff1ccb9-IMG_1740 복사본.png"
 
-def encode_image_to_base64(image_path):
-    """Encode image to base64"""
-    with open(image_path, 'rb') as f:
-        return base64.b64encode(f.read()).decode('utf-8')
-
 def upload_image(image_path):
     """Upload image to get URL"""
     print(f"📤 Uploading image: {image_path.name}")
     
-    base64_image = encode_image_to_base64(image_path)
-    
-    response = requests.post(
-        UPLOAD_API_URL,
-        json={"image": base64_image},
-        timeout=60
-    )
+    with track_peak(image_path.name):
+        response = upload_file(UPLOAD_API_URL, image_path, timeout=60)
     
     if response.status_code != 200:
         raise Exception(f"Upload failed: {response.status_code} - {response.text}")
@@ -8,10 +8,11 @@ import os
 import sys
 import time
 import json
-import base64
-import requests
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from image_payload import base64_length, post_json_with_image, track_peak
+
 # Test configuration
 TEST_IMAGES = [
     "/Users/levit/Desktop/brands/0214d4bd3a05-IMG_6128 복사본.png",  # Houndstooth bag
@@ -25,23 +26,6 @@ DINOX_MODEL = "DINO-X-1.0"
 # Fashion categories prompt (same as what we use for GroundingDINO)
 FASHION_PROMPT = "shirt. jacket. blouse. button up shirt. vest. skirt. shorts. pants. shoes. bag. dress. coat. sweater. cardigan. hoodie. jeans. leggings. sneakers. boots. sandals. backpack. purse. handbag. hat. cap. scarf. belt. watch. sunglasses. jewelry. necklace. bracelet. earrings. ring"
 
-def image_to_base64(image_path):
-    """Convert image to base64 data URI"""
-    with open(image_path, 'rb') as f:
-        image_data = f.read()
-    
-    # Determine image type
-    ext = os.path.splitext(image_path)[1].lower()
-    mime_type = {
-        '.jpg': 'image/jpeg',
-        '.jpeg': 'image/jpeg',
-        '.png': 'image/png',
-        '.webp': 'image/webp'
-    }.get(ext, 'image/jpeg')
-    
-    base64_data = base64.b64encode(image_data).decode('utf-8')
-    return f"data:{mime_type};base64,{base64_data}"
-
 def call_dinox_api(image_path, include_regions=False):
     """
     Call DINO-X-1.0 API
@@ -56,15 +40,13 @@ def call_dinox_api(image_path, include_regions=False):
     
     start_time = time.time()
     
-    # Convert image to base64
-    print("📸 Converting image to base64...")
-    image_base64 = image_to_base64(image_path)
-    print(f"   Size: {len(image_base64)} characters")
+    # Image is base64-encoded while the request streams
+    print("📸 Streaming image as data URI...")
+    print(f"   Size: {base64_length(os.path.getsize(image_path))} characters")
     
     # Build request payload
     payload = {
         "model": DINOX_MODEL,
-        "image": image_base64,
         "prompt": {
             "type": "text",
             "text": FASHION_PROMPT
@@ -82,11 +64,13 @@ def call_dinox_api(image_path, include_regions=False):
     print(f"   Targets: {payload['targets']}")
     
     try:
-        response = requests.post(
-            DINOX_API_URL,
-            json=payload,
-            timeout=60
-        )
+        with track_peak(os.path.basename(image_path)):
+            response = post_json_with_image(
+                DINOX_API_URL,
+                payload,
+                image_path,
+                timeout=60
+            )
         
         elapsed = time.time() - start_time
         
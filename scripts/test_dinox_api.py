@@ -8,10 +8,11 @@ import os
 import sys
 import time
 import json
-import base64
-import requests
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from image_payload import base64_length, post_json_with_image, track_peak
+
 # Configuration
 API_URL = 'https://cloud.deepdataspace.com/api/v1/dino-x/detect'
 API_TOKEN = 'bdf2ed490ebe69a28be81ea9d9b0b0e3'
@@ -24,23 +25,6 @@ TEST_IMAGES = [
 # Fashion categories prompt
 FASHION_PROMPT = "shirt. jacket. blouse. button up shirt. vest. skirt. shorts. pants. shoes. bag. dress. coat. sweater. cardigan. hoodie. jeans. leggings. sneakers. boots. sandals. backpack. purse. handbag. hat. cap. scarf. belt. watch. sunglasses. jewelry. necklace. bracelet. earrings. ring"
 
-def image_to_base64(image_path):
-    """Convert image to base64 data URI"""
-    with open(image_path, 'rb') as f:
-        image_data = f.read()
-    
-    # Determine image type
-    ext = os.path.splitext(image_path)[1].lower()
-    mime_type = {
-        '.jpg': 'image/jpeg',
-        '.jpeg': 'image/jpeg',
-        '.png': 'image/png',
-        '.webp': 'image/webp'
-    }.get(ext, 'image/jpeg')
-    
-    base64_data = base64.b64encode(image_data).decode('utf-8')
-    return f"data:{mime_type};base64,{base64_data}"
-
 def test_dinox_detection(image_path):
     """
     Test DINO-X-1.0 detection on an image
@@ -55,15 +39,13 @@ def test_dinox_detection(image_path):
     start_time = time.time()
     
     try:
-        # Convert image to base64
-        print("📸 Converting image to base64...")
-        base64_image = image_to_base64(image_path)
-        print(f"   Size: {len(base64_image)} characters")
+        # Image is base64-encoded while the request streams
+        print("📸 Streaming image as data URI...")
+        print(f"   Size: {base64_length(os.path.getsize(image_path))} characters")
         
         # Prepare payload
         payload = {
             'model': 'DINO-X-1.0',
-            'image': base64_image,
             'prompt': {
                 'type': 'text',
                 'text': FASHION_PROMPT
@@ -81,12 +63,14 @@ def test_dinox_detection(image_path):
         print(f"   Prompt: {FASHION_PROMPT[:50]}...")
         
         # Make API call
-        response = requests.post(
-            API_URL,
-            headers=headers,
-            json=payload,
-            timeout=60
-        )
+        with track_peak(os.path.basename(image_path)):
+            response = post_json_with_image(
+                API_URL,
+                payload,
+                image_path,
+                headers=headers,
+                timeout=60
+            )
         
         elapsed = time.time() - start_time
         
@@ -7,11 +7,12 @@ import os
 import sys
 import json
 import time
-import base64
-import requests
 from pathlib import Path
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from image_payload import post_json_with_image, track_peak
+
 # Configuration
 BRANDS_DIR = Path("/Users/levit/Desktop/brands")
 RESULTS_DIR = Path("/Users/levit/Desktop/mvp/brands_results")
@@ -24,23 +25,6 @@ TEST_IMAGES = [
     "731d24e62d99-IMG_3357 복사본.png",
 ]
 
-def encode_image_to_base64(image_path):
-    """Encode image to base64 with data URI"""
-    with open(image_path, 'rb') as f:
-        image_data = f.read()
-    
-    # Determine mime type
-    ext = image_path.suffix.lower()
-    mime_type = {
-        '.jpg': 'image/jpeg',
-        '.jpeg': 'image/jpeg',
-        '.png': 'image/png',
-        '.webp': 'image/webp'
-    }.get(ext, 'image/jpeg')
-    
-    base64_str = base64.b64encode(image_data).decode('utf-8')
-    return f"data:{mime_type};base64,{base64_str}"
-
 def test_image_with_dinox(image_path, use_dinox=True):
     """Test image with DINO-X or GPT-4o"""
     print(f"\n{'='*80}")
@@ -49,22 +33,18 @@ def test_image_with_dinox(image_path, use_dinox=True):
     print(f"{'='*80}")
     
     try:
-        # Encode image to base64
-        print("📸 Encoding image...")
-        image_base64 = encode_image_to_base64(image_path)
-        
-        # Call Modal API
+        # Call Modal API (image streamed into imageUrl as a base64 data URI)
         print(f"🔍 Sending to Modal API...")
         start_time = time.time()
         
-        response = requests.post(
-            MODAL_API_URL,
-            json={
-                "imageUrl": image_base64,  # Send as base64 data URI
-                "use_dinox": use_dinox
-            },
-            timeout=180
-        )
+        with track_peak(image_path.name):
+            response = post_json_with_image(
+                MODAL_API_URL,
+                {"use_dinox": use_dinox},
+                image_path,
+                field="imageUrl",
+                timeout=180
+            )
         
         elapsed = time.time() - start_time
         
@@ -9,10 +9,12 @@ import os
 import sys
 import time
 import json
-import base64
 import requests
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from image_payload import base64_length, post_json_with_image, track_peak
+
 # Configuration from official docs
 API_BASE_URL = 'https://api.deepdataspace.com'
 CREATE_TASK_ENDPOINT = '/v2/task/dinox/detection'
@@ -27,22 +29,6 @@ TEST_IMAGES = [
 # Fashion categories prompt
 FASHION_PROMPT = "shirt. jacket. blouse. button up shirt. vest. skirt. shorts. pants. shoes. bag. dress. coat. sweater. cardigan. hoodie. jeans. leggings. sneakers. boots. sandals. backpack. purse. handbag. hat. cap. scarf. belt. watch. sunglasses. jewelry. necklace. bracelet. earrings. ring"
 
-def image_to_base64(image_path):
-    """Convert image to base64 data URI"""
-    with open(image_path, 'rb') as f:
-        image_data = f.read()
-    
-    ext = os.path.splitext(image_path)[1].lower()
-    mime_type = {
-        '.jpg': 'image/jpeg',
-        '.jpeg': 'image/jpeg',
-        '.png': 'image/png',
-        '.webp': 'image/webp'
-    }.get(ext, 'image/jpeg')
-    
-    base64_data = base64.b64encode(image_data).decode('utf-8')
-    return f"data:{mime_type};base64,{base64_data}"
-
 def create_detection_task(image_path):
     """
     Create DINO-X detection task using official docs format
@@ -55,15 +41,13 @@ def create_detection_task(image_path):
     start_time = time.time()
     
     try:
-        # Convert image
-        print("📸 Converting image...")
-        base64_image = image_to_base64(image_path)
-        print(f"   Size: {len(base64_image)} chars")
+        # Image is base64-encoded while the request streams
+        print("📸 Streaming image as data URI...")
+        print(f"   Size: {base64_length(os.path.getsize(image_path))} chars")
         
         # Prepare payload (exact format from docs)
         payload = {
             "model": "DINO-X-1.0",
-            "image": base64_image,
             "prompt": {
                 "type": "text",
                 "text": FASHION_PROMPT
@@ -84,12 +68,14 @@ def create_detection_task(image_path):
         print(f"\n🚀 Creating detection task...")
         print(f"   POST {url}")
         
-        response = requests.post(
-            url,
-            headers=headers,
-            json=payload,
-            timeout=60
-        )
+        with track_peak(os.path.basename(image_path)):
+            response = post_json_with_image(
+                url,
+                payload,
+                image_path,
+                headers=headers,
+                timeout=60
+            )
         
         print(f"   Response: {response.status_code}")
         
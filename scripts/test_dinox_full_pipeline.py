@@ -11,11 +11,13 @@ import os
 import sys
 import json
 import time
-import base64
 import requests
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from image_payload import track_peak, upload_file
+
 # Configuration
 BRANDS_DIR = Path("/Users/levit/Desktop/brands")
 RESULTS_DIR = Path("/Users/levit/Desktop/mvp/brands_results")
@@ -30,24 +32,13 @@ TEST_IMAGES = [
     "9c9b7d5f941e-IMG_7594 복사본.png",  # Another good one
 ]
 
-def encode_image_to_base64(image_path):
-    """Encode image to base64 string"""
-    with open(image_path, 'rb') as f:
-        return base64.b64encode(f.read()).decode('utf-8')
-
 def upload_image_via_api(image_path):
     """Upload image via Next.js API"""
     print("📤 Uploading image via API...")
     
-    # Encode image to base64
-    base64_image = encode_image_to_base64(image_path)
-    
-    # Call upload API
-    upload_response = requests.post(
-        "https://fashionsource.vercel.app/api/upload",
-        json={"image": base64_image},
-        timeout=60
-    )
+    # Call upload API (multipart, streamed from disk)
+    with track_peak(image_path.name):
+        upload_response = upload_file("https://fashionsource.vercel.app/api/upload", image_path, timeout=60)
     
     if upload_response.status_code != 200:
         raise Exception(f"Upload failed: {upload_response.status_code} - {upload_response.text}")
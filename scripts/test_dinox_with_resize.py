@@ -3,14 +3,17 @@
 Test DINO-X with downsized images for speed
 """
 
+import os
 import sys
+import tempfile
 import time
 from pathlib import Path
 from PIL import Image
-import io
-import base64
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "python_backend"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from image_payload import data_uri, track_peak
 
 from src.analyzers.dinox_analyzer import DINOXAnalyzer
 
@@ -36,19 +39,19 @@ def resize_image(image_path, max_width=1200):
     else:
         print(f"   No resize needed (already smaller than {max_width}px)")
     
-    # Convert to bytes
-    buffer = io.BytesIO()
-    img.save(buffer, format='JPEG', quality=85)
-    buffer.seek(0)
-    
-    resized_size = len(buffer.getvalue()) / 1024 / 1024
-    print(f"   Final size: {resized_size:.2f}MB ({original_file_size/resized_size:.1f}x smaller)")
-    
-    # Convert to base64 data URI
-    base64_data = base64.b64encode(buffer.getvalue()).decode('utf-8')
-    data_uri = f"data:image/jpeg;base64,{base64_data}"
-    
-    return data_uri
+    # Save the resized JPEG, then encode it once via image_payload (the SDK needs a data URI)
+    fd, resized_path = tempfile.mkstemp(suffix='.jpg')
+    os.close(fd)
+    try:
+        img.convert('RGB').save(resized_path, format='JPEG', quality=85)
+        
+        resized_size = Path(resized_path).stat().st_size / 1024 / 1024
+        print(f"   Final size: {resized_size:.2f}MB ({original_file_size/resized_size:.1f}x smaller)")
+        
+        with track_peak(Path(image_path).name):
+            return data_uri(resized_path)
+    finally:
+        os.remove(resized_path)
 
 def main():
     print("\n" + "="*80)
@@ -8,9 +8,11 @@ import os
 import sys
 import time
 import json
-import base64
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from image_payload import data_uri, track_peak
+
 # Import SDK
 from dds_cloudapi_sdk import Config, Client
 from dds_cloudapi_sdk.tasks.v2_task import V2Task
@@ -26,23 +28,6 @@ TEST_IMAGES = [
 # Fashion categories prompt
 FASHION_PROMPT = "shirt. jacket. blouse. button up shirt. vest. skirt. shorts. pants. shoes. bag. dress. coat. sweater. cardigan. hoodie. jeans. leggings. sneakers. boots. sandals. backpack. purse. handbag. hat. cap. scarf. belt. watch. sunglasses. jewelry. necklace. bracelet. earrings. ring"
 
-def image_to_base64(image_path):
-    """Convert image to base64 data URI"""
-    with open(image_path, 'rb') as f:
-        image_data = f.read()
-    
-    # Determine image type
-    ext = os.path.splitext(image_path)[1].lower()
-    mime_type = {
-        '.jpg': 'image/jpeg',
-        '.jpeg': 'image/jpeg',
-        '.png': 'image/png',
-        '.webp': 'image/webp'
-    }.get(ext, 'image/jpeg')
-    
-    base64_data = base64.b64encode(image_data).decode('utf-8')
-    return f"data:{mime_type};base64,{base64_data}"
-
 def test_dinox_detection(image_path, client):
     """
     Test DINO-X-1.0 detection on an image using SDK
@@ -59,7 +44,8 @@ def test_dinox_detection(image_path, client):
     try:
         # Convert image to base64
         print("📸 Converting image to base64...")
-        base64_image = image_to_base64(image_path)
+        with track_peak(os.path.basename(image_path)):
+            base64_image = data_uri(image_path)
         print(f"   Size: {len(base64_image)} characters")
         
         # Create API body (based on your original format)
@@ -0,0 +1,196 @@
+"""Bulk mode against an in-memory stand-in for the PostgREST sessions table"""
+import re
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip('supabase')
+import create_result_from_session as crs
+
+
+def ts(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+class FakeQuery:
+    """The subset of the postgrest query builder that bulk mode uses"""
+
+    def __init__(self, table):
+        self.table = table
+        self.filters = []
+        self.orders = []
+        self.count = None
+        self._negate = False
+
+    @property
+    def not_(self):
+        self._negate = True
+        return self
+
+    def select(self, columns):
+        self.columns = columns.split(',')
+        return self
+
+    def is_(self, column, value):
+        negate, self._negate = self._negate, False
+        assert value == 'null'
+        self.filters.append(lambda row: (row.get(column) is None) != negate)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: ts(row[column]) > ts(value))
+        return self
+
+    def lte(self, column, value):
+        self.filters.append(lambda row: ts(row[column]) <= ts(value))
+        return self
+
+    def or_(self, expression):
+        if expression == 'phone_number.is.null,search_results.is.null':
+            self.filters.append(lambda row: row.get('phone_number') is None or row.get('search_results') is None)
+            return self
+        # created_at.gt."T",and(created_at.eq."T",id.gt.ID) — the keyset continuation
+        match = re.fullmatch(r'created_at\.gt\."([^"]+)",and\(created_at\.eq\."([^"]+)",id\.gt\.(.+)\)', expression)
+        assert match, expression
+        after, tie, after_id = match.groups()
+        self.filters.append(lambda row: ts(row['created_at']) > ts(after)
+                            or (ts(row['created_at']) == ts(tie) and row['id'] > after_id))
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append(column)
+        return self
+
+    def limit(self, count):
+        self.count = count
+        return self
+
+    def execute(self):
+        self.table.queries += 1
+        rows = [row for row in self.table.rows if all(f(row) for f in self.filters)]
+        rows.sort(key=lambda row: tuple(ts(row[c]) if c == 'created_at' else row[c] for c in self.orders))
+        rows = rows[:self.count] if self.count is not None else rows
+        return type('Response', (), {'data': [{c: row.get(c) for c in self.columns} for row in rows]})
+
+
+class FakeSupabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+
+    def table(self, name):
+        assert name == 'sessions'
+        return FakeQuery(self)
+
+
+def session(n, created_at, phone='01000000000', search_results=True):
+    return {
+        'id': f'id-{n:03d}', 'session_id': f'session-{n}', 'phone_number': phone,
+        'created_at': created_at, 'searched_at': created_at, 'uploaded_image_url': '',
+        'gpt_analysis': {'items': []}, 'cropped_images': [],
+        'search_results': {'results': {'top': [{'link': 'x'}]}} if search_results else None,
+    }
+
+
+def test_keyset_continues_across_created_at_ties():
+    same = '2025-03-01T10:00:00+00:00'
+    rows = [session(n, same) for n in range(7)] + [session(7, '2025-03-01T11:00:00+00:00')]
+    client = FakeSupabase(rows)
+
+    fetched = crs.fetch_window(client, {'created_at': crs.EPOCH, 'id': ''}, '2025-03-02T00:00:00+00:00', page_size=3)
+
+    assert [row['id'] for row in fetched] == [row['id'] for row in rows]
+    assert client.queries == 3
+
+
+def test_keyset_resumes_mid_tie_from_watermark():
+    same = '2025-03-01T10:00:00+00:00'
+    rows = [session(n, same) for n in range(5)]
+    fetched = crs.fetch_window(FakeSupabase(rows), {'created_at': same, 'id': 'id-001'},
+                               '2025-03-02T00:00:00+00:00', page_size=2)
+
+    assert [row['id'] for row in fetched] == ['id-002', 'id-003', 'id-004']
+
+
+def test_windows_partition_sessions_without_gaps_or_overlap():
+    rows = [session(n, f'2025-03-{1 + n // 4:02d}T{n % 4 * 6:02d}:00:00+00:00') for n in range(40)]
+    client = FakeSupabase(rows)
+    start = crs.earliest_session_time(client)
+    windows = crs.split_time_windows(start, datetime(2025, 3, 12, tzinfo=timezone.utc), 4)
+    afters = [{'created_at': crs.EPOCH, 'id': ''}] + [{'created_at': s, 'id': ''} for s, _ in windows[1:]]
+
+    pages = [crs.fetch_window(client, after, end, page_size=5) for after, (_, end) in zip(afters, windows)]
+
+    assert sorted(row['id'] for page in pages for row in page) == sorted(row['id'] for row in rows)
+    # Split from the oldest session, every window gets a share of a full rebuild
+    assert all(pages)
+
+
+def test_earliest_session_time_ignores_ineligible_rows():
+    rows = [session(0, '2024-01-01T00:00:00+00:00', phone=None),
+            session(1, '2024-02-01T00:00:00+00:00', search_results=False),
+            session(2, '2024-03-01T00:00:00+00:00')]
+
+    assert crs.earliest_session_time(FakeSupabase(rows)) == '2024-03-01T00:00:00+00:00'
+    assert crs.earliest_session_time(FakeSupabase(rows[:2])) is None
+
+
+def test_bulk_rebuild_renders_latest_session_per_phone(tmp_path, monkeypatch):
+    rows = [session(0, '2025-03-01T10:00:00+00:00', phone='01011112222'),
+            session(1, '2025-03-02T10:00:00+00:00', phone='01011112222'),
+            session(2, '2025-03-03T10:00:00+00:00', phone='01033334444')]
+    client = FakeSupabase(rows)
+    rendered = {}
+    monkeypatch.setattr(crs, 'get_supabase', lambda: client)
+    monkeypatch.setattr(crs, 'BULK_STATE_FILE', tmp_path / 'state.json')
+    monkeypatch.setattr(crs, 'write_result_page',
+                        lambda phone, data: rendered.setdefault(phone, tmp_path / f'{phone}.html'))
+
+    crs.create_bulk_results(windows=3)
+    state = crs.load_bulk_state()
+
+    assert set(rendered) == {'01011112222', '01033334444'}
+    assert state['rendered'] == {'01011112222': 'session-1', '01033334444': 'session-2'}
+    assert state['watermark'] == {'created_at': '2025-03-03T10:00:00+00:00', 'id': 'id-002'}
+
+    # Nothing new since the watermark → no renders on the next run
+    rendered.clear()
+    crs.create_bulk_results(windows=3)
+    assert rendered == {}
+
+
+def test_session_completed_after_a_run_is_rendered_by_the_next(tmp_path, monkeypatch):
+    now = datetime.now(timezone.utc)
+    at = lambda hours: (now - timedelta(hours=hours)).isoformat()
+    # id-000 was created first but is still waiting for its phone number
+    rows = [session(0, at(5), phone=None),
+            session(1, at(4), phone='01011112222'),
+            session(2, at(3), phone='01033334444')]
+    client = FakeSupabase(rows)
+    rendered = {}
+    monkeypatch.setattr(crs, 'get_supabase', lambda: client)
+    monkeypatch.setattr(crs, 'BULK_STATE_FILE', tmp_path / 'state.json')
+    monkeypatch.setattr(crs, 'write_result_page',
+                        lambda phone, data: rendered.setdefault(phone, tmp_path / f'{phone}.html'))
+
+    crs.create_bulk_results(windows=2)
+    assert set(rendered) == {'01011112222', '01033334444'}
+    assert crs.load_bulk_state()['watermark']['created_at'] < rows[0]['created_at']
+
+    # /api/log/phone attaches the number after the first run
+    rows[0]['phone_number'] = '01055556666'
+    rendered.clear()
+    crs.create_bulk_results(windows=2)
+
+    assert set(rendered) == {'01055556666'}
+    assert crs.load_bulk_state()['watermark'] == {'created_at': rows[2]['created_at'], 'id': 'id-002'}
+
+
+def test_next_watermark_stays_just_behind_an_older_incomplete_session():
+    last = {'created_at': '2025-03-03T10:00:00+00:00', 'id': 'id-009'}
+    newer = {'created_at': '2025-03-04T10:00:00+00:00', 'id': 'id-010'}
+
+    assert crs.next_watermark(last, None) == last
+    assert crs.next_watermark(last, newer) == last
+    assert crs.next_watermark(last, {'created_at': '2025-03-01T10:00:00+00:00', 'id': 'id-001'}) == \
+        {'created_at': '2025-03-01T09:59:59.999999+00:00', 'id': ''}
@@ -0,0 +1,28 @@
+"""Commands dispatched through fashion_cli behave like running the script directly"""
+import ast
+import subprocess
+import sys
+from pathlib import Path
+
+import fashion_cli
+
+SCRIPTS_DIR = Path(fashion_cli.__file__).parent
+
+
+def test_every_command_module_has_a_main():
+    for name, (module, _, _) in fashion_cli.COMMANDS.items():
+        tree = ast.parse((SCRIPTS_DIR / f'{module}.py').read_text(encoding='utf-8'))
+        functions = {node.name for node in tree.body if isinstance(node, ast.FunctionDef)}
+        assert 'main' in functions, f'{name}: {module}.py has no main()'
+
+
+def test_pool_based_command_runs_through_the_cli(tmp_path):
+    for n in range(3):
+        (tmp_path / f'page{n}.html').write_text(f'<html><body>{"x" * 5000}{n}</body></html>', encoding='utf-8')
+
+    # compress_file goes through a ProcessPoolExecutor, so it must pickle as page_compressor.compress_file
+    result = subprocess.run([sys.executable, str(SCRIPTS_DIR / 'fashion_cli.py'), 'compress', str(tmp_path),
+                             '--workers', '2'], capture_output=True, text=True, timeout=60)
+
+    assert result.returncode == 0, result.stderr
+    assert sorted(p.name for p in tmp_path.glob('*.gz')) == ['page0.html.gz', 'page1.html.gz', 'page2.html.gz']
@@ -0,0 +1,78 @@
+"""Delta sync against a moto S3 endpoint"""
+import gzip
+import os
+
+import pytest
+
+pytest.importorskip('boto3')
+moto = pytest.importorskip('moto')
+import publish_results
+
+BUCKET = 'results-test'
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    mock = moto.mock_aws() if hasattr(moto, 'mock_aws') else moto.mock_s3()
+    with mock:
+        client = publish_results.get_s3_client(endpoint_url=None, region='us-east-1')
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+@pytest.fixture
+def public_dir(tmp_path):
+    results = tmp_path / 'results'
+    thumbs = tmp_path / 'thumbs'
+    results.mkdir()
+    thumbs.mkdir()
+    (results / 'plain.html').write_text('<html>plain</html>', encoding='utf-8')
+    page = results / 'packed.html'
+    page.write_text('<html>packed</html>', encoding='utf-8')
+    gz = results / 'packed.html.gz'
+    gz.write_bytes(gzip.compress(page.read_bytes()))
+    os.utime(gz, (page.stat().st_mtime + 1, page.stat().st_mtime + 1))
+    (thumbs / 'abc123.jpg').write_bytes(b'\xff\xd8\xff fake jpeg')
+    return tmp_path
+
+
+def run(s3, public_dir):
+    return publish_results.publish(bucket=BUCKET, public_dir=public_dir, dirs=['results', 'thumbs'], s3=s3)
+
+
+def test_unchanged_files_are_skipped_via_manifest(s3, public_dir):
+    first = run(s3, public_dir)
+    second = run(s3, public_dir)
+
+    assert first['uploaded'] == 3
+    assert second['uploaded'] == 0
+    assert second['unchanged'] == 3
+
+
+def test_changed_file_is_uploaded(s3, public_dir):
+    run(s3, public_dir)
+    (public_dir / 'results' / 'plain.html').write_text('<html>regenerated</html>', encoding='utf-8')
+
+    stats = run(s3, public_dir)
+
+    assert stats['uploaded'] == 1
+    body = s3.get_object(Bucket=BUCKET, Key='results/plain.html')['Body'].read()
+    assert body == b'<html>regenerated</html>'
+
+
+def test_precompressed_page_headers(s3, public_dir):
+    run(s3, public_dir)
+
+    packed = s3.head_object(Bucket=BUCKET, Key='results/packed.html')
+    assert packed['ContentEncoding'] == 'gzip'
+    assert packed['CacheControl'] == publish_results.CACHE_CONTROL_PAGES
+    assert packed['ContentType'].startswith('text/html')
+    body = s3.get_object(Bucket=BUCKET, Key='results/packed.html')['Body'].read()
+    assert gzip.decompress(body) == b'<html>packed</html>'
+
+    plain = s3.head_object(Bucket=BUCKET, Key='results/plain.html')
+    assert 'ContentEncoding' not in plain
+    thumb = s3.head_object(Bucket=BUCKET, Key='thumbs/abc123.jpg')
+    assert thumb['CacheControl'] == publish_results.CACHE_CONTROL_IMMUTABLE
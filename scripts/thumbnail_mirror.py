@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Mirror product thumbnails into public/thumbs so result pages stop hotlinking shops.
+
+Each thumbnail URL is fetched once, identical images are stored once (keyed by
+content hash), and every copy is resized to the product card size before the
+result data is rewritten to point at our copies.
+"""
+
+import hashlib
+import io
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
+from PIL import Image, ImageOps
+
+# Configuration
+THUMBS_DIR = Path('./public/thumbs')
+THUMBS_URL_PREFIX = '/thumbs'
+CARD_SIZE = (260, 340)  # 2x the 130x170 .product-img card for retina screens
+IMAGE_FORMAT = 'webp'  # or 'avif' when Pillow has AVIF support
+IMAGE_QUALITY = 75
+FETCH_WORKERS = 16
+RESIZE_WORKERS = os.cpu_count() or 4
+FETCH_TIMEOUT = 15
+MAX_THUMBNAIL_BYTES = 10 * 1024 * 1024
+USER_AGENT = 'Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148'
+
+
+def iter_products(result_data: Dict):
+    """Yield every product dict in a result's search results"""
+    search_results = result_data.get('search_results', {}).get('results', {})
+    for product_links in search_results.values():
+        for product in product_links or []:
+            yield product
+
+
+def source_thumbnail(product: Dict) -> str:
+    """Original shop thumbnail URL (survives re-mirroring an already rewritten result)"""
+    return product.get('original_thumbnail') or product.get('thumbnail') or ''
+
+
+def collect_thumbnail_urls(result_datas: List[Dict]) -> List[str]:
+    """Unique remote thumbnail URLs across all results, in first-seen order"""
+    urls = {}
+    for result_data in result_datas:
+        for product in iter_products(result_data):
+            url = source_thumbnail(product)
+            if url.startswith('http'):
+                urls[url] = True
+    return list(urls)
+
+
+def resolve_format(fmt: str) -> str:
+    """Fall back to WebP when this Pillow build cannot write AVIF"""
+    fmt = fmt.lower()
+    if fmt == 'avif' and 'AVIF' not in Image.registered_extensions().values():
+        print('⚠️  Pillow has no AVIF encoder here, falling back to WebP')
+        return 'webp'
+    return fmt
+
+
+def fetch_thumbnail(session: requests.Session, url: str) -> Optional[bytes]:
+    """Download one thumbnail, returning None when it is missing or not an image"""
+    try:
+        response = session.get(url, timeout=FETCH_TIMEOUT, stream=True)
+        response.raise_for_status()
+        if not response.headers.get('Content-Type', 'image/').startswith('image/'):
+            return None
+        data = response.raw.read(MAX_THUMBNAIL_BYTES + 1, decode_content=True)
+        if not data or len(data) > MAX_THUMBNAIL_BYTES:
+            return None
+        return data
+    except Exception:
+        return None
+
+
+def resize_thumbnail(data: bytes, output_path: str, size=CARD_SIZE, fmt: str = IMAGE_FORMAT,
+                     quality: int = IMAGE_QUALITY) -> bool:
+    """Crop-to-fill one image to the card size and save it (runs in a worker process)"""
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img = ImageOps.exif_transpose(img)
+            img = img.convert('RGBA' if img.mode in ('RGBA', 'LA', 'P') else 'RGB')
+            img = ImageOps.fit(img, size, Image.LANCZOS)
+            save_kwargs = {'quality': quality}
+            if fmt == 'webp':
+                save_kwargs['method'] = 6  # slowest/smallest encoder setting
+            tmp_path = f'{output_path}.tmp'
+            img.save(tmp_path, format=fmt.upper(), **save_kwargs)
+            os.replace(tmp_path, output_path)
+        return True
+    except Exception:
+        return False
+
+
+def mirror_thumbnails(result_datas: List[Dict], output_dir: Path = THUMBS_DIR,
+                      url_prefix: str = THUMBS_URL_PREFIX, fmt: str = IMAGE_FORMAT) -> Dict:
+    """
+    Mirror all product thumbnails of the given results and rewrite them in place.
+
+    Products keep the shop URL in `original_thumbnail`; thumbnails that cannot be
+    fetched or decoded are left pointing at the shop.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    fmt = resolve_format(fmt)
+
+    urls = collect_thumbnail_urls(result_datas)
+    stats = {'urls': len(urls), 'fetched': 0, 'failed': 0, 'unique_images': 0,
+             'resized': 0, 'cached': 0, 'bytes_in': 0, 'bytes_out': 0}
+    if not urls:
+        return stats
+
+    print(f'  🖼️  Mirroring {len(urls)} thumbnails...')
+
+    # Step 1: fetch every URL once (I/O bound, threads)
+    session = requests.Session()
+    session.headers['User-Agent'] = USER_AGENT
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        downloads = dict(zip(urls, pool.map(lambda u: fetch_thumbnail(session, u), urls)))
+
+    # Step 2: dedupe by content hash so the same image from two URLs is stored once
+    url_to_name = {}
+    pending = {}
+    for url, data in downloads.items():
+        if data is None:
+            stats['failed'] += 1
+            continue
+        stats['fetched'] += 1
+        stats['bytes_in'] += len(data)
+        name = f'{hashlib.sha256(data).hexdigest()[:20]}.{fmt}'
+        url_to_name[url] = name
+        if name in pending:
+            continue
+        if (output_dir / name).exists():
+            stats['cached'] += 1
+            pending[name] = None
+        else:
+            pending[name] = data
+    stats['unique_images'] = len(pending)
+
+    # Step 3: resize new images (CPU bound, processes)
+    to_resize = [(name, data) for name, data in pending.items() if data is not None]
+    failed_names = set()
+    if to_resize:
+        with ProcessPoolExecutor(max_workers=RESIZE_WORKERS) as pool:
+            outcomes = pool.map(resize_thumbnail,
+                                [data for _, data in to_resize],
+                                [str(output_dir / name) for name, _ in to_resize],
+                                [CARD_SIZE] * len(to_resize),
+                                [fmt] * len(to_resize))
+            for (name, _), ok in zip(to_resize, outcomes):
+                if ok:
+                    stats['resized'] += 1
+                else:
+                    failed_names.add(name)
+
+    for name in pending:
+        if name not in failed_names:
+            stats['bytes_out'] += (output_dir / name).stat().st_size
+
+    # Step 4: rewrite results to point at our copies
+    prefix = url_prefix.rstrip('/')
+    for result_data in result_datas:
+        for product in iter_products(result_data):
+            url = source_thumbnail(product)
+            name = url_to_name.get(url)
+            if name and name not in failed_names:
+                product['original_thumbnail'] = url
+                product['thumbnail'] = f'{prefix}/{name}'
+
+    print(f'  ✅ Thumbnails: {stats["fetched"]}/{stats["urls"]} fetched, '
+          f'{stats["unique_images"]} unique, {stats["resized"]} resized, {stats["cached"]} cached '
+          f'({stats["bytes_in"] / 1024:.0f} KB → {stats["bytes_out"] / 1024:.0f} KB)')
+    return stats
+
+
+def main():
+    """Mirror thumbnails for result JSON files and rewrite them in place"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Mirror product thumbnails for result JSON files')
+    parser.add_argument('result_files', nargs='+', help='*_result.json files to rewrite')
+    parser.add_argument('--output-dir', default=str(THUMBS_DIR), help='Where mirrored thumbnails are written')
+    parser.add_argument('--format', default=IMAGE_FORMAT, choices=['webp', 'avif'], help='Output image format')
+    args = parser.parse_args()
+
+    result_datas = []
+    for path in args.result_files:
+        with open(path, 'r', encoding='utf-8') as f:
+            result_datas.append(json.load(f))
+
+    mirror_thumbnails(result_datas, Path(args.output_dir), fmt=args.format)
+
+    for path, result_data in zip(args.result_files, result_datas):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(result_data, f, indent=2, ensure_ascii=False)
+
+    print(f'\n✅ Rewrote {len(result_datas)} result files')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,11 +7,13 @@ import os
 import sys
 import json
 import time
-import base64
 import requests
 from pathlib import Path
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from image_payload import track_peak, upload_file
+
 # Configuration
 BRANDS_DIR = Path("/Users/levit/Desktop/brands")
 RESULTS_DIR = Path("/Users/levit/Desktop/mvp/brands_results")
@@ -29,20 +31,12 @@ def upload_via_vercel(image_path):
     """Upload image via Vercel API (which has Supabase credentials)"""
     print(f"\n📤 Uploading: {image_path.name}")
     
-    # Read and encode image
-    with open(image_path, 'rb') as f:
-        image_data = f.read()
-    
-    base64_image = base64.b64encode(image_data).decode('utf-8')
-    
     print(f"   Uploading via Vercel API...")
     
     try:
-        response = requests.post(
-            UPLOAD_API_URL,
-            json={"image": base64_image},
-            timeout=60
-        )
+        # Multipart `file` field, streamed from disk (the route doesn't take JSON)
+        with track_peak(image_path.name):
+            response = upload_file(UPLOAD_API_URL, image_path, timeout=60)
         
         if response.status_code != 200:
             print(f"   ❌ Upload failed: {response.status_code}")
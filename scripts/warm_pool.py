@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Keep analyze backends warm before and during a batch.
+
+Modal (and the other GPU hosts) scale containers down after a few idle minutes,
+and the next request pays a 30-90s cold start. The pool pre-warms one container
+per planned worker on every backend, then keeps pinging at the same width on an
+interval shorter than the scale-down window. Pings slower than the cold-start
+threshold were cold starts the batch itself didn't have to pay for.
+
+Usage:
+    python3 warm_pool.py --concurrency 4 --minutes 30
+"""
+
+import os
+import statistics
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+# Interchangeable analyze backends (name, analyze URL)
+DEFAULT_BACKENDS = [
+    ('modal', 'https://heeyunjeon-levit--fashion-crop-api-gpu-fastapi-app-v2.modal.run/analyze'),
+    ('railway', 'https://fashionsource-gpu-backend-production.up.railway.app/api/analyze'),
+]
+
+# Ping timing
+SCALEDOWN_SECONDS = 300        # Modal idles containers out after ~5 minutes
+PING_INTERVAL_SECONDS = SCALEDOWN_SECONDS / 2.5
+COLD_START_SECONDS = 10.0      # a warm container answers a ping in well under a second
+PING_TIMEOUT = 120              # long enough for a ping to ride out a cold start
+STOP_GRACE_SECONDS = 1.0       # stop() doesn't wait for an in-flight round beyond this
+
+
+def load_backends() -> List[Tuple[str, str]]:
+    """
+    ANALYZE_BACKENDS="name=url,name=url" overrides the defaults; HF_SPACE_URL adds
+    the Hugging Face Spaces deployment of the same API.
+    """
+    configured = os.getenv('ANALYZE_BACKENDS')
+    if configured:
+        backends = []
+        for entry in configured.split(','):
+            name, _, url = entry.strip().partition('=')
+            if url:
+                backends.append((name, url))
+        return backends
+
+    backends = list(DEFAULT_BACKENDS)
+    hf_space_url = os.getenv('HF_SPACE_URL')
+    if hf_space_url:
+        backends.append(('hf-space', f'{hf_space_url.rstrip("/")}/analyze'))
+    return backends
+
+
+def base_url(analyze_url: str) -> str:
+    """Root of the API behind an analyze URL (cheap GET that still boots a container)"""
+    for suffix in ('/api/analyze', '/analyze'):
+        if analyze_url.endswith(suffix):
+            return analyze_url[:-len(suffix)] + '/'
+    return analyze_url
+
+
+class WarmPool:
+    """Background keep-warm pinger sized to the planned concurrency"""
+
+    def __init__(self, backends: Optional[List[Tuple[str, str]]] = None, concurrency: int = 1,
+                 interval: float = PING_INTERVAL_SECONDS, cold_threshold: float = COLD_START_SECONDS):
+        self.backends = backends or load_backends()
+        self.concurrency = max(1, concurrency)
+        self.interval = interval
+        self.cold_threshold = cold_threshold
+        self.pings: Dict[str, List[Dict]] = {name: [] for name, _ in self.backends}
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def ping(self, name: str, url: str) -> Dict:
+        start_time = time.time()
+        try:
+            response = requests.get(base_url(url), timeout=PING_TIMEOUT)
+            ok = response.status_code < 500
+        except requests.RequestException:
+            ok = False
+        elapsed = time.time() - start_time
+        ping = {'at': start_time, 'seconds': round(elapsed, 2), 'ok': ok,
+                'cold': ok and elapsed >= self.cold_threshold}
+        with self._lock:
+            self.pings[name].append(ping)
+        return ping
+
+    def ping_round(self) -> List[Dict]:
+        """
+        `concurrency` simultaneous pings per backend so that many containers stay up.
+
+        Pings run on daemon threads and the round is abandoned once stop() is called,
+        so a ping stuck in a cold start never holds up the end of a batch.
+        """
+        targets = [(name, url) for name, url in self.backends for _ in range(self.concurrency)]
+        pings = []
+        threads = [threading.Thread(target=lambda target=target: pings.append(self.ping(*target)), daemon=True)
+                   for target in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            while thread.is_alive() and not self._stop.is_set():
+                thread.join(STOP_GRACE_SECONDS)
+        return list(pings)
+
+    def prewarm(self):
+        """Blocking warm-up before the batch starts"""
+        print(f'🔥 Pre-warming {len(self.backends)} backends × {self.concurrency} containers...')
+        start_time = time.time()
+        pings = self.ping_round()
+        cold = sum(1 for p in pings if p['cold'])
+        failed = sum(1 for p in pings if not p['ok'])
+        print(f'   ✅ Warm in {time.time() - start_time:.1f}s ({cold} cold starts absorbed, {failed} failed)')
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.ping_round()
+
+    def start(self, prewarm: bool = True):
+        if prewarm:
+            self.prewarm()
+        print(f'   ♨️  Keep-warm: {self.concurrency * len(self.backends)} pings every {self.interval:.0f}s')
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=STOP_GRACE_SECONDS)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def report(self) -> Dict:
+        """Per backend ping counts, cold starts detected and time they would have cost"""
+        report = {}
+        with self._lock:
+            for name, pings in self.pings.items():
+                warm = [p['seconds'] for p in pings if p['ok'] and not p['cold']]
+                cold = [p['seconds'] for p in pings if p['cold']]
+                warm_median = statistics.median(warm) if warm else 0.0
+                report[name] = {
+                    'pings': len(pings),
+                    'failed': sum(1 for p in pings if not p['ok']),
+                    'cold_starts': len(cold),
+                    'warm_ping_seconds': round(warm_median, 2),
+                    # each cold ping is a penalty a batch request didn't pay
+                    'saved_seconds': round(sum(c - warm_median for c in cold), 1),
+                }
+        return report
+
+    def print_report(self):
+        report = self.report()
+        print(f'\n♨️  Warm pool')
+        print(f'{"Backend":<12} {"Pings":>6} {"Failed":>7} {"Cold":>5} {"Warm ping":>10} {"Saved":>8}')
+        for name, row in report.items():
+            print(f'{name:<12} {row["pings"]:>6} {row["failed"]:>7} {row["cold_starts"]:>5} '
+                  f'{row["warm_ping_seconds"]:>9.2f}s {row["saved_seconds"]:>7.0f}s')
+        total = sum(row['saved_seconds'] for row in report.values())
+        print(f'Cold-start time absorbed by the pool: {total:.0f}s')
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Keep analyze backends warm')
+    parser.add_argument('--concurrency', type=int, default=1, help='Planned batch concurrency')
+    parser.add_argument('--minutes', type=float, default=30, help='How long to keep backends warm')
+    parser.add_argument('--interval', type=float, default=PING_INTERVAL_SECONDS, help='Seconds between ping rounds')
+    args = parser.parse_args()
+
+    pool = WarmPool(concurrency=args.concurrency, interval=args.interval)
+    try:
+        with pool:
+            time.sleep(args.minutes * 60)
+    except KeyboardInterrupt:
+        pass
+    pool.print_report()
+
+
+if __name__ == '__main__':
+    sys.exit(main())